@@ -231,7 +231,7 @@ def _wants_json(request):
 def _login_context(request):
     """Shared template context for the Clearance Gate login + register."""
     from exodus.models import SiteSettings
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     tweaks = settings_obj.get_tweaks()
     roster, active_count = _build_login_roster()
     return {
@@ -392,11 +392,15 @@ def profile_view(request):
         action = request.POST.get("action", "")
 
         if action == "avatar":
+            from exodus.images import delete_derivatives, generate_derivatives
             if "avatar" in request.FILES:
+                delete_derivatives(profile.avatar)
                 profile.avatar = request.FILES["avatar"]
                 profile.save(update_fields=["avatar"])
+                generate_derivatives(profile.avatar)
                 messages.success(request, "Avatar updated.")
             elif request.POST.get("remove_avatar"):
+                delete_derivatives(profile.avatar)
                 profile.avatar = None
                 profile.save(update_fields=["avatar"])
                 messages.success(request, "Avatar removed.")
@@ -6,35 +6,30 @@ When a vote is cast or status changes, the updated item is broadcast to all.
 
 import json
 
-from asgiref.sync import async_to_sync
-from channels.generic.websocket import WebsocketConsumer
+from channels.generic.websocket import AsyncWebsocketConsumer
 
 
 COUNCIL_GROUP = "council_votes"
 
 
-class CouncilConsumer(WebsocketConsumer):
+class CouncilConsumer(AsyncWebsocketConsumer):
     """Broadcasts council item updates to all connected clients."""
 
-    def connect(self):
+    async def connect(self):
         user = self.scope["user"]
         if not user.is_authenticated:
-            self.close()
+            await self.close()
             return
 
-        async_to_sync(self.channel_layer.group_add)(
-            COUNCIL_GROUP, self.channel_name
-        )
-        self.accept()
+        await self.channel_layer.group_add(COUNCIL_GROUP, self.channel_name)
+        await self.accept()
 
-    def disconnect(self, close_code):
-        async_to_sync(self.channel_layer.group_discard)(
-            COUNCIL_GROUP, self.channel_name
-        )
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(COUNCIL_GROUP, self.channel_name)
 
-    def council_update(self, event):
+    async def council_update(self, event):
         """Forward an updated council item to the client."""
-        self.send(text_data=json.dumps({
+        await self.send(text_data=json.dumps({
             "type": "council_update",
             "item": event["item"],
         }))
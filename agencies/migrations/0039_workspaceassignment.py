@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_assignments(apps, schema_editor):
+    """Mirror every existing character workspace slot into the new table."""
+    Base = apps.get_model("agencies", "Base")
+    Character = apps.get_model("characters", "Character")
+    WorkspaceAssignment = apps.get_model("agencies", "WorkspaceAssignment")
+    known = set(Character.objects.values_list("pk", flat=True))
+    rows = []
+    for base in Base.objects.all():
+        seen = set()
+        for ws in base.workspaces or []:
+            char_id = ws.get("assignedTo")
+            if ws.get("assignedType") != "character" or char_id not in known or char_id in seen:
+                continue
+            seen.add(char_id)
+            rows.append(WorkspaceAssignment(
+                character_id=char_id, base_id=base.pk, agency_id=base.agency_id,
+                level=ws.get("level", 1) or 1,
+            ))
+    WorkspaceAssignment.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0038_agency_scan_grant_agency_scan_usage_and_more'),
+        ('characters', '0012_add_merit_uses'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkspaceAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.IntegerField(default=1)),
+                ('agency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workspace_assignments', to='agencies.agency')),
+                ('base', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workspace_assignments', to='agencies.base')),
+                ('character', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workspace_assignments', to='characters.character')),
+            ],
+            options={
+                'ordering': ['base__name', 'base_id'],
+                'constraints': [models.UniqueConstraint(fields=('base', 'character'), name='unique_workspace_assignment')],
+            },
+        ),
+        migrations.RunPython(backfill_assignments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def projects_to_rows(apps, schema_editor):
+    Agency = apps.get_model("agencies", "Agency")
+    AgencyProject = apps.get_model("agencies", "AgencyProject")
+    rows = []
+    for agency in Agency.objects.all():
+        for position, data in enumerate(agency.projects or []):
+            rows.append(AgencyProject(agency=agency, position=position, data=data))
+    AgencyProject.objects.bulk_create(rows)
+
+
+def rows_to_projects(apps, schema_editor):
+    Agency = apps.get_model("agencies", "Agency")
+    AgencyProject = apps.get_model("agencies", "AgencyProject")
+    for agency in Agency.objects.all():
+        agency.projects = [
+            row.data for row in AgencyProject.objects.filter(agency=agency).order_by("position")
+        ]
+        agency.save(update_fields=["projects"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0039_workspaceassignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgencyProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('data', models.JSONField(default=dict)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('agency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_rows', to='agencies.agency')),
+            ],
+            options={
+                'ordering': ['agency', 'position'],
+                'unique_together': {('agency', 'position')},
+            },
+        ),
+        migrations.RunPython(projects_to_rows, rows_to_projects),
+        migrations.RemoveField(
+            model_name='agency',
+            name='projects',
+        ),
+    ]
@@ -0,0 +1,177 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:33
+
+from django.db import migrations, models
+from django.db.models import F
+
+AGENCY_SECTIONS = (
+    "header", "alliance", "notes", "integrity", "attributes", "specializations",
+    "merits", "flaws", "assets", "fleet", "history", "projects", "admin-flags",
+)
+BASE_SECTIONS = (
+    "name", "location", "merits", "facilities", "workspaces", "equipment",
+    "departments", "notes", "geo", "hidden", "classified",
+)
+
+
+def _field(key):
+    return key.replace("-", "_") + "_version"
+
+
+def split_section_versions(apps, schema_editor):
+    """Copy the JSON map into the columns. Every base section starts as
+    changed at the base's current version, so a client holding an older
+    version still gets its 409 on the first write."""
+    Agency = apps.get_model("agencies", "Agency")
+    Base = apps.get_model("agencies", "Base")
+    for agency in Agency.objects.exclude(section_versions={}):
+        versions = agency.section_versions or {}
+        for key in AGENCY_SECTIONS:
+            setattr(agency, _field(key), int(versions.get(key, 0)))
+        agency.save(update_fields=[_field(key) for key in AGENCY_SECTIONS])
+    Base.objects.update(**{_field(key): F("version") for key in BASE_SECTIONS})
+
+
+def join_section_versions(apps, schema_editor):
+    Agency = apps.get_model("agencies", "Agency")
+    for agency in Agency.objects.all():
+        agency.section_versions = {
+            key: getattr(agency, _field(key))
+            for key in AGENCY_SECTIONS
+            if getattr(agency, _field(key))
+        }
+        agency.save(update_fields=["section_versions"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0040_agencyproject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agency',
+            name='admin_flags_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='alliance_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='assets_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='attributes_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='flaws_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='fleet_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='header_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='history_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='integrity_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='merits_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='notes_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='projects_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agency',
+            name='specializations_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='classified_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='departments_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='equipment_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='facilities_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='geo_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='hidden_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='location_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='merits_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='name_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='notes_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='base',
+            name='workspaces_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(split_section_versions, join_section_versions),
+        migrations.RemoveField(
+            model_name='agency',
+            name='section_versions',
+        ),
+    ]
@@ -22,6 +22,17 @@ def default_agency_attributes():
     }
 
 
+# Agency section key -> its version column.
+AGENCY_SECTION_VERSION_FIELDS = {
+    key: key.replace("-", "_") + "_version"
+    for key in (
+        "header", "alliance", "notes", "integrity", "attributes",
+        "specializations", "merits", "flaws", "assets", "fleet", "history",
+        "projects", "admin-flags",
+    )
+}
+
+
 class Agency(models.Model):
     # Identity
     name = models.CharField(max_length=200)
@@ -52,7 +63,7 @@ class Agency(models.Model):
     assets = models.JSONField(default=list)  # [{name, type, status, notes}]
     fleet = models.JSONField(default=list)  # [{shipClass, role, quantity, notes}]
     conditions = models.JSONField(default=list)  # [{condition, source, effect, duration}]
-    projects = models.JSONField(default=list)  # [{name, player, duration, completionScore, notes}]
+    # projects: see the ``projects`` property below (AgencyProject rows)
     history = models.JSONField(default=list)  # [{year, decision, consequence}]
 
     # NPC visibility: {fieldPath: bool} — true = visible, false = classified
@@ -111,16 +122,25 @@ class Agency(models.Model):
         help_text='Roll allocations: {"_global": {"free": N, "spare": N}, "CharName": {"free": N, "spare": N}}',
     )
 
-    # Optimistic concurrency: per-section monotonic version counters.
-    # Shape: {"notes": 7, "merits": 3, ...}. Bumped on every successful
+    # Optimistic concurrency: one monotonic version column per section
+    # (see AGENCY_SECTION_VERSION_FIELDS). Bumped on every successful
     # section PATCH; clients send the expected current value via If-Match.
-    section_versions = models.JSONField(
-        default=dict,
-        help_text=(
-            "Per-section monotonic versions for optimistic concurrency on "
-            "agency-level PATCH endpoints."
-        ),
-    )
+    # A section's compare-and-swap pins only its own column, so writes to
+    # different sections never conflict. ``section_versions`` below keeps
+    # the {"notes": 7, "merits": 3, ...} map shape for readers.
+    header_version = models.PositiveIntegerField(default=0)
+    alliance_version = models.PositiveIntegerField(default=0)
+    notes_version = models.PositiveIntegerField(default=0)
+    integrity_version = models.PositiveIntegerField(default=0)
+    attributes_version = models.PositiveIntegerField(default=0)
+    specializations_version = models.PositiveIntegerField(default=0)
+    merits_version = models.PositiveIntegerField(default=0)
+    flaws_version = models.PositiveIntegerField(default=0)
+    assets_version = models.PositiveIntegerField(default=0)
+    fleet_version = models.PositiveIntegerField(default=0)
+    history_version = models.PositiveIntegerField(default=0)
+    projects_version = models.PositiveIntegerField(default=0)
+    admin_flags_version = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -133,6 +153,120 @@ class Agency(models.Model):
         tag = "[PLAYER]" if self.is_player_agency else "[NPC]"
         return f"{tag} {self.name}"
 
+    # Projects live in ``AgencyProject`` rows — one per project, each with
+    # its own version — so writers to different projects never rewrite each
+    # other's data. ``projects`` keeps the old list shape
+    # ([{name, player, duration, completionScore, notes}, ...]) for readers:
+    # reading it builds the list from the rows; assigning it, or saving
+    # with ``update_fields=["projects"]`` after an in-place edit, writes
+    # back only the rows that changed.
+    _projects = None
+    _projects_dirty = False
+
+    @property
+    def projects(self):
+        if self._projects is None:
+            if self.pk is None:
+                self._projects = []
+            else:
+                self._projects = [row.data for row in self.project_rows.all()]
+        return self._projects
+
+    @projects.setter
+    def projects(self, value):
+        self._projects = list(value or [])
+        self._projects_dirty = True
+
+    @property
+    def section_versions(self):
+        """``{section key: version}`` for every section written at least once."""
+        return {
+            key: getattr(self, field)
+            for key, field in AGENCY_SECTION_VERSION_FIELDS.items()
+            if getattr(self, field)
+        }
+
+    @section_versions.setter
+    def section_versions(self, value):
+        value = value or {}
+        for key, field in AGENCY_SECTION_VERSION_FIELDS.items():
+            setattr(self, field, int(value.get(key, 0)))
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            write_projects = self._projects_dirty
+        else:
+            update_fields = set(update_fields)
+            write_projects = "projects" in update_fields
+            if write_projects:
+                update_fields.discard("projects")
+                update_fields.add("updated_at")
+            if "section_versions" in update_fields:
+                update_fields.discard("section_versions")
+                update_fields.update(AGENCY_SECTION_VERSION_FIELDS.values())
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+        if write_projects:
+            self.save_projects()
+
+    def save_projects(self):
+        """Write ``projects`` to the AgencyProject rows: changed entries are
+        updated and their version bumped, new entries created, surplus rows
+        deleted. Untouched projects are not written."""
+        projects = list(self.projects)
+        rows = {row.position: row for row in AgencyProject.objects.filter(agency=self)}
+        created = []
+        for position, data in enumerate(projects):
+            row = rows.get(position)
+            if row is None:
+                created.append(AgencyProject(agency=self, position=position, data=data))
+            elif row.data != data:
+                AgencyProject.objects.filter(pk=row.pk).update(
+                    data=data, version=models.F("version") + 1,
+                )
+        AgencyProject.objects.bulk_create(created)
+        AgencyProject.objects.filter(agency=self, position__gte=len(projects)).delete()
+        self._projects_dirty = False
+        getattr(self, "_prefetched_objects_cache", {}).pop("project_rows", None)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        if fields is None or "projects" in fields:
+            self._projects = None
+            self._projects_dirty = False
+            getattr(self, "_prefetched_objects_cache", {}).pop("project_rows", None)
+            if fields is not None:
+                fields = [field for field in fields if field != "projects"]
+                if not fields:
+                    return
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
+class AgencyProject(models.Model):
+    """One entry of ``Agency.projects``.
+
+    ``data`` is the project dict exactly as the API sends it; ``version``
+    goes up on every write to this project. It is a row-level change
+    counter only: the API does not expose it, and the per-project
+    endpoints are force-writes that never check it (the ``projects``
+    section version still covers If-Match on whole-section writes).
+    """
+
+    agency = models.ForeignKey(
+        Agency, on_delete=models.CASCADE, related_name="project_rows",
+    )
+    position = models.PositiveIntegerField()  # the API's project_index
+    data = models.JSONField(default=dict)
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["agency", "position"]
+        unique_together = ["agency", "position"]
+
+    def __str__(self):
+        name = self.data.get("name", "") if isinstance(self.data, dict) else ""
+        return f"{self.agency.name} — #{self.position} {name}"
+
 
 CONDITION_TYPE_CHOICES = [
     ("ransomware", "Ransomware"),
@@ -788,6 +922,16 @@ class BaseConfig(models.Model):
         return obj
 
 
+# Base section key -> the column holding the base version it last changed at.
+BASE_SECTION_VERSION_FIELDS = {
+    key: f"{key}_version"
+    for key in (
+        "name", "location", "merits", "facilities", "workspaces", "equipment",
+        "departments", "notes", "geo", "hidden", "classified",
+    )
+}
+
+
 class Base(models.Model):
     """A base/installation belonging to an agency.
 
@@ -824,6 +968,21 @@ class Base(models.Model):
         default=0,
         help_text="Monotonic version for optimistic concurrency on per-base PATCH endpoints.",
     )
+    # The value of ``version`` when each section last changed (see
+    # BASE_SECTION_VERSION_FIELDS). A stale If-Match only conflicts when
+    # its section changed after the client's version, so writes to
+    # different sections of one base never 409 each other.
+    name_version = models.PositiveIntegerField(default=0)
+    location_version = models.PositiveIntegerField(default=0)
+    merits_version = models.PositiveIntegerField(default=0)
+    facilities_version = models.PositiveIntegerField(default=0)
+    workspaces_version = models.PositiveIntegerField(default=0)
+    equipment_version = models.PositiveIntegerField(default=0)
+    departments_version = models.PositiveIntegerField(default=0)
+    notes_version = models.PositiveIntegerField(default=0)
+    geo_version = models.PositiveIntegerField(default=0)
+    hidden_version = models.PositiveIntegerField(default=0)
+    classified_version = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -834,6 +993,84 @@ class Base(models.Model):
     def __str__(self):
         return f"{self.name} ({self.agency.name})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"workspaces", "agency"} & set(update_fields):
+            self.sync_workspace_assignments()
+
+    def sync_workspace_assignments(self):
+        """Rewrite this base's ``WorkspaceAssignment`` rows from ``workspaces``.
+
+        Called from ``save()``; writers that bypass it with a queryset
+        ``update()`` (the section PATCH CAS) must call it themselves.
+        """
+        from characters.models import Character
+
+        levels = {}
+        for ws in self.workspaces or []:
+            if ws.get("assignedType") == "character" and ws.get("assignedTo"):
+                levels.setdefault(ws["assignedTo"], ws.get("level", 1) or 1)
+        # Stale slots can point at deleted characters; skip them.
+        char_ids = (
+            set(Character.objects.filter(pk__in=levels).values_list("pk", flat=True))
+            if levels else set()
+        )
+        WorkspaceAssignment.objects.filter(base=self).delete()
+        WorkspaceAssignment.objects.bulk_create([
+            WorkspaceAssignment(
+                character_id=char_id, base=self, agency_id=self.agency_id,
+                level=levels[char_id],
+            )
+            for char_id in levels if char_id in char_ids
+        ])
+
+
+class WorkspaceAssignment(models.Model):
+    """Indexed mirror of the character slots in ``Base.workspaces``.
+
+    ``Base.workspaces`` stays the source of truth; this table exists so
+    "which agency is this user's character working for" is one indexed
+    join instead of a Python walk over every base's JSON.
+    """
+
+    character = models.ForeignKey(
+        "characters.Character", on_delete=models.CASCADE,
+        related_name="workspace_assignments",
+    )
+    base = models.ForeignKey(
+        Base, on_delete=models.CASCADE, related_name="workspace_assignments",
+    )
+    agency = models.ForeignKey(
+        Agency, on_delete=models.CASCADE, related_name="workspace_assignments",
+    )
+    level = models.IntegerField(default=1)
+
+    class Meta:
+        ordering = ["base__name", "base_id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["base", "character"], name="unique_workspace_assignment",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.character} @ {self.base.name}"
+
+    @staticmethod
+    def agency_for_user(user):
+        """The player agency one of ``user``'s characters is assigned to.
+
+        Matches the legacy JSON walk: bases in name order, first hit wins.
+        """
+        row = (
+            WorkspaceAssignment.objects
+            .filter(character__owner=user, agency__is_player_agency=True)
+            .select_related("agency")
+            .first()
+        )
+        return row.agency if row else None
+
 
 class BaseXpLog(models.Model):
     """Log of XP changes related to bases (e.g. facility destruction from fringe effects)."""
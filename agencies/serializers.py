@@ -1,6 +1,7 @@
 """Manual JSON serialization for Agency models. No DRF dependency."""
 
 from characters.models import Character
+from exodus import dice as dice_engine
 from npcs.models import NPC
 from .models import GlobalFlaw, FTLProject, AgencyFTLProject, CouncilItem, CouncilVote, BaseConfig, Base, BASE_DEPARTMENTS, THRIVE_LABELS
 
@@ -464,7 +465,17 @@ def _compute_project_dice_pool(project, agency, characters_by_name, bases_list):
             pool += cognitive  # cognitive is negative
             parts.append({"label": "Mental Load", "value": cognitive, "type": "mentalLoad"})
 
-    return {"pool": max(pool, 0), "parts": parts, "raw": pool}
+    # 11. Roll odds. The roll endpoints roll at least one die with the
+    # project's X-again and add +2 when a prodigy is assigned; the
+    # odds come from the shared exact distribution table.
+    odds = dice_engine.odds(
+        max(pool, 1),
+        bonus=2 if project.get("assignedProdigyId") else 0,
+        again=project.get("rerollThreshold", 10),
+        chance_die=False,
+    )
+
+    return {"pool": max(pool, 0), "parts": parts, "raw": pool, "odds": odds}
 
 
 def _serialize_projects(agency, show_all, user, is_field_visible_fn):
@@ -657,7 +668,7 @@ def _agency_observatories(agency):
 
 def _scanning_turn_state():
     from exodus.models import SiteSettings
-    s = SiteSettings.load()
+    s = SiteSettings.cached()
     return {"open": s.scanning_turn_open, "number": s.scanning_turn_number}
 
 
@@ -788,7 +799,7 @@ def serialize_agency(agency, user):
     data["globalFlaws"] = [serialize_global_flaw(gf) for gf in GlobalFlaw.objects.all()]
 
     # Council items — visible to everyone, not editable per-agency
-    data["councilItems"] = [serialize_council_item(ci) for ci in CouncilItem.objects.all()]
+    data["councilItems"] = serialize_council_items(CouncilItem.objects.all())
 
     # Determine character class for base building visibility filtering
     # Admins see all options; players see only their class + general
@@ -1000,10 +1011,10 @@ AGENCY_SECTION_VALUE_GETTERS = {
     "assets": lambda a: a.assets,
     "fleet": lambda a: a.fleet,
     "history": lambda a: a.history,
-    # ``projects`` round-trips the raw JSON list — callers can either
-    # full-replace via the section endpoint or mutate via the per-project
-    # endpoints (which share the same version slot through
-    # ``_with_projects_cas``). Computed fields (``computedPool``) are NOT
+    # ``projects`` round-trips the raw list (built from the AgencyProject
+    # rows) — callers can either full-replace via the section endpoint or
+    # mutate via the per-project endpoints (which bump the same version
+    # slot through ``_with_project_write``). Computed fields (``computedPool``) are NOT
     # added here; the section endpoint is for raw round-trips. Use
     # ``GET /api/agencies/<id>/`` to receive the enriched view.
     "projects": lambda a: a.projects or [],
@@ -1137,6 +1148,8 @@ def serialize_agency_ftl_project(afp, agency=None, characters_by_name=None, base
             "baseId": afp.base_id,
             "dicePoolConfig": meta.get("dicePoolConfig"),
             "assignedNpcs": meta.get("assignedNpcs", []),
+            "rerollThreshold": meta.get("rerollThreshold", 10),
+            "assignedProdigyId": meta.get("assignedProdigyId"),
         }
         # Copy fringe dice fields from metadata
         for field_key, _, _ in FRINGE_DICE_FIELDS:
@@ -1148,10 +1161,38 @@ def serialize_agency_ftl_project(afp, agency=None, characters_by_name=None, base
     return data
 
 
-def serialize_council_item(ci, user=None):
-    """Serialize a CouncilItem model instance, including votes when voting."""
+def council_members():
+    """Council-member agencies in name order.
+
+    Load once per request and hand to ``serialize_council_item`` /
+    ``build_vote_record`` so tallies don't re-query the member list.
+    """
     from .models import Agency
 
+    return list(Agency.objects.filter(is_council_member=True).order_by("name"))
+
+
+def serialize_council_items(items, user=None):
+    """Serialize a CouncilItem queryset in a fixed number of queries.
+
+    The member list is loaded once and every item's votes (with their
+    agencies) are prefetched in one query; tallies are computed in memory.
+    """
+    from django.db.models import Prefetch
+
+    members = council_members()
+    items = items.prefetch_related(Prefetch(
+        "votes", queryset=CouncilVote.objects.select_related("agency").order_by("id"),
+    ))
+    return [serialize_council_item(ci, user, members) for ci in items]
+
+
+def serialize_council_item(ci, user=None, members=None):
+    """Serialize a CouncilItem model instance, including votes when voting.
+
+    ``members`` is a preloaded ``council_members()`` list (queried here
+    when omitted).
+    """
     data = {
         "id": ci.id,
         "name": ci.name,
@@ -1165,7 +1206,7 @@ def serialize_council_item(ci, user=None):
 
     # Include votes and tally for items that have been through voting
     if ci.status in ("voting", "active", "suspended", "repealed"):
-        data.update(_build_live_tally(ci))
+        data.update(_build_live_tally(ci, members))
     elif ci.status == "emergency_suspended" and ci.vote_record:
         # Frozen snapshot from when the vote was emergency-suspended
         data["votes"] = ci.vote_record.get("votes", [])
@@ -1178,14 +1219,18 @@ def serialize_council_item(ci, user=None):
     return data
 
 
-def _build_live_tally(ci):
-    """Build live vote tally from the database for a council item."""
-    from .models import Agency
+def _council_votes(ci):
+    # ``serialize_council_items`` prefetches the votes with their agencies.
+    if "votes" in getattr(ci, "_prefetched_objects_cache", {}):
+        return list(ci.votes.all())
+    return list(ci.votes.select_related("agency").order_by("id"))
 
-    votes = list(ci.votes.select_related("agency").all())
-    members = list(
-        Agency.objects.filter(is_council_member=True).order_by("name")
-    )
+
+def _build_live_tally(ci, members=None):
+    """Build live vote tally for a council item."""
+    votes = _council_votes(ci)
+    if members is None:
+        members = council_members()
     total_members = len(members)
     present_members = [m for m in members if m.is_council_present]
     total_present = len(present_members)
@@ -1243,14 +1288,11 @@ def _build_live_tally(ci):
     return {"votes": vote_list, "tally": tally}
 
 
-def build_vote_record(ci):
+def build_vote_record(ci, members=None):
     """Build a frozen vote snapshot including 'did not vote' entries."""
-    from .models import Agency
-
-    data = _build_live_tally(ci)
-    members = list(
-        Agency.objects.filter(is_council_member=True).order_by("name")
-    )
+    if members is None:
+        members = council_members()
+    data = _build_live_tally(ci, members)
     voted_ids = {v["agencyId"] for v in data["votes"]}
     # Add "did not vote" entries for members who haven't voted
     for m in members:
@@ -1406,7 +1448,7 @@ def serialize_base_config(config, character_class=None):
     unlocked = None
     if character_class is not None:
         from exodus.models import SiteSettings
-        unlocked = SiteSettings.load().class_unlock_flags or {}
+        unlocked = SiteSettings.cached().class_unlock_flags or {}
     return {
         "locationTypes": [lt for lt in config.location_types if _class_visible(lt, character_class, unlocked)],
         "locationMerits": [lm for lm in config.location_merits if _class_visible(lm, character_class, unlocked)],
@@ -0,0 +1,143 @@
+"""Conditional GET for the agency sheet (``api_agency_detail``).
+
+The ETag is a digest of version stamps across every table the sheet reads,
+so an unchanged sheet answers ``If-None-Match`` with 304 before
+``serialize_agency`` runs, and any tracked write produces a fresh 200.
+"""
+
+import json
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+
+from agencies.models import Agency, AgencyCondition, Base, CouncilItem
+from characters.models import Character
+from exodus.models import SiteSettings
+from starmap.models import StarSystem
+from starships.models import ClassModule, ShipModule, ShipType, Starship, StarshipClass
+
+
+class AgencyDetailETagTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("etag_gm", "gm@example.com", "pw")
+        self.player = User.objects.create_user("etag_player", "p@example.com", "pw")
+        self.char = Character.objects.create(owner=self.player, name="Analyst")
+        self.agency = Agency.objects.create(name="Sheet Agency", is_player_agency=True)
+        self.base = Base.objects.create(
+            agency=self.agency, name="Depot",
+            workspaces=[{"level": 1, "assignedType": "character", "assignedTo": self.char.id}],
+        )
+        self.client = Client()
+        self.client.force_login(self.player)
+        self.url = f"/api/agencies/{self.agency.id}/"
+        self.client.get(self.url)  # first render creates the BaseConfig singleton
+
+    def _revalidate(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_sheet_is_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first["ETag"].startswith('"'))
+        self.assertEqual(self._revalidate(first["ETag"]).status_code, 304)
+
+    def test_related_writes_bust_the_etag(self):
+        writes = [
+            lambda: Base.objects.filter(pk=self.base.pk).update(version=7),
+            lambda: CouncilItem.objects.create(name="Accord"),
+            lambda: Character.objects.create(owner=self.admin, name="Newcomer"),
+            lambda: AgencyCondition.objects.create(
+                agency=self.agency, condition_type=AgencyCondition._meta.get_field(
+                    "condition_type").choices[0][0],
+                description="Breach", difficulty=3,
+            ),
+        ]
+        etag = self.client.get(self.url)["ETag"]
+        for write in writes:
+            write()
+            resp = self._revalidate(etag)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotEqual(resp["ETag"], etag)
+            etag = resp["ETag"]
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get(self.url)["ETag"]
+        gm = Client()
+        gm.force_login(self.admin)
+        self.assertEqual(gm.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_hidden_agency_never_304s_for_players(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.agency.is_hidden = True
+        self.agency.save()
+        self.assertEqual(self._revalidate(etag).status_code, 404)
+
+    def test_put_ignores_etag_preconditions(self):
+        gm = Client()
+        gm.force_login(self.admin)
+        resp = gm.put(
+            self.url, data=json.dumps({"motto": "Onward"}),
+            content_type="application/json", HTTP_IF_MATCH='"stale"',
+        )
+        self.assertEqual(resp.status_code, 200)
+
+
+class AgencyFuelETagTests(TestCase):
+    """Fuel / spares move through ``.update(F(...))``; the sheet's
+    ``ftlFuel`` / ``ftlSpares`` must still revalidate to a fresh 200."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("fuel_gm", "gm@example.com", "pw")
+        self.agency = Agency.objects.create(name="Fuel Agency", ftl_fuel=20, ftl_spares=20)
+        self.sol = StarSystem.objects.create(
+            name="Fuel Sol", x=0, y=0, z=0, distance=0, spectral_type="G2V",
+            claimed_by=self.agency, resources={"helium3": 50},
+        )
+        settings = SiteSettings.load()
+        settings.show_ftl_jumps = True
+        settings.jump_economy_config = {
+            "base_fuel": 5, "base_spares": 2, "wear_tick": 1,
+            "fuel_keys": ["helium3"], "spares_keys": ["metals"],
+        }
+        settings.save()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = f"/api/agencies/{self.agency.id}/"
+        self.client.get(self.url)
+
+    def _changed(self, etag):
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_extract_busts_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        resp = self.client.post(
+            f"/api/starmap/systems/{self.sol.id}/extract/",
+            data=json.dumps({"agencyId": self.agency.id, "resourceKey": "helium3", "amount": 4}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(self._changed(etag)["ftlFuel"], 24)
+
+    def test_jump_debit_busts_the_etag(self):
+        stype = ShipType.objects.create(key="fuel_hull", name="Hull", min_size=1, max_size=10)
+        drive = ShipModule.objects.create(key="fuel_ftl", name="FTL", provides_ftl=True)
+        cls = StarshipClass.objects.create(name="Fuel Class", ship_type=stype, size=3)
+        ClassModule.objects.create(starship_class=cls, module=drive, quantity=1)
+        ship = Starship.objects.create(
+            name="Tanker", starship_class=cls, agency=self.agency,
+            status="active", maintenance_state=100, location=self.sol,
+        )
+        near = StarSystem.objects.create(
+            name="Fuel Near", x=1, y=0, z=0, distance=1, spectral_type="M5V",
+        )
+        etag = self.client.get(self.url)["ETag"]
+        resp = self.client.post(
+            f"/api/starships/ships/{ship.id}/jump/",
+            data=json.dumps({"target_system_id": near.id}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        sheet = self._changed(etag)
+        self.assertEqual((sheet["ftlFuel"], sheet["ftlSpares"]), (15, 18))
@@ -0,0 +1,98 @@
+"""Query budget of the council list and the vote endpoint.
+
+``serialize_council_items`` loads the council members once and prefetches
+every item's votes, so ``GET /api/council/`` costs the same number of
+queries for two items as for twenty. A vote serializes its item once and
+broadcasts that payload instead of re-serializing.
+"""
+
+import json
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from agencies.models import Agency, Base, CouncilItem, CouncilVote
+from characters.models import Character
+
+
+class CouncilQueryTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("council_admin", "a@example.com", "pw")
+        self.members = [
+            Agency.objects.create(
+                name=f"Member {i}", is_council_member=True, is_council_present=True,
+                is_council_chairman=(i == 0),
+            )
+            for i in range(4)
+        ]
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def _add_items(self, count):
+        for n in range(count):
+            ci = CouncilItem.objects.create(name=f"Item {n}", status="voting")
+            for agency, vote in zip(self.members, ("for", "against", "for")):
+                CouncilVote.objects.create(council_item=ci, agency=agency, vote=vote)
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/council/")
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_list_query_count_is_flat(self):
+        self._add_items(2)
+        self._list_queries()  # warm the per-process caches (site settings, ...)
+        few, _ = self._list_queries()
+        self._add_items(10)
+        many, items = self._list_queries()
+        self.assertEqual(few, many)
+        self.assertEqual(len(items), 12)
+        tally = items[0]["tally"]
+        self.assertEqual((tally["votesFor"], tally["votesAgainst"]), (2, 1))
+        self.assertEqual(tally["result"], "passed")
+        self.assertEqual(tally["chairmanAgencyId"], self.members[0].id)
+
+    @patch("agencies.views._broadcast_council_item")
+    def test_vote_broadcasts_the_serialized_item(self, broadcast):
+        ci = CouncilItem.objects.create(
+            name="Motion", status="voting", predicted_votes={"x": "for"},
+        )
+        response = self.client.post(
+            f"/api/council/{ci.pk}/vote/",
+            data=json.dumps({"agencyId": self.members[1].id, "vote": "against"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        (item,), _ = broadcast.call_args
+        self.assertEqual(item["votes"][0]["vote"], "against")
+        self.assertNotIn("predictedVotes", item)  # goes to every player
+        self.assertEqual(response.json()["predictedVotes"], {"x": "for"})
+
+    @patch("agencies.views._broadcast_council_item")
+    def test_player_vote_resolves_agency_from_workspaces(self, broadcast):
+        player = User.objects.create_user("council_fixer", "f@example.com", "pw")
+        char = Character.objects.create(owner=player, name="Fixer", character_class="fixer")
+        agency = self.members[2]
+        agency.is_player_agency = True
+        agency.save()
+        Base.objects.create(
+            agency=agency, name="HQ",
+            workspaces=[{"level": 1, "assignedType": "character", "assignedTo": char.id}],
+        )
+        ci = CouncilItem.objects.create(name="Motion", status="voting")
+        client = Client()
+        client.force_login(player)
+
+        def vote(agency_id):
+            return client.post(
+                f"/api/council/{ci.pk}/vote/",
+                data=json.dumps({"agencyId": agency_id, "vote": "for"}),
+                content_type="application/json",
+            )
+
+        self.assertEqual(vote(self.members[1].id).status_code, 403)
+        self.assertEqual(vote(agency.id).status_code, 200)
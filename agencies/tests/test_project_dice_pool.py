@@ -0,0 +1,41 @@
+"""Roll odds on ``_compute_project_dice_pool`` (``computedPool.odds``).
+
+The odds mirror ``api_project_roll``: at least one die, the project's
+X-again, and +2 automatic successes when a child prodigy is assigned.
+"""
+
+from django.test import SimpleTestCase
+
+from agencies.models import Agency
+from agencies.serializers import _compute_project_dice_pool
+from exodus import dice as dice_engine
+
+
+class ProjectDicePoolOddsTests(SimpleTestCase):
+    def setUp(self):
+        self.agency = Agency(name="Odds Agency", attributes={"power": {"mental": 4}})
+
+    def _pool(self, **project):
+        project.setdefault("dicePoolConfig", {"agencyAttributes": [["power", "mental"]]})
+        return _compute_project_dice_pool(project, self.agency, {}, [])
+
+    def test_odds_match_exact_distribution(self):
+        computed = self._pool()
+        self.assertEqual(computed["pool"], 4)
+        self.assertAlmostEqual(
+            computed["odds"]["at_least_3"],
+            dice_engine.p_at_least(3, 4, chance_die=False),
+            places=4,
+        )
+
+    def test_reroll_threshold_and_prodigy(self):
+        plain = self._pool()["odds"]
+        eight = self._pool(rerollThreshold=8)["odds"]
+        self.assertGreater(eight["at_least_5"], plain["at_least_5"])
+
+        prodigy = self._pool(assignedProdigyId=7)["odds"]
+        self.assertEqual(prodigy["at_least_1"], 1.0)
+        self.assertEqual(prodigy["at_least_5"], plain["at_least_3"])
+        self.assertAlmostEqual(
+            prodigy["expected_successes"], plain["expected_successes"] + 2, places=1,
+        )
@@ -0,0 +1,85 @@
+"""Agency projects stored as ``AgencyProject`` rows.
+
+``Agency.projects`` still reads and writes the old list shape, but each
+project is its own row with its own version: a per-project endpoint
+writes only its project, so writers to different projects never collide.
+"""
+
+import json
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+
+from agencies.models import Agency, AgencyProject
+from agencies.views import _with_project_write
+
+
+def _versions(agency):
+    return list(
+        AgencyProject.objects.filter(agency=agency).values_list("version", flat=True)
+    )
+
+
+class ProjectRowTests(TestCase):
+    def setUp(self):
+        self.agency = Agency.objects.create(
+            name="Row Agency",
+            projects=[
+                {"name": "Alpha", "completionScore": 0, "fringe": True},
+                {"name": "Beta", "completionScore": 0, "fringe": True},
+            ],
+        )
+
+    def test_list_round_trips_through_rows(self):
+        self.assertEqual(AgencyProject.objects.filter(agency=self.agency).count(), 2)
+        self.agency.projects[1]["completionScore"] = 4
+        self.agency.save(update_fields=["projects"])
+        self.assertEqual(_versions(self.agency), [0, 1])  # Alpha untouched
+
+        self.agency.projects = [{"name": "Gamma"}]
+        self.agency.save()
+        self.agency.refresh_from_db()
+        self.assertEqual(self.agency.projects, [{"name": "Gamma"}])
+        self.assertEqual(_versions(self.agency), [1])
+
+    def test_write_touches_only_its_project(self):
+        def bump(index):
+            def _mutate(projects, _agency):
+                projects[index] = {**projects[index], "completionScore": 3}
+                return projects
+            return _mutate
+
+        # A stale copy of the agency still writes project 1 cleanly after
+        # another writer has changed project 0.
+        stale = Agency.objects.get(pk=self.agency.pk)
+        self.assertTrue(_with_project_write(self.agency, 0, bump(0)).ok)
+        result = _with_project_write(stale, 1, bump(1), expected_version=0)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.new_version, 1)
+
+        self.agency.refresh_from_db()
+        self.assertEqual([p["completionScore"] for p in self.agency.projects], [3, 3])
+        self.assertEqual(_versions(self.agency), [1, 1])
+        self.assertEqual(self.agency.section_versions["projects"], 2)
+
+        conflict = _with_project_write(self.agency, 0, bump(0), expected_version=0)
+        self.assertTrue(conflict.conflict)
+        self.assertEqual(conflict.current_version, 1)
+
+    def test_section_patch_writes_rows(self):
+        User.objects.create_superuser("rows_admin", "r@example.com", "pw")
+        client = Client()
+        client.login(username="rows_admin", password="pw")
+        resp = client.patch(
+            f"/api/agencies/{self.agency.id}/section/projects/",
+            data=json.dumps({"projects": [
+                {"name": "Alpha", "completionScore": 0, "fringe": True},
+                {"name": "Beta", "completionScore": 2, "fringe": True},
+                {"name": "Gamma", "completionScore": 0},
+            ]}),
+            content_type="application/json",
+            HTTP_IF_MATCH="0",
+        )
+        self.assertEqual(resp.status_code, 200, msg=resp.content)
+        self.assertEqual([p["name"] for p in resp.json()["projects"]], ["Alpha", "Beta", "Gamma"])
+        self.assertEqual(_versions(self.agency), [0, 1, 0])
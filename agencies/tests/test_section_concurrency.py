@@ -24,6 +24,7 @@ per-base monotonic version counter. These tests prove:
 import json
 import os
 import threading
+import time
 import unittest
 from concurrent.futures import ThreadPoolExecutor
 
@@ -839,11 +840,10 @@ class ConcurrentBaseFacilityWriteTests(LiveServerTestCase):
 # concurrency contract to per-project endpoints).
 #
 # Every per-project endpoint (fringe-effect, stimulants, dark-grants,
-# unlock, prodigy assign/unassign, complete, roll, ...) shares the
-# ``projects`` section version slot via ``_with_projects_cas``. The
-# trade-off is that two concurrent writers to *different* projects
-# share one slot — force-writes silently retry up to 5 times so
-# the user sees a 200; If-Match writes 409 immediately.
+# unlock, prodigy assign/unassign, complete, roll, ...) writes its own
+# AgencyProject row via ``_with_project_write`` and bumps the shared
+# ``projects`` section version slot, so a stale whole-list PATCH still
+# 409s. Writers to *different* projects never conflict.
 # ---------------------------------------------------------------------------
 
 
@@ -1246,9 +1246,9 @@ class ConcurrentProjectWriteTests(LiveServerTestCase):
             )
 
     def test_concurrent_per_project_force_writes_both_succeed(self):
-        """Force-writes (no If-Match) on per-project endpoints retry on
-        CAS miss, so concurrent edits to *different* projects should
-        both eventually succeed without lost updates. This is the
+        """Force-writes (no If-Match) on per-project endpoints each touch
+        only their own project row, so concurrent edits to *different*
+        projects both succeed without lost updates. This is the
         legacy compat path: existing UI sites don't send If-Match yet,
         so the server must absorb the race for them."""
         session_a = requests.Session()
@@ -1305,3 +1305,144 @@ class ConcurrentProjectWriteTests(LiveServerTestCase):
         self.assertTrue(self.agency.projects[1].get("sleepDeprivation"))
         # Version slot bumped twice — once per edit.
         self.assertEqual(self.agency.section_versions.get("projects"), 2)
+
+
+class DisjointSectionThroughputTests(LiveServerTestCase):
+    """Throughput benchmark for per-section version columns.
+
+    N admins each hammer a *different* section of one agency (and of one
+    base) with If-Match writes, all at once. Every section's CAS pins only
+    its own counter, so every write must land: zero 409s, and each
+    section's version ends at exactly the number of writes made to it.
+    """
+
+    WRITES_PER_SECTION = 5
+
+    AGENCY_SECTIONS = {
+        "notes": lambda i: {"notes": f"notes {i}"},
+        "integrity": lambda i: {"integrity": i},
+        "merits": lambda i: {"merits": [{"name": f"Merit {i}", "value": 1}]},
+        "flaws": lambda i: {"flaws": [{"name": f"Flaw {i}", "value": 1}]},
+        "assets": lambda i: {"assets": [{"name": f"Asset {i}"}]},
+        "fleet": lambda i: {"fleet": [{"shipClass": "Frigate", "quantity": i}]},
+        "history": lambda i: {"history": [{"year": 2200 + i}]},
+        "specializations": lambda i: {"specializations": [{"name": f"Spec {i}"}]},
+    }
+
+    BASE_SECTIONS = {
+        "name": lambda i: {"name": f"Hub {i}"},
+        "notes": lambda i: {"notes": f"log {i}"},
+        "location": lambda i: {"locationType": ("safe_house", "military_base")[i % 2]},
+        "geo": lambda i: {"latitude": float(i), "longitude": float(-i)},
+        "classified": lambda i: {"classified": ["facilities"] if i % 2 else []},
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._old_token = os.environ.pop("MCP_API_TOKEN", None)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls._old_token is not None:
+            os.environ["MCP_API_TOKEN"] = cls._old_token
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        _make_user("bench_admin", is_superuser=True)
+        self.agency = Agency.objects.create(name="Bench Agency", is_player_agency=True)
+        self.base = Base.objects.create(
+            agency=self.agency, name="Bench Hub", location_type="military_base",
+        )
+
+    def _session(self):
+        session = requests.Session()
+        login_url = f"{self.live_server_url}/accounts/login/"
+        session.get(login_url)
+        token = session.cookies.get("csrftoken")
+        resp = session.post(
+            login_url,
+            data={
+                "username": "bench_admin", "password": "testpass123",
+                "csrfmiddlewaretoken": token,
+            },
+            headers={"Referer": login_url},
+            allow_redirects=False,
+        )
+        self.assertIn(resp.status_code, (200, 302))
+        return session
+
+    def _hammer(self, url_for, sections):
+        """Run one thread per section, each making WRITES_PER_SECTION
+        If-Match writes. Returns ({section: [status, ...]}, seconds)."""
+        sessions = {key: self._session() for key in sections}
+        barrier = threading.Barrier(len(sections))
+
+        def writer(key):
+            session = sessions[key]
+            headers = {
+                "Content-Type": "application/json",
+                "X-CSRFToken": session.cookies.get("csrftoken"),
+                "Referer": self.live_server_url + "/",
+            }
+            version = 0
+            statuses = []
+            barrier.wait(timeout=10)
+            for i in range(self.WRITES_PER_SECTION):
+                resp = session.patch(
+                    url_for(key),
+                    data=json.dumps(sections[key](i + 1)),
+                    headers={**headers, "If-Match": str(version)},
+                )
+                statuses.append(resp.status_code)
+                if resp.status_code == 200:
+                    version = resp.json()["version"]
+            return statuses
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(sections)) as pool:
+            futures = {key: pool.submit(writer, key) for key in sections}
+            results = {key: future.result(timeout=60) for key, future in futures.items()}
+        return results, time.monotonic() - started
+
+    def _assert_no_conflicts(self, results, elapsed):
+        writes = sum(len(statuses) for statuses in results.values())
+        conflicts = {
+            key: statuses for key, statuses in results.items()
+            if any(status != 200 for status in statuses)
+        }
+        self.assertEqual(
+            conflicts, {},
+            msg=(
+                f"{writes} disjoint-section writes in {elapsed:.2f}s "
+                f"({writes / elapsed:.0f}/s) must all be 200"
+            ),
+        )
+
+    def test_agency_disjoint_sections_never_conflict(self):
+        url = f"{self.live_server_url}/api/agencies/{self.agency.id}/section/{{}}/"
+        results, elapsed = self._hammer(url.format, self.AGENCY_SECTIONS)
+        self._assert_no_conflicts(results, elapsed)
+
+        self.agency.refresh_from_db()
+        self.assertEqual(
+            self.agency.section_versions,
+            {key: self.WRITES_PER_SECTION for key in self.AGENCY_SECTIONS},
+        )
+        self.assertEqual(self.agency.notes, f"notes {self.WRITES_PER_SECTION}")
+
+    def test_base_disjoint_sections_never_conflict(self):
+        url = (
+            f"{self.live_server_url}/api/agencies/{self.agency.id}/"
+            f"bases/{self.base.id}/section/{{}}/"
+        )
+        results, elapsed = self._hammer(url.format, self.BASE_SECTIONS)
+        self._assert_no_conflicts(results, elapsed)
+
+        # One shared base counter: every write bumped it exactly once.
+        self.base.refresh_from_db()
+        self.assertEqual(
+            self.base.version, self.WRITES_PER_SECTION * len(self.BASE_SECTIONS),
+        )
+        self.assertEqual(self.base.name, f"Hub {self.WRITES_PER_SECTION}")
@@ -0,0 +1,80 @@
+"""Tests for the ``WorkspaceAssignment`` character→agency lookup table.
+
+``Base.workspaces`` stays the source of truth; the table mirrors its
+character slots so ``starmap.views._get_user_agency`` (and every helper
+that reuses it) is one indexed query instead of a walk over every base.
+"""
+
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from agencies.models import Agency, Base, WorkspaceAssignment
+from characters.models import Character
+from starmap.views import _get_user_agency
+
+
+def _slot(char, level=1):
+    return {"level": level, "assignedType": "character", "assignedTo": char.id}
+
+
+class WorkspaceAssignmentSyncTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("ws_admin", "a@example.com", "pw")
+        self.player = User.objects.create_user("ws_player", "p@example.com", "pw")
+        self.char = Character.objects.create(owner=self.player, name="Operative")
+        self.agency = Agency.objects.create(name="Lookup Agency", is_player_agency=True)
+        self.base = Base.objects.create(agency=self.agency, name="Station")
+
+    def _fresh_user(self):
+        # _get_user_agency memoises on the user object, like request.user.
+        return User.objects.get(pk=self.player.pk)
+
+    def test_save_mirrors_character_slots(self):
+        self.assertIsNone(_get_user_agency(self._fresh_user()))
+
+        self.base.workspaces = [
+            _slot(self.char, level=2),
+            {"level": 1, "assignedType": "npc", "assignedTo": 99},
+            {"level": 1, "assignedType": "character", "assignedTo": 987654},  # deleted char
+        ]
+        self.base.save()
+        row = WorkspaceAssignment.objects.get()
+        self.assertEqual((row.character_id, row.agency_id, row.level), (self.char.id, self.agency.id, 2))
+        self.assertEqual(_get_user_agency(self._fresh_user()), self.agency)
+
+        self.base.workspaces = []
+        self.base.save(update_fields=["workspaces"])
+        self.assertFalse(WorkspaceAssignment.objects.exists())
+        self.assertIsNone(_get_user_agency(self._fresh_user()))
+
+    def test_section_patch_keeps_table_in_sync(self):
+        client = Client()
+        client.force_login(self.admin)
+        resp = client.patch(
+            f"/api/agencies/{self.agency.id}/bases/{self.base.id}/section/workspaces/",
+            data=json.dumps({"workspaces": [_slot(self.char)]}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(_get_user_agency(self._fresh_user()), self.agency)
+
+    def test_non_player_agency_is_ignored(self):
+        npc_agency = Agency.objects.create(name="A NPC Agency", is_player_agency=False)
+        Base.objects.create(agency=npc_agency, name="AAA", workspaces=[_slot(self.char)])
+        self.assertIsNone(_get_user_agency(self._fresh_user()))
+
+    def test_resolution_is_one_query_and_memoised(self):
+        for i in range(20):
+            Base.objects.create(agency=self.agency, name=f"Empty {i}")
+        self.base.workspaces = [_slot(self.char)]
+        self.base.save()
+
+        user = self._fresh_user()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(_get_user_agency(user), self.agency)
+            self.assertEqual(_get_user_agency(user), self.agency)
+        self.assertEqual(len(ctx.captured_queries), 1)
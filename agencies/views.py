@@ -9,10 +9,15 @@ from django.db.models import F
 from django.http import HttpResponseForbidden, JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
 
-from .models import Agency, ChangeRequest, GlobalFlaw, FTLProject, AgencyFTLProject, CouncilItem, CouncilVote, BaseConfig, Base, AgencyStatLog, ProjectRollLog
+from exodus import dice as dice_engine
+from exodus.etags import instance_digest, make_etag, rows_digest, table_stamps
+
+from .models import AGENCY_SECTION_VERSION_FIELDS, BASE_SECTION_VERSION_FIELDS, Agency, AgencyProject, ChangeRequest, GlobalFlaw, FTLProject, AgencyFTLProject, CouncilItem, CouncilVote, BaseConfig, Base, AgencyStatLog, ProjectRollLog, WorkspaceAssignment
 from .serializers import (
     serialize_agency,
     serialize_agency_summary,
@@ -23,9 +28,11 @@ from .serializers import (
     serialize_ftl_project,
     serialize_agency_ftl_project,
     serialize_council_item,
+    serialize_council_items,
     serialize_base,
     serialize_base_config,
     build_vote_record,
+    council_members,
 )
 
 COUNCIL_GROUP = "council_votes"
@@ -50,18 +57,42 @@ def _require_fixer(user):
     return None
 
 
-def _broadcast_council_item(ci):
-    """Broadcast an updated council item to all WebSocket clients."""
+def _broadcast_council_item(item):
+    """Broadcast an already-serialized council item to all WebSocket clients."""
     channel_layer = get_channel_layer()
     async_to_sync(channel_layer.group_send)(
         COUNCIL_GROUP,
         {
             "type": "council_update",
-            "item": serialize_council_item(ci, request.user),
+            "group": COUNCIL_GROUP,
+            "item": item,
         },
     )
 
 
+def _publish_council_item(request, ci, members=None):
+    """Serialize ``ci`` once, broadcast it and return it as the response.
+
+    The broadcast goes to every player, so it is the user-agnostic
+    payload; superusers get ``predictedVotes`` added to their copy.
+    """
+    data = serialize_council_item(ci, members=members)
+    _broadcast_council_item(data)
+    if request.user.is_superuser and ci.predicted_votes:
+        data = {**data, "predictedVotes": ci.predicted_votes}
+    return JsonResponse(data)
+
+
+def _user_is_council_chairman(user):
+    """True iff one of ``user``'s characters works at the chairman agency
+    (a player agency)."""
+    return WorkspaceAssignment.objects.filter(
+        character__owner=user,
+        agency__is_player_agency=True,
+        agency__is_council_chairman=True,
+    ).exists()
+
+
 # ---------------------------------------------------------------------------
 # Page views (return HTML)
 # ---------------------------------------------------------------------------
@@ -166,23 +197,8 @@ def council_page(request):
     user_agency = None
     is_chairman = False
     if not request.user.is_superuser:
-        char_ids = set(
-            request.user.characters.values_list("id", flat=True)
-        )
-        if char_ids:
-            for base in Base.objects.filter(
-                agency__is_player_agency=True
-            ).select_related("agency"):
-                for ws in base.workspaces or []:
-                    if (
-                        ws.get("assignedType") == "character"
-                        and ws.get("assignedTo") in char_ids
-                    ):
-                        user_agency = base.agency
-                        is_chairman = base.agency.is_council_chairman
-                        break
-                if user_agency:
-                    break
+        user_agency = WorkspaceAssignment.agency_for_user(request.user)
+        is_chairman = bool(user_agency and user_agency.is_council_chairman)
     agencies_qs = Agency.objects.order_by("name")
     if not request.user.is_superuser:
         agencies_qs = agencies_qs.filter(is_hidden=False)
@@ -207,7 +223,7 @@ def council_charter_page(request):
     """UIC Charter page. Readable by all logged-in users."""
     from exodus.models import SiteSettings
 
-    site = SiteSettings.load()
+    site = SiteSettings.for_request(request)
     charter_content = site.charter_text
     # Fallback to file if DB is empty (first-time migration)
     if not charter_content:
@@ -251,10 +267,61 @@ def api_agency_list(request):
     return JsonResponse(serialize_agency(agency, request.user), status=201)
 
 
+def _agency_detail_etag(request, agency):
+    """Version stamp for a GET of ``api_agency_detail``.
+
+    ``serialize_agency`` reads far more than the agency row (bases, council
+    items and votes, every character and NPC, public scan records, …), so
+    the stamp covers each of those tables: one ``UNION ALL`` aggregate plus
+    digests of the two small per-agency tables that carry no timestamp.
+    """
+    from characters.models import Character, XpTransferLog
+    from exodus.models import SiteSettings
+    from npcs.models import NPC
+    from starmap.models import AgencyScan, PublicScanRecord
+    from .models import AgencyCondition, BaseXpLog
+
+    stamps = table_stamps([
+        ("agencies", Agency.objects.all(), "updated_at"),
+        ("bases", Base.objects.filter(agency=agency), "updated_at", "version"),
+        ("base_config", BaseConfig.objects.all(), "updated_at"),
+        ("global_flaws", GlobalFlaw.objects.all(), "updated_at"),
+        ("council_items", CouncilItem.objects.all(), "updated_at"),
+        ("council_votes", CouncilVote.objects.all(), "voted_at"),
+        ("ftl_projects", FTLProject.objects.all(), "updated_at"),
+        ("characters", Character.objects.all(), "updated_at"),
+        ("npcs", NPC.objects.all(), "updated_at"),
+        ("scans", AgencyScan.objects.filter(agency=agency), "scanned_at", "current_successes"),
+        ("public_records", PublicScanRecord.objects.all(), "published_at"),
+        ("xp_transfers", XpTransferLog.objects.filter(agency=agency), "created_at"),
+        ("base_xp", BaseXpLog.objects.filter(agency=agency), "created_at"),
+    ])
+    return make_etag(
+        "agency", agency.pk, request.user.pk, request.user.is_superuser,
+        # Every column of the agency row itself: fuel, integrity, XP, ... are
+        # also written by bare ``.update()`` calls that leave updated_at alone.
+        instance_digest(agency), stamps,
+        rows_digest(
+            AgencyCondition.objects.filter(agency=agency),
+            *[f.attname for f in AgencyCondition._meta.concrete_fields],
+        ),
+        rows_digest(
+            AgencyFTLProject.objects.filter(agency=agency),
+            *[f.attname for f in AgencyFTLProject._meta.concrete_fields],
+        ),
+        instance_digest(SiteSettings.for_request(request)),
+    )
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
 @require_http_methods(["GET", "PUT", "DELETE"])
 def api_agency_detail(request, pk):
-    """GET: full agency data. PUT: update (admin only). DELETE: admin only."""
+    """GET: full agency data. PUT: update (admin only). DELETE: admin only.
+
+    GET carries a strong ETag (``_agency_detail_etag``); a matching
+    ``If-None-Match`` returns 304 without serializing the sheet.
+    """
     agency = get_object_or_404(Agency, pk=pk)
 
     if agency.is_hidden and not request.user.is_superuser:
@@ -263,7 +330,13 @@ def api_agency_detail(request, pk):
         )
 
     if request.method == "GET":
-        return JsonResponse(serialize_agency(agency, request.user))
+        etag = _agency_detail_etag(request, agency)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = JsonResponse(serialize_agency(agency, request.user))
+        response["ETag"] = etag
+        return response
 
     # PUT / DELETE — admin only
     if not request.user.is_superuser:
@@ -754,8 +827,7 @@ def api_agency_ftl_detail(request, pk, assignment_id):
 def api_council_list(request):
     """GET: list all council items. POST: create a new one (admin only)."""
     if request.method == "GET":
-        items = CouncilItem.objects.all()
-        data = [serialize_council_item(ci, request.user) for ci in items]
+        data = serialize_council_items(CouncilItem.objects.all(), request.user)
         return JsonResponse(data, safe=False)
 
     # POST — fixer class required
@@ -764,23 +836,7 @@ def api_council_list(request):
         return denied
     if not request.user.is_superuser:
         # Check the user has an agency (via character workspace assignment)
-        char_ids = set(
-            request.user.characters.values_list("id", flat=True)
-        )
-        user_agency = None
-        if char_ids:
-            for base in Base.objects.filter(
-                agency__is_player_agency=True
-            ).select_related("agency"):
-                for ws in base.workspaces or []:
-                    if (
-                        ws.get("assignedType") == "character"
-                        and ws.get("assignedTo") in char_ids
-                    ):
-                        user_agency = base.agency
-                        break
-                if user_agency:
-                    break
+        user_agency = WorkspaceAssignment.agency_for_user(request.user)
         if not user_agency:
             return JsonResponse(
                 {"error": "ACCESS DENIED. No agency affiliation found."},
@@ -832,23 +888,7 @@ def api_council_detail(request, pk):
                 status=403,
             )
         # Find the user's agency
-        char_ids = set(
-            request.user.characters.values_list("id", flat=True)
-        )
-        user_agency = None
-        if char_ids:
-            for base in Base.objects.filter(
-                agency__is_player_agency=True
-            ).select_related("agency"):
-                for ws in base.workspaces or []:
-                    if (
-                        ws.get("assignedType") == "character"
-                        and ws.get("assignedTo") in char_ids
-                    ):
-                        user_agency = base.agency
-                        break
-                if user_agency:
-                    break
+        user_agency = WorkspaceAssignment.agency_for_user(request.user)
         user_agency_name = user_agency.name if user_agency else None
         is_chairman = user_agency.is_council_chairman if user_agency else False
 
@@ -866,15 +906,13 @@ def api_council_detail(request, pk):
                 if ci.status == "proposed" and new_status == "voting":
                     ci.status = "voting"
                     ci.save()
-                    _broadcast_council_item(ci)
-                    return JsonResponse(serialize_council_item(ci, request.user))
+                    return _publish_council_item(request, ci)
                 # voting → emergency_suspended
                 if ci.status == "voting" and new_status == "emergency_suspended":
                     ci.vote_record = build_vote_record(ci)
                     ci.status = "emergency_suspended"
                     ci.save()
-                    _broadcast_council_item(ci)
-                    return JsonResponse(serialize_council_item(ci, request.user))
+                    return _publish_council_item(request, ci)
 
             # Own proposal editing (proposed status only)
             if (
@@ -939,8 +977,7 @@ def api_council_detail(request, pk):
             ci.predicted_votes = data["predictedVotes"]
 
         ci.save()
-        _broadcast_council_item(ci)
-        return JsonResponse(serialize_council_item(ci, request.user))
+        return _publish_council_item(request, ci)
 
     if request.method == "DELETE":
         ci.delete()
@@ -956,25 +993,7 @@ def api_council_reorder(request):
         return denied
     if not request.user.is_superuser:
         # Check the user's agency is chairman
-        char_ids = set(
-            request.user.characters.values_list("id", flat=True)
-        )
-        is_chairman = False
-        if char_ids:
-            for base in Base.objects.filter(
-                agency__is_player_agency=True,
-                agency__is_council_chairman=True,
-            ).select_related("agency"):
-                for ws in base.workspaces or []:
-                    if (
-                        ws.get("assignedType") == "character"
-                        and ws.get("assignedTo") in char_ids
-                    ):
-                        is_chairman = True
-                        break
-                if is_chairman:
-                    break
-        if not is_chairman:
+        if not _user_is_council_chairman(request.user):
             return JsonResponse(
                 {"error": "ACCESS DENIED. Chairman clearance required."},
                 status=403,
@@ -990,9 +1009,8 @@ def api_council_reorder(request):
     for entry in items:
         CouncilItem.objects.filter(pk=entry["id"]).update(order=entry["order"])
 
-    all_items = CouncilItem.objects.all()
     return JsonResponse(
-        [serialize_council_item(ci, request.user) for ci in all_items], safe=False
+        serialize_council_items(CouncilItem.objects.all(), request.user), safe=False
     )
 
 
@@ -1031,23 +1049,7 @@ def api_council_vote(request, pk):
 
     # Permission check: admin can vote for any agency, players only their own
     if not request.user.is_superuser:
-        char_ids = set(
-            request.user.characters.values_list("id", flat=True)
-        )
-        user_agency = None
-        if char_ids:
-            for base in Base.objects.filter(
-                agency__is_player_agency=True
-            ).select_related("agency"):
-                for ws in base.workspaces or []:
-                    if (
-                        ws.get("assignedType") == "character"
-                        and ws.get("assignedTo") in char_ids
-                    ):
-                        user_agency = base.agency
-                        break
-                if user_agency:
-                    break
+        user_agency = WorkspaceAssignment.agency_for_user(request.user)
         if not user_agency or user_agency.id != agency.id:
             return JsonResponse(
                 {"error": "ACCESS DENIED. You can only vote for your own agency."},
@@ -1060,14 +1062,14 @@ def api_council_vote(request, pk):
         defaults={"vote": vote_value},
     )
 
-    # Auto-transition: if all present members have voted, resolve the vote
-    total_present = Agency.objects.filter(
-        is_council_member=True, is_council_present=True
-    ).count()
+    # Auto-transition: if all present members have voted, resolve the vote.
+    # One member list serves the check, the record and the response.
+    members = council_members()
+    total_present = sum(1 for m in members if m.is_council_present)
     total_voted = ci.votes.count()
     if total_present > 0 and total_voted >= total_present:
         # Build the final record and determine outcome
-        record = build_vote_record(ci)
+        record = build_vote_record(ci, members)
         result = record["tally"]["result"]
         ci.vote_record = record
         if result in ("passed", "passed_chairman"):
@@ -1078,9 +1080,7 @@ def api_council_vote(request, pk):
         ci.save()
 
     # Return updated item with votes and broadcast to all clients
-    ci.refresh_from_db()
-    _broadcast_council_item(ci)
-    return JsonResponse(serialize_council_item(ci, request.user))
+    return _publish_council_item(request, ci, members)
 
 
 # ---------------------------------------------------------------------------
@@ -1137,25 +1137,7 @@ def api_council_toggle_presence(request, pk):
         return denied
     if not request.user.is_superuser:
         # Check if user is chairman
-        char_ids = set(
-            request.user.characters.values_list("id", flat=True)
-        )
-        is_chairman = False
-        if char_ids:
-            for base in Base.objects.filter(
-                agency__is_player_agency=True,
-                agency__is_council_chairman=True,
-            ).select_related("agency"):
-                for ws in base.workspaces or []:
-                    if (
-                        ws.get("assignedType") == "character"
-                        and ws.get("assignedTo") in char_ids
-                    ):
-                        is_chairman = True
-                        break
-                if is_chairman:
-                    break
-        if not is_chairman:
+        if not _user_is_council_chairman(request.user):
             return JsonResponse(
                 {"error": "ACCESS DENIED. Chairman clearance required."},
                 status=403,
@@ -1391,6 +1373,10 @@ def api_agency_base_detail(request, pk, base_id):
 
         if sections_touched:
             base.version = (base.version or 0) + 1
+            for section_key in sections_touched:
+                version_field = BASE_SECTION_VERSION_FIELDS[section_key]
+                setattr(base, version_field, base.version)
+                update_fields.add(version_field)
             base.save(update_fields=list(update_fields))
         else:
             # Nothing changed — still call save() to update updated_at? No,
@@ -1515,11 +1501,10 @@ def api_condition_detail(request, pk, condition_id):
 def api_dark_grants(request, pk, project_index):
     """Activate Dark Grants on a fringe project. Science class only.
 
-    Concurrency: writes to ``agency.projects`` go through
-    ``_with_projects_cas`` which shares the ``projects`` section version
-    slot with every other per-project endpoint. Force-write semantics —
-    no If-Match required (legacy fetch sites). The internal retry covers
-    the typical "two writers to different projects" case.
+    Concurrency: the write goes through ``_with_project_write``, which
+    touches only this project's row — writers to other projects never
+    conflict with it. Force-write semantics — no If-Match required
+    (legacy fetch sites).
     """
     import random
 
@@ -1605,7 +1590,7 @@ def api_dark_grants(request, pk, project_index):
         new_list[project_index] = proj
         return new_list
 
-    result = _with_projects_cas(agency, _mutate)
+    result = _with_project_write(agency, project_index, _mutate)
     if result.response is not None:
         return result.response
     if result.conflict:
@@ -1740,7 +1725,7 @@ def api_live_testing(request, pk, project_index):
         new_list[project_index] = proj
         return new_list
 
-    result = _with_projects_cas(agency, _mutate)
+    result = _with_project_write(agency, project_index, _mutate)
     if result.response is not None:
         return result.response
     if result.conflict:
@@ -1892,7 +1877,7 @@ def api_stimulants(request, pk, project_index):
         new_list[project_index] = proj
         return new_list
 
-    cas = _with_projects_cas(agency, _mutate)
+    cas = _with_project_write(agency, project_index, _mutate)
     if cas.response is not None:
         return cas.response
     if cas.conflict:
@@ -1918,7 +1903,7 @@ def api_stimulants(request, pk, project_index):
 def api_stimulants_unlock(request, pk, project_index):
     """GM unlocks a stimulant-locked project after completion roll.
 
-    Concurrency: routed through ``_with_projects_cas`` so a concurrent
+    Concurrency: routed through ``_with_project_write`` so a concurrent
     write to a different project doesn't lose this unlock.
     """
     if not request.user.is_superuser:
@@ -1941,7 +1926,7 @@ def api_stimulants_unlock(request, pk, project_index):
         new_list[project_index] = proj
         return new_list
 
-    cas = _with_projects_cas(agency, _mutate)
+    cas = _with_project_write(agency, project_index, _mutate)
     if cas.response is not None:
         return cas.response
     if cas.conflict:
@@ -2013,7 +1998,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2055,7 +2040,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2141,7 +2126,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2194,7 +2179,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2289,7 +2274,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2359,7 +2344,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2412,7 +2397,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2446,7 +2431,7 @@ def api_fringe_effect(request, pk, project_index):
             new_list[project_index] = proj
             return new_list
 
-        cas = _with_projects_cas(agency, _mutate)
+        cas = _with_project_write(agency, project_index, _mutate)
         if cas.response is not None:
             return cas.response
         if cas.conflict:
@@ -2556,8 +2541,8 @@ def api_complete_project(request, pk, project_index):
         new_list[project_index] = proj
         return (new_list, local_messages)
 
-    cas = _with_projects_cas(
-        agency, _mutate, extra_update_fields=("attributes", "integrity"),
+    cas = _with_project_write(
+        agency, project_index, _mutate, extra_update_fields=("attributes", "integrity"),
     )
     if cas.response is not None:
         return cas.response
@@ -2682,22 +2667,11 @@ def api_project_roll(request, pk, project_index):
             auto_merit_name = None  # Not a valid auto-success merit
 
     # Roll dice (WoD 2.0: d10, 8+ = success, reroll threshold from config)
-    reroll_threshold = int(project.get("rerollThreshold", 10) or 10)
-    successes = 0
-    rolls = []
-    dice_left = pool_size
-    while dice_left > 0:
-        batch = []
-        explosions = 0
-        for _ in range(dice_left):
-            die = random.randint(1, 10)
-            batch.append(die)
-            if die >= 8:
-                successes += 1
-            if die >= reroll_threshold:
-                explosions += 1
-        rolls.extend(batch)
-        dice_left = explosions
+    roll = dice_engine.roll(
+        pool_size, again=project.get("rerollThreshold", 10), chance_die=False,
+    )
+    successes = roll.successes
+    rolls = roll.faces
 
     # Add auto-successes from merit
     successes += auto_successes
@@ -2741,8 +2715,8 @@ def api_project_roll(request, pk, project_index):
         agency_inner.project_rolls = rolls_data
         return (new_list, score_before)
 
-    cas = _with_projects_cas(
-        agency, _mutate, extra_update_fields=("project_rolls",),
+    cas = _with_project_write(
+        agency, project_index, _mutate, extra_update_fields=("project_rolls",),
     )
     if cas.response is not None:
         return cas.response
@@ -3063,22 +3037,11 @@ def api_ftl_roll(request, pk, assignment_id):
             auto_merit_name = None
 
     # Roll
-    reroll_threshold = int(meta.get("rerollThreshold", 10) or 10)
-    successes = 0
-    rolls = []
-    dice_left = pool_size
-    while dice_left > 0:
-        batch = []
-        explosions = 0
-        for _ in range(dice_left):
-            die = random.randint(1, 10)
-            batch.append(die)
-            if die >= 8:
-                successes += 1
-            if die >= reroll_threshold:
-                explosions += 1
-        rolls.extend(batch)
-        dice_left = explosions
+    roll = dice_engine.roll(
+        pool_size, again=meta.get("rerollThreshold", 10), chance_die=False,
+    )
+    successes = roll.successes
+    rolls = roll.faces
 
     # Add auto-successes from merit
     successes += auto_successes
@@ -3284,8 +3247,10 @@ def api_downtime_action(request, pk):
 # adding different items to the same base would lose one write). The endpoints
 # below replace that with explicit version negotiation:
 #
-#   * Each agency section tracks a monotonic version in agency.section_versions
-#     (a JSON map). Per-base sections track their version on Base.version.
+#   * Each agency section tracks a monotonic version in its own column
+#     (``Agency.<section>_version``). Per-base sections share Base.version;
+#     ``Base.<section>_version`` records the version each section last
+#     changed at, so only a write to the same section is a conflict.
 #   * Clients send the expected current version in the If-Match header.
 #   * On mismatch the server returns 409 with {current_version, current_value}
 #     so the client can rebase and retry.
@@ -3315,17 +3280,9 @@ def _user_belongs_to_player_agency(user, agency):
         return True
     if not agency.is_player_agency:
         return False
-    char_ids = set(user.characters.values_list("id", flat=True))
-    if not char_ids:
-        return False
-    for base in agency.bases.all():
-        for ws in base.workspaces or []:
-            if (
-                ws.get("assignedType") == "character"
-                and ws.get("assignedTo") in char_ids
-            ):
-                return True
-    return False
+    return WorkspaceAssignment.objects.filter(
+        agency=agency, character__owner=user,
+    ).exists()
 
 
 def _admin_or_player_member(request, agency):
@@ -3398,17 +3355,14 @@ def _agency_section_patch(
         1. Read the agency, run perm + visibility checks against it.
         2. Call ``write_fn(agency, data)`` to mutate ``agency`` in memory and
            validate. ``write_fn`` MUST NOT call ``.save()``.
-        3. Build the new ``section_versions`` dict (bump only our key) and
-           emit a single ``UPDATE`` whose ``WHERE`` clause pins the row to
-           the *previous* ``section_versions`` value. The row count from
-           ``.update()`` is the CAS primitive: ``1`` = won, ``0`` = lost.
-
-    Trade-off (JSON-dict-CAS): the WHERE clause pins the *whole* JSON dict,
-    not just our key. So a concurrent write to a *different* section in the
-    same window will also fail our CAS with 409. That's stricter than the
-    contract requires, but it's correct (never silent-drops a write) and the
-    spurious-409 case is rare and recoverable (the client re-fetches and
-    retries). A migration to per-section columns would tighten this; deferred.
+        3. Emit a single ``UPDATE`` that bumps the section's version column
+           and whose ``WHERE`` clause pins that column to the *previous*
+           value. The row count from ``.update()`` is the CAS primitive:
+           ``1`` = won, ``0`` = lost.
+
+    Each section has its own version column, so the CAS only fails when
+    another write to the *same* section landed in between; writes to
+    different sections of one agency never 409 each other.
 
     Args:
         perm_check: ``callable(request, agency) -> Optional[JsonResponse]``.
@@ -3446,6 +3400,7 @@ def _agency_section_patch(
     # semantics). For If-Match writes a single CAS attempt is correct —
     # a CAS miss means a real concurrency conflict that the client must see.
     max_attempts = 1 if expected is not None else 5
+    version_field = AGENCY_SECTION_VERSION_FIELDS[section_key]
 
     for attempt in range(max_attempts):
         # Wrap each CAS attempt in an atomic block. This gives us a clean
@@ -3457,8 +3412,7 @@ def _agency_section_patch(
             # Re-read inside the transaction so retries — and our
             # CAS-snapshot — observe any concurrent commits.
             agency.refresh_from_db()
-            pre_versions = dict(agency.section_versions or {})
-            current = int(pre_versions.get(section_key, 0))
+            current = getattr(agency, version_field)
 
             if expected is not None and expected != current:
                 current_value = serialize_agency_section(
@@ -3472,26 +3426,30 @@ def _agency_section_patch(
                 return write_resp
 
             new_version = current + 1
-            new_versions = dict(pre_versions)
-            new_versions[section_key] = new_version
 
             # Build the kwargs for the UPDATE — only the columns the writer
             # touched plus our version bump and updated_at. Reading them off
             # the in-memory ``agency`` reflects whatever write_fn just set.
+            # ``projects`` is not a column (AgencyProject rows); it is
+            # written after the CAS lands, inside the same transaction.
             update_kwargs = {
-                field: getattr(agency, field) for field in extra_update_fields
+                field: getattr(agency, field)
+                for field in extra_update_fields
+                if field != "projects"
             }
-            update_kwargs["section_versions"] = new_versions
+            update_kwargs[version_field] = new_version
             update_kwargs["updated_at"] = timezone.now()
 
             # Atomic compare-and-swap. The WHERE pin makes the version
             # check happen at SQL level — no TOCTOU window even on SQLite.
             updated = Agency.objects.filter(
                 pk=agency.pk,
-                section_versions=pre_versions,
+                **{version_field: current},
             ).update(**update_kwargs)
 
             if updated:
+                if "projects" in extra_update_fields:
+                    agency.save_projects()
                 # Refresh once so the response reflects DB-canonical state
                 # (handles e.g. JSON normalisation by the backend).
                 agency.refresh_from_db()
@@ -3506,8 +3464,7 @@ def _agency_section_patch(
 
     # Lost the race (If-Match path, or force-write exhausted all retries).
     # Return canonical state in a 409 so the client can rebase and retry.
-    live_versions = agency.section_versions or {}
-    live_current = int(live_versions.get(section_key, 0))
+    live_current = getattr(agency, version_field)
     current_value = serialize_agency_section(
         agency, section_key, request.user
     )[section_key]
@@ -3535,11 +3492,17 @@ def _base_section_patch(
         2. Call ``write_fn(request, agency, base, data)`` to mutate ``base``
            in memory and run any cross-field validation. ``write_fn`` MUST
            NOT call ``.save()``.
-        3. Emit a single ``UPDATE`` whose ``WHERE`` clause pins ``version``
-           to the previously-read value. The row count is the CAS primitive.
-
-    Force-writes (no If-Match) retry the CAS on miss for last-writer-wins
-    semantics; If-Match writes attempt once and then 409.
+        3. Emit a single ``UPDATE`` that bumps ``version`` and stamps the
+           section's ``<section>_version`` column with the new value, with a
+           ``WHERE`` clause pinning that column to the previously-read
+           value. The row count is the CAS primitive.
+
+    ``version`` stays one counter per base (it is the ETag clients send
+    back), but a conflict is decided per section: an If-Match is stale only
+    if *this* section changed after it, so writes to different sections of
+    one base never 409 each other. Force-writes (no If-Match) retry the CAS
+    on miss for last-writer-wins semantics; If-Match writes attempt once
+    and then 409.
     """
     try:
         data = json.loads(request.body) if request.body else {}
@@ -3573,6 +3536,7 @@ def _base_section_patch(
     # Force-writes retry the CAS on miss. If-Match writes attempt once then
     # 409 — a CAS miss with a client-supplied expectation IS the conflict.
     max_attempts = 1 if expected is not None else 5
+    version_field = BASE_SECTION_VERSION_FIELDS[section_key]
 
     for attempt in range(max_attempts):
         # Wrap each CAS attempt in an atomic block. This gives us a clean
@@ -3588,7 +3552,8 @@ def _base_section_patch(
             # outer .get() and now.
             base.refresh_from_db()
             current = int(base.version or 0)
-            if expected is not None and expected != current:
+            changed_at = getattr(base, version_field)
+            if expected is not None and (expected > current or changed_at > expected):
                 current_value = serialize_base_section(
                     base, section_key
                 )[section_key]
@@ -3599,26 +3564,31 @@ def _base_section_patch(
             if write_resp is not None:
                 return write_resp
 
-            new_version = current + 1
-
             # Pull the writer's mutations off the in-memory ``base`` for the
-            # atomic UPDATE.
+            # atomic UPDATE. ``version`` is bumped in SQL: a write to another
+            # section may have landed since we read it.
             update_kwargs = {
                 field: getattr(base, field) for field in extra_update_fields
             }
-            update_kwargs["version"] = new_version
+            update_kwargs[version_field] = F("version") + 1
+            update_kwargs["version"] = F("version") + 1
             update_kwargs["updated_at"] = timezone.now()
 
-            # Atomic compare-and-swap on Base.version. The WHERE pin closes
-            # the TOCTOU window that select_for_update() leaves open on
-            # SQLite.
+            # Atomic compare-and-swap on the section's column. The WHERE pin
+            # closes the TOCTOU window that select_for_update() leaves open
+            # on SQLite.
             updated = Base.objects.filter(
                 pk=base.pk,
-                version=current,
+                **{version_field: changed_at},
             ).update(**update_kwargs)
 
             if updated:
                 base.refresh_from_db()
+                new_version = base.version
+                # The CAS ``update()`` skips ``Base.save()``, so mirror the
+                # workspace slots into the lookup table here.
+                if "workspaces" in extra_update_fields:
+                    base.sync_workspace_assignments()
                 payload = serialize_base_section(base, section_key)
                 return _ok_response(payload, new_version)
 
@@ -3633,42 +3603,37 @@ def _base_section_patch(
 
 
 # ---------------------------------------------------------------------------
-# Projects-array CAS helper (Phase 4 — per-project writes share the
-# ``projects`` section version slot).
+# Per-project write helper (Phase 4, reworked in v0.15.79).
 #
 # Every per-project endpoint (fringe-effect, stimulants, dark-grants, roll,
-# complete, ...) does a read-modify-write on ``Agency.projects`` (a JSONField
-# list). Without serialisation that's a classic lost-update race: two writers
-# read the same list, mutate disjoint indices, and the slower writer's commit
-# clobbers the faster one's. The fix is the same compare-and-swap pattern used
-# by ``_agency_section_patch``: we pin ``section_versions`` in the WHERE clause
-# of an UPDATE and bump the ``projects`` version slot on success.
+# complete, ...) does a read-modify-write on one project. Projects are
+# ``AgencyProject`` rows, so the write touches only that project's row and
+# bumps its own ``version``; two players rolling on different projects no
+# longer rewrite (or CAS against) the same JSON array.
 #
-# Trade-off: every per-project endpoint shares ONE version slot. Two concurrent
-# writers to *different* projects (or different fields of the same project)
-# will produce one spurious 409. For force-writes (no If-Match — the legacy
-# call sites), the helper retries up to ``max_retries`` times so the client
-# sees a successful 200 after 1-3 internal retries; the user never notices.
-# For If-Match writes (new call sites) we attempt once and 409 immediately so
-# the client can re-fetch and rebase. Document the trade-off in the helper
-# docstring so future maintainers don't reach for per-project version slots
-# (``section_versions["projects.<idx>"]`` blows up the JSON map and breaks
-# section-versioning's invariant of a single, bounded JSON-dict footprint).
+# The agency row is locked for the duration (``select_for_update``) rather
+# than compare-and-swapped: most endpoints also read-modify-write agency
+# columns (``project_rolls``, ``attributes``, ``integrity``) and some
+# mutators check the other projects (prodigy uniqueness), so writers for
+# one agency queue behind each other instead of failing and retrying. The
+# ``projects`` section version is still bumped so section-level readers
+# (and the whole-list section PATCH) see every change.
 # ---------------------------------------------------------------------------
 
 
-def _with_projects_cas(
+def _with_project_write(
     agency,
+    project_index,
     mutate_fn,
     *,
     expected_version=None,
-    max_retries=5,
     extra_update_fields=(),
 ):
-    """Run ``mutate_fn(projects_list, agency)`` and persist atomically.
+    """Run ``mutate_fn(projects_list, agency)`` and persist one project.
 
     The mutator may either:
-      * Return a new ``projects`` list (the canonical path).
+      * Return a new ``projects`` list (the canonical path). Only the entry
+        at ``project_index`` is written.
       * Return a tuple ``(new_projects, side_effect)`` — ``side_effect`` is
         passed through to the caller as ``result.side_effect`` and is
         useful for handlers that need to surface roll outcomes, messages,
@@ -3676,48 +3641,33 @@ def _with_projects_cas(
       * Return a JsonResponse to short-circuit (validation error, 400/403
         responses produced *inside* the mutator).
 
-    The mutator MUST NOT call ``agency.save()`` — persistence happens via
-    the CAS UPDATE in this helper. It MAY mutate other fields on
-    ``agency`` (e.g. ``agency.experience``) provided those fields are
+    The mutator MUST NOT call ``agency.save()``. It MAY mutate other fields
+    on ``agency`` (e.g. ``agency.experience``) provided those fields are
     listed in ``extra_update_fields`` so the UPDATE picks them up.
 
     Args:
-        agency: The Agency instance. Will be ``refresh_from_db()``-ed
-            inside each CAS attempt so stale state doesn't leak between
-            retries.
+        agency: The Agency instance. Re-read under a row lock before the
+            mutator runs, so it always sees committed state.
+        project_index: Position of the project being written.
         mutate_fn: ``(projects: list, agency: Agency) -> list | tuple |
             JsonResponse``. See above.
-        expected_version: If an int, single-attempt If-Match CAS — a CAS
-            miss returns ``CASResult(conflict=True, ...)``. If ``None``,
-            force-write semantics — retry up to ``max_retries`` times.
-        max_retries: Number of CAS attempts on the force-write path.
-            Ignored when ``expected_version`` is set.
-        extra_update_fields: Concrete Agency columns the mutator touches
-            beyond ``projects``. Used to build the UPDATE kwargs so we
-            don't clobber unrelated state.
+        expected_version: If an int, If-Match against the project's own
+            version — a mismatch returns ``CASResult(conflict=True, ...)``.
+            If ``None``, the write always lands. No endpoint passes it
+            today, since the per-project version is not sent to clients.
+        extra_update_fields: Concrete Agency columns the mutator touches.
 
     Returns:
         ``CASResult`` namedtuple-style dict:
-            * ``ok``           — True iff the CAS landed.
-            * ``conflict``     — True iff a CAS miss returned 409 (only
-                                 set on the If-Match path or after
-                                 retries are exhausted).
+            * ``ok``           — True iff the write landed.
+            * ``conflict``     — True iff ``expected_version`` was stale.
             * ``response``     — JsonResponse passthrough from the
                                  mutator (validation errors).
-            * ``new_version``  — The post-bump projects version (200 path).
+            * ``new_version``  — The project's post-bump version.
             * ``side_effect``  — Whatever the mutator returned alongside
                                  the new projects list, or ``None``.
-            * ``current_version``  — On 409, the canonical projects
-                                     version the loser should rebase to.
-            * ``current_value``    — On 409, the canonical projects
-                                     list (post-conflict view).
-
-    Trade-off (single-slot CAS): two concurrent writers to *different*
-    project indices share one version slot. Force-write callers retry
-    silently up to ``max_retries`` (the user sees a 200 after a brief
-    internal back-off). If-Match callers see 409 and must rebase. We
-    deliberately don't shard the version slot per-project — the JSON map
-    bloat outweighs the conflict-rate benefit in practice.
+            * ``current_version``  — On 409, the project's version.
+            * ``current_value``    — On 409, the canonical projects list.
     """
     from collections import namedtuple
 
@@ -3738,83 +3688,57 @@ def _with_projects_cas(
         defaults.update(kwargs)
         return CASResult(**defaults)
 
-    max_attempts = 1 if expected_version is not None else max_retries
-
-    last_pre_versions = None
-    last_current = 0
-    for _attempt in range(max_attempts):
-        with transaction.atomic():
-            agency.refresh_from_db()
-            pre_versions = dict(agency.section_versions or {})
-            current = int(pre_versions.get("projects", 0))
-            last_pre_versions = pre_versions
-            last_current = current
-
-            if expected_version is not None and expected_version != current:
-                return _make_result(
-                    conflict=True,
-                    current_version=current,
-                    current_value=list(agency.projects or []),
-                )
-
-            projects_snapshot = list(agency.projects or [])
-            mutator_out = mutate_fn(projects_snapshot, agency)
-
-            # Mutator returned a JsonResponse — surface it to the caller
-            # so it can be returned as-is to the client (validation 400s,
-            # auth 403s emitted from inside the mutator).
-            if isinstance(mutator_out, JsonResponse):
-                return _make_result(response=mutator_out)
-
-            side_effect = None
-            if isinstance(mutator_out, tuple) and len(mutator_out) == 2:
-                new_projects, side_effect = mutator_out
-            else:
-                new_projects = mutator_out
-
-            if new_projects is None:
-                # Defensive: treat None as "no change" — but we still
-                # need to bump the version because the mutator may have
-                # touched extra_update_fields.
-                new_projects = projects_snapshot
+    with transaction.atomic():
+        agency.refresh_from_db(from_queryset=Agency.objects.select_for_update())
+        rows = list(AgencyProject.objects.filter(agency=agency))
+        projects_snapshot = [row.data for row in rows]
+        row = rows[project_index] if 0 <= project_index < len(rows) else None
+
+        if expected_version is not None and row is not None and expected_version != row.version:
+            return _make_result(
+                conflict=True,
+                current_version=row.version,
+                current_value=projects_snapshot,
+            )
 
-            new_version = current + 1
-            new_versions = dict(pre_versions)
-            new_versions["projects"] = new_version
+        mutator_out = mutate_fn(list(projects_snapshot), agency)
 
-            update_kwargs = {
-                field: getattr(agency, field) for field in extra_update_fields
-            }
-            update_kwargs["projects"] = new_projects
-            update_kwargs["section_versions"] = new_versions
-            update_kwargs["updated_at"] = timezone.now()
-
-            updated = Agency.objects.filter(
-                pk=agency.pk,
-                section_versions=pre_versions,
-            ).update(**update_kwargs)
+        # Mutator returned a JsonResponse — surface it to the caller
+        # so it can be returned as-is to the client (validation 400s,
+        # auth 403s emitted from inside the mutator).
+        if isinstance(mutator_out, JsonResponse):
+            return _make_result(response=mutator_out)
+        if row is None:
+            return _make_result(
+                response=JsonResponse({"error": "Invalid project index."}, status=400),
+            )
 
-            if updated:
-                agency.refresh_from_db()
-                return _make_result(
-                    ok=True,
-                    new_version=new_version,
-                    side_effect=side_effect,
-                )
+        side_effect = None
+        if isinstance(mutator_out, tuple) and len(mutator_out) == 2:
+            new_projects, side_effect = mutator_out
+        else:
+            new_projects = mutator_out
+        if new_projects is None:
+            # Defensive: treat None as "no change" — the mutator may
+            # still have touched extra_update_fields.
+            new_projects = projects_snapshot
+
+        AgencyProject.objects.filter(pk=row.pk).update(
+            data=new_projects[project_index], version=F("version") + 1,
+        )
 
-        # CAS miss — refresh and retry on the next loop iteration. For
-        # force-writes the retry covers the typical "two writers to
-        # different projects" case; for If-Match writes the loop ends
-        # immediately (max_attempts=1) and we 409 below.
-        agency.refresh_from_db()
+        update_kwargs = {
+            field: getattr(agency, field) for field in extra_update_fields
+        }
+        update_kwargs["projects_version"] = F("projects_version") + 1
+        update_kwargs["updated_at"] = timezone.now()
+        Agency.objects.filter(pk=agency.pk).update(**update_kwargs)
 
-    # Force-write exhausted retries OR If-Match write lost the race.
-    live_versions = agency.section_versions or {}
-    live_current = int(live_versions.get("projects", last_current))
+    agency.refresh_from_db()
     return _make_result(
-        conflict=True,
-        current_version=live_current,
-        current_value=list(agency.projects or []),
+        ok=True,
+        new_version=row.version + 1,
+        side_effect=side_effect,
     )
 
 
@@ -4009,8 +3933,8 @@ _AGENCY_SECTION_HANDLERS = {
     "fleet": (_write_fleet, _admin_only, ("fleet",)),
     "history": (_write_history, _admin_only, ("history",)),
     # ``projects`` is also written by the per-project endpoints (roll,
-    # fringe-effect, stimulants, ...) — they share this version slot via
-    # ``_with_projects_cas`` so concurrent writes resolve cleanly.
+    # fringe-effect, stimulants, ...) — ``_with_project_write`` bumps this
+    # version slot too, so a stale whole-list PATCH gets its 409.
     "projects": (_write_projects, _admin_only, ("projects",)),
     "admin-flags": (
         _write_admin_flags,
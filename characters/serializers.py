@@ -1,5 +1,7 @@
 """Manual JSON serialization for Character model. No DRF dependency."""
 
+from exodus.images import image_url
+
 
 def serialize_character_pulling_string(cps):
     """Serialize a through-table entry (pulling string + optional NPC link)."""
@@ -17,7 +19,7 @@ def serialize_character_pulling_string(cps):
         data["linkedNpc"] = {
             "id": cps.linked_npc.id,
             "name": cps.linked_npc.name,
-            "image": cps.linked_npc.image.url if cps.linked_npc.image else None,
+            "image": image_url(cps.linked_npc.image, "avatar"),
         }
     else:
         data["linkedNpc"] = None
@@ -61,7 +63,7 @@ def serialize_character(character, user=None):
         "virtue": character.virtue,
         "vice": character.vice,
         "dossier": character.dossier,
-        "profilePicture": character.profile_picture.url if character.profile_picture else None,
+        "profilePicture": image_url(character.profile_picture, "full"),
         "attributes": character.attributes,
         "skills": character.skills,
         "health": {
@@ -106,5 +108,5 @@ def serialize_character_summary(character):
         "owner": character.owner.username,
         "name": character.name,
         "concept": character.concept,
-        "profilePicture": character.profile_picture.url if character.profile_picture else None,
+        "profilePicture": image_url(character.profile_picture, "card"),
     }
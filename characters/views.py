@@ -11,6 +11,7 @@ from django.db import transaction
 from .models import Character, CharacterPullingString, CharacterMerit, XpTransferLog
 from .serializers import serialize_character, serialize_character_summary
 from agencies.models import Agency
+from exodus.images import delete_derivatives, generate_derivatives, image_url
 from exodus.models import MeritDefinition, PullingString
 
 
@@ -277,15 +278,17 @@ def api_character_image(request, pk):
             status=400,
         )
 
-    # Delete old image if exists
+    # Delete old image (and its derivatives) if exists
     if character.profile_picture:
+        delete_derivatives(character.profile_picture)
         old_path = character.profile_picture.path
         if os.path.exists(old_path):
             os.remove(old_path)
 
     character.profile_picture = image
     character.save()
-    return JsonResponse({"profilePicture": character.profile_picture.url})
+    generate_derivatives(character.profile_picture)
+    return JsonResponse({"profilePicture": image_url(character.profile_picture, "full")})
 
 
 @login_required
@@ -8,40 +8,112 @@ broadcast for a consistent state model.
 
 Mirrors the spacebattle pattern but isolated under its own group prefix
 so the two systems share no WS state.
+
+Reconnecting clients pass ``?resume_from=<sequence>`` and get the log
+rows they missed replayed from ``CombatLog`` (or a snapshot when the
+gap is long) — see ``EncounterConsumer.resume_frame``.
 """
 
+import asyncio
+import contextvars
 import json
 import logging
+from contextlib import contextmanager
+from functools import partial
 
 from asgiref.sync import async_to_sync
-from channels.generic.websocket import WebsocketConsumer
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.layers import get_channel_layer
+from django.db import transaction
+
+from exodus.ws import resume_from_scope
 
 
 logger = logging.getLogger(__name__)
 
+# A reconnect missing more log rows than this gets a snapshot instead
+# of a replay (see ``EncounterConsumer.resume_frame``).
+REPLAY_LIMIT = 200
+
+# ``{encounter_id: [event, ...]}`` while a request-scoped buffer is
+# open (see ``broadcast_buffer``); ``None`` otherwise.
+_buffer = contextvars.ContextVar("combat_broadcast_buffer", default=None)
+
 
 def broadcast_combat_event(encounter_id, event_type, payload):
-    """Broadcast a single typed event to everyone in the encounter's group.
+    """Queue a typed event for everyone in the encounter's group.
+
+    Nothing is sent before the surrounding transaction commits (a
+    rolled-back mutation broadcasts nothing; with no transaction the
+    event is dispatched at once). Committed events then either join the
+    open ``broadcast_buffer`` — every HTTP request has one, via
+    ``CombatBroadcastMiddleware`` — or go out on their own.
 
     Swallows channel-layer exceptions so a Redis outage cannot 500 the
     calling REST endpoint — REST still works, the UI degrades to a
     manual refresh. Matches the resilience contract spacebattle adopted
     in Release G.
     """
+    event = {"event_type": event_type, "payload": payload}
+    transaction.on_commit(partial(_dispatch, encounter_id, event))
+
+
+def _dispatch(encounter_id, event):
+    pending = _buffer.get()
+    if pending is None:
+        flush({encounter_id: [event]})
+    else:
+        pending.setdefault(encounter_id, []).append(event)
+
+
+@contextmanager
+def broadcast_buffer():
+    """Collect committed combat events and send them once on exit.
+
+    Each encounter gets one ``combat.event`` group message carrying its
+    events in commit order (``EncounterConsumer.combat_event`` forwards
+    it as a single ``batch`` frame), and all groups go out in one
+    ``async_to_sync`` hop. Nested use joins the outer buffer.
+    """
+    if _buffer.get() is not None:
+        yield
+        return
+    pending = {}
+    token = _buffer.set(pending)
+    try:
+        yield
+    finally:
+        _buffer.reset(token)
+        if pending:
+            flush(pending)
+
+
+def flush(pending):
+    """Send ``{encounter_id: [event, ...]}`` now, one message per group."""
     try:
         layer = get_channel_layer()
         if layer is None:
             return
-        async_to_sync(layer.group_send)(
+        async_to_sync(_send_all)(layer, pending)
+    except Exception:
+        logger.exception(
+            "broadcast_combat_event failed for encounter(s) %s",
+            ", ".join(str(e) for e in pending),
+        )
+
+
+async def _send_all(layer, pending):
+    await asyncio.gather(*(
+        layer.group_send(
             f"combat_{encounter_id}",
-            {"type": "combat.event", "event_type": event_type, "payload": payload},
+            {"type": "combat.event", "group": f"combat_{encounter_id}", "events": events},
         )
-    except Exception:
-        logger.exception("broadcast_combat_event failed for encounter %s", encounter_id)
+        for encounter_id, events in pending.items()
+    ))
 
 
-class EncounterConsumer(WebsocketConsumer):
+class EncounterConsumer(AsyncWebsocketConsumer):
     """Per-encounter live channel.
 
     v0.15.7 — tightened authorisation. Subscription is granted to:
@@ -57,65 +129,137 @@ class EncounterConsumer(WebsocketConsumer):
     The check uses the ORM (the WS scope already injects the
     AuthMiddleware'd user), so it matches the exact same ownership
     semantics as the HTTP view layer.
+
+    v0.15.75 — async. The ORM work (``denial_code``, ``resume_frame``)
+    runs through ``database_sync_to_async``; an idle socket holds no
+    worker thread.
     """
 
-    def connect(self):
+    async def connect(self):
         user = self.scope.get("user")
         if not user or not user.is_authenticated:
-            self.close(code=4401)
+            await self.close(code=4401)
             return
         try:
             encounter_id = int(self.scope["url_route"]["kwargs"]["encounter_id"])
         except (KeyError, ValueError):
-            self.close(code=4400)
+            await self.close(code=4400)
             return
 
-        # Authorisation:
-        # - superusers can subscribe to any encounter;
-        # - players can subscribe iff they own a Character in the
-        #   encounter's participants list (mirrors the HTTP 403 check
-        #   in encounter_page so WS visibility never widens the
-        #   surface beyond the page view).
         if not user.is_superuser:
-            # v0.15.28 — hidden encounters reject all non-GM
-            # subscriptions. Placed *before* the per-character
-            # participant check so the more-restrictive filter wins:
-            # a player whose character was added to a hidden encounter
-            # during prep still can't subscribe until the GM clicks
-            # RELEASE TO PLAYERS. 4404 mirrors the 4403 / 4404 pattern
-            # already used in this consumer — generic "not found / no
-            # access" so we don't leak whether the encounter exists.
-            from .models import Encounter  # local import — avoid loading cycle
-            enc = Encounter.objects.filter(
-                pk=encounter_id, is_hidden=False
-            ).first()
-            if enc is None:
-                self.close(code=4404)
-                return
-
-            # Local import to avoid an app-loading cycle: this module
-            # is imported by combat/views.py at module load time.
-            from .models import Participant
-            is_participant = Participant.objects.filter(
-                encounter_id=encounter_id,
-                character__owner=user,
-            ).exists()
-            if not is_participant:
-                self.close(code=4403)
+            code = await database_sync_to_async(self.denial_code)(user, encounter_id)
+            if code is not None:
+                await self.close(code=code)
                 return
 
         self.encounter_id = encounter_id
         self.group_name = f"combat_{self.encounter_id}"
-        async_to_sync(self.channel_layer.group_add)(self.group_name, self.channel_name)
-        self.accept()
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        resume_from = resume_from_scope(self.scope)
+        if resume_from is not None:
+            frame = await database_sync_to_async(self.resume_frame)(resume_from)
+            if frame is not None:
+                await self.send(text_data=json.dumps(frame))
+
+    @staticmethod
+    def denial_code(user, encounter_id):
+        """Close code for a non-superuser who may not subscribe, else None.
 
-    def disconnect(self, code):
+        Superusers can subscribe to any encounter; players can subscribe
+        iff they own a Character in the encounter's participants list
+        (mirrors the HTTP 403 check in encounter_page so WS visibility
+        never widens the surface beyond the page view).
+        """
+        # Local imports to avoid an app-loading cycle: this module is
+        # imported by combat/views.py at module load time.
+        from .models import Encounter, Participant
+
+        # v0.15.28 — hidden encounters reject all non-GM subscriptions.
+        # Checked *before* the per-character participant check so the
+        # more-restrictive filter wins: a player whose character was
+        # added to a hidden encounter during prep still can't subscribe
+        # until the GM clicks RELEASE TO PLAYERS. 4404 is a generic
+        # "not found / no access" so we don't leak whether the
+        # encounter exists.
+        if not Encounter.objects.filter(pk=encounter_id, is_hidden=False).exists():
+            return 4404
+        is_participant = Participant.objects.filter(
+            encounter_id=encounter_id,
+            character__owner=user,
+        ).exists()
+        if not is_participant:
+            return 4403
+        return None
+
+    def resume_frame(self, resume_from):
+        """Catch-up frame for a client last synced at ``resume_from``.
+
+        v0.15.74 — the client sends ``?resume_from=<sequence>`` (the
+        highest ``CombatLog.sequence`` it has applied). Up to
+        ``REPLAY_LIMIT`` missed rows come back as one ``replay`` frame
+        carrying the same per-row frames the live stream sends; a longer
+        gap, or a ``resume_from`` ahead of the log, gets one
+        ``snapshot`` frame instead: just ``last_sequence``, telling the
+        client to refetch what it may see over HTTP (the full encounter
+        payload is GM-only, and players subscribe here too). Returns None
+        when the client is up to date.
+
+        The socket joined the group first, so an event committed while
+        this runs can arrive twice — clients skip sequences they have
+        already applied.
+        """
+        from .models import Encounter
+        from .views import _log_entry_payload
+
+        encounter = Encounter.objects.filter(pk=self.encounter_id).first()
+        if encounter is None:
+            return None
+        if resume_from > encounter.log_sequence:
+            missed = None
+        else:
+            missed = list(
+                encounter.log_entries.filter(sequence__gt=resume_from)
+                .order_by("sequence")[:REPLAY_LIMIT + 1]
+            )
+            if not missed:
+                return None
+            if len(missed) > REPLAY_LIMIT:
+                missed = None
+        if missed is None:
+            return {"type": "snapshot", "last_sequence": encounter.log_sequence}
+        return {
+            "type": "replay",
+            "last_sequence": missed[-1].sequence,
+            "events": [
+                {"type": e.action_type, "payload": _log_entry_payload(encounter, e)}
+                for e in missed
+            ],
+        }
+
+    async def disconnect(self, code):
         if hasattr(self, "group_name"):
-            async_to_sync(self.channel_layer.group_discard)(self.group_name, self.channel_name)
-
-    def combat_event(self, event):
-        """Forward a group message to the websocket as JSON."""
-        self.send(text_data=json.dumps({
-            "type": event.get("event_type", "unknown"),
-            "payload": event.get("payload", {}),
-        }))
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def combat_event(self, event):
+        """Forward a group message to the websocket as JSON.
+
+        v0.15.73 — group messages carry an ``events`` list (everything
+        one request committed for this encounter). A single event is
+        sent as the usual ``{"type", "payload"}`` frame; several go out
+        as one ``{"type": "batch", "events": [...]}`` frame, so the
+        client applies them together. Legacy single-event messages
+        (``event_type`` / ``payload``) are still accepted.
+        """
+        events = event.get("events")
+        if events is None:
+            events = [event]
+        frames = [
+            {"type": e.get("event_type", "unknown"), "payload": e.get("payload", {})}
+            for e in events
+        ]
+        if len(frames) == 1:
+            await self.send(text_data=json.dumps(frames[0]))
+        else:
+            await self.send(text_data=json.dumps({"type": "batch", "events": frames}))
@@ -0,0 +1,19 @@
+"""Middleware for the combat app."""
+
+from .consumers import broadcast_buffer
+
+
+class CombatBroadcastMiddleware:
+    """Give every request one combat broadcast buffer.
+
+    Events a view commits through ``broadcast_combat_event`` are held
+    until the response is built, then sent as one batched message per
+    encounter instead of one channel-layer round-trip per log row.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with broadcast_buffer():
+            return self.get_response(request)
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_log_sequence(apps, schema_editor):
+    Encounter = apps.get_model("combat", "Encounter")
+    CombatLog = apps.get_model("combat", "CombatLog")
+    highest = (
+        CombatLog.objects.values("encounter_id")
+        .annotate(top=Max("sequence"))
+        .values_list("encounter_id", "top")
+    )
+    for encounter_id, top in highest:
+        Encounter.objects.filter(pk=encounter_id).update(log_sequence=top or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combat', '0004_encounter_is_hidden'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='encounter',
+            name='log_sequence',
+            field=models.PositiveIntegerField(default=0, help_text='Last CombatLog sequence allocated for this encounter.'),
+        ),
+        migrations.RunPython(backfill_log_sequence, migrations.RunPython.noop),
+    ]
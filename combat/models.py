@@ -101,12 +101,34 @@ class Encounter(models.Model):
         ),
     )
 
+    # v0.15.72 — per-encounter log sequence counter. Holds the last
+    # ``CombatLog.sequence`` handed out; ``combat.views._reserve_sequences``
+    # bumps it with an ``F()`` update inside the logging transaction, so
+    # allocation is one UPDATE instead of a MAX() over the whole log and
+    # a rolled-back write hands its numbers back (no gaps).
+    log_sequence = models.PositiveIntegerField(
+        default=0,
+        help_text="Last CombatLog sequence allocated for this encounter.",
+    )
+
     class Meta:
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"Encounter #{self.pk}: {self.title}"
 
+    def save(self, *args, **kwargs):
+        # ``log_sequence`` is only ever written by the F() update in the
+        # log helpers. A plain full-row save() from a view holding a
+        # stale instance must not roll the counter back, so existing
+        # rows save every field except the counter.
+        if kwargs.get("update_fields") is None and not self._state.adding and self.pk:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "log_sequence"
+            ]
+        super().save(*args, **kwargs)
+
 
 class Participant(models.Model):
     """A single combatant in an encounter.
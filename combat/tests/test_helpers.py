@@ -10,13 +10,15 @@ rows so they use :class:`TestCase` and lean on the helpers in
 ``combat/tests/factories.py`` for setup.
 """
 
-from unittest.mock import patch
+from unittest.mock import Mock
 
 from django.test import SimpleTestCase, TestCase
 
 from combat import views as combat_views
+from exodus import dice as dice_engine
 from combat.views import (
     _apply_damage,
+    _attack_odds,
     _clamp_again_local,
     _condition_attack_modifier,
     _distribute_gun_fu,
@@ -77,11 +79,12 @@ class RollPoolTests(SimpleTestCase):
     def test_explosion_chain_capped(self):
         """All-10 explosion chain is capped at 5 levels per starting die.
 
-        We patch the d10 source to always return 10. With a single
-        starting die, the chain should produce exactly 1 base + 5
-        explodes = 6 entries (cap = 5).
+        We point the shared ``exodus.dice`` source at an RNG that always
+        returns 10. With a single starting die, the chain should produce
+        exactly 1 base + 5 explodes = 6 entries (cap = 5).
         """
-        with patch("combat.views._roll_d10", return_value=10):
+        always_ten = Mock(randint=Mock(return_value=10))
+        with dice_engine.use_rng(always_ten):
             successes, dice = _roll_pool(1)
         # Cap is 5 explode-levels → 1 base + 5 explodes = 6 dice
         self.assertEqual(len(dice), 6)
@@ -369,6 +372,43 @@ class WeaponParsingTests(SimpleTestCase):
         self.assertEqual(_clamp_again_local("bad"), 10)
 
 
+class AttackOddsTests(SimpleTestCase):
+    """Tests for :func:`combat.views._attack_odds` (no DB)."""
+
+    def test_empty_pool_never_hits(self):
+        """A zero pool rolls nothing — no chance die in combat."""
+        odds = _attack_odds(0, {"damage": "3L"})
+        self.assertEqual(odds["at_least_1"], 0.0)
+        self.assertEqual(odds["expected_damage"], 0.0)
+
+    def test_single_die_hit_chance(self):
+        """One die hits on 8+, so ``P(>=1)`` is exactly 0.3."""
+        odds = _attack_odds(1, {"damage": "2L"})
+        self.assertEqual(odds["at_least_1"], 0.3)
+        self.assertEqual(odds["again"], 10)
+
+    def test_armor_equal_to_weapon_damage_leaves_successes(self):
+        """Armor that cancels the weapon's damage leaves the successes."""
+        odds = _attack_odds(6, {"damage": "2L"}, armor_rating="0/2")
+        self.assertEqual(odds["armor"], 2)
+        self.assertAlmostEqual(
+            odds["expected_damage"], odds["expected_successes"], places=1,
+        )
+
+    def test_aggravated_ignores_armor(self):
+        unarmored = _attack_odds(5, {"damage": "2A"})
+        armored = _attack_odds(5, {"damage": "2A"}, armor_rating="4/4")
+        self.assertEqual(armored["armor"], 0)
+        self.assertEqual(unarmored["expected_damage"], armored["expected_damage"])
+
+    def test_weapon_again_improves_odds(self):
+        """An 8-again weapon raises ``P(>=5)`` over the 10-again default."""
+        plain = _attack_odds(8, {"damage": "2L"})
+        eight = _attack_odds(8, {"damage": "2L", "again": 8})
+        self.assertEqual(eight["again"], 8)
+        self.assertGreater(eight["at_least_5"], plain["at_least_5"])
+
+
 # ---------------------------------------------------------------------------
 # Condition tag parsers (aim / ammo / grenade)
 # ---------------------------------------------------------------------------
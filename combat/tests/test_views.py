@@ -10,18 +10,26 @@ Covers:
 * Burn tick (GM manual)
 * Knockdown auto-trigger
 * Grenades (inventory, EMP immunity, scatter)
+* Combat log sequence allocation (``_log`` / ``_log_many``)
+* Request-scoped, after-commit combat broadcasts
+* WebSocket resume (replay / snapshot from ``resume_from``)
 
 All tests use Django's transactional :class:`TestCase` — fast and
 isolated. Setup helpers live in ``combat/tests/factories.py``.
 
-TODO (future release): WebSocket consumer auth tests via
-``channels.testing.WebsocketCommunicator``. Skipped in v0.15.35 to
-keep the dependency surface minimal.
+v0.15.75 — ``EncounterConsumer`` auth / resume is covered end to end
+with ``channels.testing.WebsocketCommunicator`` on the in-memory
+channel layer (``EncounterConsumerTests``).
 """
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
-from django.test import Client, TestCase
+from asgiref.sync import async_to_sync
+
+from django.db import connection, transaction
+from channels.testing import WebsocketCommunicator
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from combat.models import CombatLog, Encounter, Participant
@@ -362,6 +370,39 @@ class AttackResolutionTests(TestCase):
         self.target.refresh_from_db()
         self.assertEqual(_compute_defense(self.target), 1)
 
+    def test_encounter_page_previews_odds_per_opponent(self):
+        """The attack preview carries exact odds vs each opposing row."""
+        self.target.mook_armor_rating = "1/2"
+        self.target.save(update_fields=["mook_armor_rating"])
+        self.client.force_login(self.gm)
+        resp = self.client.get(
+            reverse("combat:detail", kwargs={"pk": self.encounter.pk}),
+        )
+        attacker = next(
+            p for p in resp.context["participants"] if p.pk == self.attacker.pk
+        )
+        preview = attacker.attack_preview
+        self.assertIn("at_least_3", preview["odds"])
+        [vs] = preview["odds_vs"]
+        self.assertEqual(vs["target_id"], self.target.pk)
+        self.assertEqual(vs["defense"], 1)
+        self.assertEqual(vs["armor"], 2)
+        self.assertEqual(vs["pool"], max(0, preview["total"] - 1))
+        self.assertLess(vs["expected_damage"], preview["odds"]["expected_damage"])
+
+    def test_api_participant_includes_attack_odds(self):
+        """``_serialize_participant`` exposes the preview odds for MCP."""
+        from combat.views import _attack_preview, _serialize_participant
+        data = _serialize_participant(self.attacker)
+        self.assertLessEqual(
+            {"at_least_1", "at_least_3", "at_least_5", "expected_damage"},
+            set(data["attack_odds"]),
+        )
+        preview = _attack_preview(
+            self.attacker, self.attacker.weapon_data, gm_modifier=0
+        )
+        self.assertEqual(data["attack_odds"], preview["odds"])
+
 
 # ---------------------------------------------------------------------------
 # Permission gates — _gm_only + _gm_or_owner
@@ -775,3 +816,275 @@ class GrenadeTests(TestCase):
         self.thrower.refresh_from_db()
         # Frag count decremented from 3 → 2.
         self.assertIn("grenades:frag:2", self.thrower.conditions)
+
+
+# ---------------------------------------------------------------------------
+# Combat log — counter-based sequence allocation
+# ---------------------------------------------------------------------------
+
+
+class LogSequenceTests(TestCase):
+    """Tests for ``_log`` / ``_log_many`` and ``Encounter.log_sequence``."""
+
+    def setUp(self):
+        self.encounter = make_encounter(status="active", round_number=1)
+
+    def _sequences(self):
+        return list(
+            self.encounter.log_entries.values_list("sequence", flat=True)
+        )
+
+    def test_log_and_log_many_allocate_consecutive_sequences(self):
+        from combat.views import _log, _log_many
+        _log(self.encounter, "system", "one")
+        with patch("combat.views.broadcast_combat_event") as broadcast:
+            entries = _log_many(self.encounter, [
+                ("attack", "two", {"a": 1}),
+                ("health_change", "three", {}),
+            ])
+        self.assertEqual([e.sequence for e in entries], [2, 3])
+        self.assertEqual(self._sequences(), [1, 2, 3])
+        self.encounter.refresh_from_db()
+        self.assertEqual(self.encounter.log_sequence, 3)
+        # One typed event per row, in sequence order.
+        self.assertEqual(
+            [(c.args[1], c.args[2]["sequence"]) for c in broadcast.call_args_list],
+            [("attack", 2), ("health_change", 3)],
+        )
+
+    def test_append_cost_does_not_grow_with_the_log(self):
+        from combat.views import _log
+        with CaptureQueriesContext(connection) as first:
+            _log(self.encounter, "system", "first")
+        for i in range(30):
+            _log(self.encounter, "system", f"filler {i}")
+        with CaptureQueriesContext(connection) as later:
+            _log(self.encounter, "system", "later")
+        self.assertEqual(len(first), len(later))
+        self.assertFalse(any("MAX(" in q["sql"].upper() for q in later))
+
+    def test_rolled_back_write_leaves_no_gap(self):
+        from combat.views import _log
+        _log(self.encounter, "system", "kept")
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                _log(self.encounter, "system", "discarded")
+                raise RuntimeError
+        self.encounter.refresh_from_db()
+        _log(self.encounter, "system", "next")
+        self.assertEqual(self._sequences(), [1, 2])
+
+    def test_stale_full_save_keeps_the_counter(self):
+        from combat.views import _log
+        stale = Encounter.objects.get(pk=self.encounter.pk)
+        _log(self.encounter, "system", "one")
+        stale.title = "Renamed"
+        stale.save()
+        _log(self.encounter, "system", "two")
+        self.assertEqual(self._sequences(), [1, 2])
+
+    def test_counter_behind_the_log_resyncs(self):
+        """Rows written outside the helpers are skipped past on retry."""
+        from combat.views import _log
+        CombatLog.objects.create(
+            encounter=self.encounter, sequence=1, action_type="system",
+        )
+        entry = _log(self.encounter, "system", "after")
+        self.assertEqual(entry.sequence, 2)
+
+
+# ---------------------------------------------------------------------------
+# Broadcasts — request buffer, after-commit dispatch, consumer unpacking
+# ---------------------------------------------------------------------------
+
+
+class BroadcastBufferTests(TestCase):
+    """Tests for ``broadcast_buffer`` and ``EncounterConsumer.combat_event``."""
+
+    def test_buffer_sends_one_message_per_encounter(self):
+        from combat.consumers import broadcast_buffer, broadcast_combat_event
+        with patch("combat.consumers.flush") as flush:
+            with broadcast_buffer():
+                with self.captureOnCommitCallbacks(execute=True):
+                    broadcast_combat_event(1, "attack", {"n": 1})
+                    broadcast_combat_event(2, "system", {"n": 2})
+                    broadcast_combat_event(1, "health_change", {"n": 3})
+                flush.assert_not_called()
+        flush.assert_called_once_with({
+            1: [
+                {"event_type": "attack", "payload": {"n": 1}},
+                {"event_type": "health_change", "payload": {"n": 3}},
+            ],
+            2: [{"event_type": "system", "payload": {"n": 2}}],
+        })
+
+    def test_rolled_back_events_are_dropped(self):
+        from combat.consumers import broadcast_buffer, broadcast_combat_event
+        with patch("combat.consumers.flush") as flush:
+            with broadcast_buffer():
+                with self.captureOnCommitCallbacks(execute=True):
+                    broadcast_combat_event(1, "system", {"kept": True})
+                    with self.assertRaises(RuntimeError):
+                        with transaction.atomic():
+                            broadcast_combat_event(1, "system", {"kept": False})
+                            raise RuntimeError
+        flush.assert_called_once_with(
+            {1: [{"event_type": "system", "payload": {"kept": True}}]}
+        )
+
+    def test_consumer_unpacks_the_envelope(self):
+        import json
+        from combat.consumers import EncounterConsumer
+        consumer = EncounterConsumer()
+        consumer.send = AsyncMock()
+        async_to_sync(consumer.combat_event)({"events": [
+            {"event_type": "attack", "payload": {"a": 1}},
+            {"event_type": "health_change", "payload": {"b": 2}},
+        ]})
+        async_to_sync(consumer.combat_event)(
+            {"events": [{"event_type": "system", "payload": {}}]}
+        )
+        batch, single = [
+            json.loads(c.kwargs["text_data"]) for c in consumer.send.call_args_list
+        ]
+        self.assertEqual(batch, {"type": "batch", "events": [
+            {"type": "attack", "payload": {"a": 1}},
+            {"type": "health_change", "payload": {"b": 2}},
+        ]})
+        self.assertEqual(single, {"type": "system", "payload": {}})
+
+
+class AttackBroadcastTests(TransactionTestCase):
+    """An attack request reaches the channel layer once, after commit."""
+
+    def test_attack_flushes_once_per_request(self):
+        gm = make_user(is_superuser=True)
+        encounter = make_encounter(gm=gm, status="active", round_number=1)
+        attacker = make_participant(
+            encounter, kind="mook", name="Shooter", faction="player",
+            mook_combat_pool=8,
+        )
+        target = make_participant(encounter, kind="mook", name="Target")
+        encounter.active_participant_id = attacker.pk
+        encounter.initiative_order = [attacker.pk, target.pk]
+        encounter.save()
+        client = Client()
+        client.force_login(gm)
+        with patch("combat.consumers.flush") as flush:
+            client.post(
+                reverse("combat:attack", kwargs={
+                    "pk": encounter.pk, "attacker_id": attacker.pk,
+                }),
+                {"target_id": target.pk, "burst_mode": "single"},
+            )
+        flush.assert_called_once()
+        [(encounter_id, events)] = flush.call_args.args[0].items()
+        self.assertEqual(encounter_id, encounter.pk)
+        sequences = [e["payload"]["sequence"] for e in events]
+        self.assertEqual(
+            sequences,
+            list(encounter.log_entries.values_list("sequence", flat=True)),
+        )
+
+
+class EncounterResumeTests(TestCase):
+    """Tests for ``EncounterConsumer.resume_frame`` (``?resume_from=``)."""
+
+    def setUp(self):
+        from combat.views import _log
+        self.encounter = make_encounter(status="active", round_number=1)
+        for i in range(4):
+            _log(self.encounter, "system", f"row {i}")
+
+    def _resume(self, resume_from):
+        from combat.consumers import EncounterConsumer
+        consumer = EncounterConsumer()
+        consumer.encounter_id = self.encounter.pk
+        frame = consumer.resume_frame(resume_from)
+        return [frame] if frame is not None else []
+
+    def test_up_to_date_client_gets_nothing(self):
+        self.assertEqual(self._resume(4), [])
+
+    def test_missed_rows_are_replayed(self):
+        [frame] = self._resume(2)
+        self.assertEqual(frame["type"], "replay")
+        self.assertEqual(frame["last_sequence"], 4)
+        self.assertEqual(
+            [(e["type"], e["payload"]["sequence"]) for e in frame["events"]],
+            [("system", 3), ("system", 4)],
+        )
+
+    def test_long_gap_or_unknown_position_gets_a_snapshot(self):
+        with patch("combat.consumers.REPLAY_LIMIT", 2):
+            [frame] = self._resume(0)
+        self.assertEqual(frame["type"], "snapshot")
+        self.assertEqual(frame["last_sequence"], 4)
+        # A position ahead of the log (e.g. a restored database) can't
+        # be replayed from either.
+        [frame] = self._resume(99)
+        self.assertEqual(frame["type"], "snapshot")
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class EncounterConsumerTests(TransactionTestCase):
+    """``EncounterConsumer`` over a real (in-memory) socket."""
+
+    def setUp(self):
+        from combat.views import _log
+        self.player = make_user()
+        self.outsider = make_user()
+        self.encounter = make_encounter(status="active", round_number=1)
+        char = make_character(owner=self.player)
+        make_participant(self.encounter, character=char, kind="character")
+        for i in range(3):
+            _log(self.encounter, "system", f"row {i}")
+
+    async def _connect(self, user, query=""):
+        from combat.consumers import EncounterConsumer
+        communicator = WebsocketCommunicator(
+            EncounterConsumer.as_asgi(), f"/ws/combat/{self.encounter.pk}/{query}",
+        )
+        communicator.scope["user"] = user
+        communicator.scope["url_route"] = {"kwargs": {"encounter_id": str(self.encounter.pk)}}
+        connected, code = await communicator.connect()
+        return communicator, connected, code
+
+    async def test_outsider_and_hidden_encounter_are_refused(self):
+        _, connected, code = await self._connect(self.outsider)
+        self.assertFalse(connected)
+        self.assertEqual(code, 4403)
+        await Encounter.objects.filter(pk=self.encounter.pk).aupdate(is_hidden=True)
+        _, connected, code = await self._connect(self.player)
+        self.assertFalse(connected)
+        self.assertEqual(code, 4404)
+
+    async def test_participant_resumes_then_gets_live_events(self):
+        communicator, connected, _ = await self._connect(self.player, "?resume_from=1")
+        self.assertTrue(connected)
+        replay = await communicator.receive_json_from()
+        self.assertEqual(replay["type"], "replay")
+        self.assertEqual(
+            [e["payload"]["sequence"] for e in replay["events"]], [2, 3],
+        )
+        from channels.layers import get_channel_layer
+        await get_channel_layer().group_send(f"combat_{self.encounter.pk}", {
+            "type": "combat.event",
+            "events": [{"event_type": "system", "payload": {"sequence": 4}}],
+        })
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "system", "payload": {"sequence": 4}},
+        )
+        await communicator.disconnect()
+
+    async def test_player_snapshot_carries_no_gm_data(self):
+        # ``api_encounter_detail`` is GM-only; a player's snapshot only
+        # says where the log is, and the page refetches what it may see.
+        communicator, connected, _ = await self._connect(self.player, "?resume_from=99")
+        self.assertTrue(connected)
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "snapshot", "last_sequence": 3},
+        )
+        await communicator.disconnect()
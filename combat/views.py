@@ -21,10 +21,11 @@ Attack pipeline (v0.15.5):
    doubled; ``dodging:N`` → N successes replace baseline.
 3. Apply cover — ``light=-2``, ``heavy=-4``, ``full`` blocks the
    shot entirely (logged ``outcome="blocked_by_cover"``).
-4. Floor the dice pool at ``0`` and roll — ``_roll_pool`` reuses the
-   ``secrets`` source from initiative; 8/9/10 are successes, 10s
-   "explode" and re-roll up to five recursion levels deep so the
-   pathological all-tens case can't run away.
+4. Floor the dice pool at ``0`` and roll — ``_roll_pool`` goes through
+   the shared ``exodus.dice`` engine (same OS-entropy source as
+   initiative); 8/9/10 are successes, 10s "explode" and re-roll up to
+   five recursion levels deep so the pathological all-tens case can't
+   run away.
 5. On any successes, compute damage — ``successes + weapon damage``,
    minus armor (``B`` track or ``L`` track from ``"B/L"`` rating;
    aggravated bypasses armor). Apply through ``_apply_damage`` which
@@ -82,7 +83,6 @@ CombatLog action types in use as of v0.15.5: ``initiative``,
 """
 
 import json
-import secrets
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -99,6 +99,7 @@ from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_http_methods
 
 from characters.models import Character
+from exodus import dice as dice_engine
 from exodus.models import SiteSettings
 from gm_workspace.models import StoryIdea
 from npcs.models import NPC
@@ -112,14 +113,77 @@ from .models import CombatLog, Encounter, Participant
 # ---------------------------------------------------------------------------
 
 
-def _next_sequence(encounter):
-    """Return the next monotonic sequence number for an encounter's log.
+def _reserve_sequences(encounter, count=1):
+    """Allocate ``count`` consecutive log sequence numbers for an encounter.
 
     ``CombatLog`` enforces a unique ``(encounter, sequence)`` constraint,
     so callers must always allocate via this helper to avoid IntegrityError.
+
+    v0.15.72 — one ``F()`` increment of ``Encounter.log_sequence`` plus a
+    read-back, instead of a ``MAX(sequence)`` aggregate over the whole
+    log. Must run inside the transaction that writes the rows: the
+    UPDATE holds the encounter row until commit, and a rollback returns
+    the numbers, so the sequence stays gap-free. Returns a ``range``.
+    """
+    rows = Encounter.objects.filter(pk=encounter.pk)
+    rows.update(log_sequence=F("log_sequence") + count)
+    last = rows.values_list("log_sequence", flat=True).get()
+    encounter.log_sequence = last
+    return range(last - count + 1, last + 1)
+
+
+def _resync_sequence(encounter):
+    """Realign ``Encounter.log_sequence`` with the log's highest sequence.
+
+    Only the IntegrityError retry path calls this — a counter can fall
+    behind the log if rows were written by something other than the log
+    helpers (fixtures, a hand-edited DB).
+    """
+    top = encounter.log_entries.aggregate(Max("sequence"))["sequence__max"] or 0
+    Encounter.objects.filter(pk=encounter.pk).update(log_sequence=top)
+    encounter.log_sequence = top
+
+
+def _log_entry_payload(encounter, entry):
+    return {
+        "encounter_id": encounter.id,
+        "sequence": entry.sequence,
+        "round_number": entry.round_number,
+        "action_type": entry.action_type,
+        "message": entry.message,
+        "data": entry.data,
+        "timestamp": entry.created_at.isoformat(),
+    }
+
+
+def _write_log_rows(encounter, rows):
+    """Insert ``(action_type, message, data)`` rows with fresh sequences.
+
+    One counter bump and one ``bulk_create`` per batch, inside an atomic
+    block. v0.15.25 — retries once on ``IntegrityError`` (after
+    resyncing the counter) in case another writer raced us to the same
+    numbers; a second collision re-raises so the caller sees the 500
+    instead of silently corrupting the log.
     """
-    current = encounter.log_entries.aggregate(Max("sequence"))["sequence__max"] or 0
-    return current + 1
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                sequences = _reserve_sequences(encounter, len(rows))
+                return CombatLog.objects.bulk_create([
+                    CombatLog(
+                        encounter=encounter,
+                        sequence=sequence,
+                        round_number=encounter.round_number,
+                        action_type=action_type,
+                        message=message,
+                        data=data,
+                    )
+                    for sequence, (action_type, message, data) in zip(sequences, rows)
+                ])
+        except IntegrityError:
+            if attempt == 1:
+                raise
+            _resync_sequence(encounter)
 
 
 def _log(encounter, action_type, message, **data):
@@ -138,58 +202,33 @@ def _log(encounter, action_type, message, **data):
     ``manage.py shell`` or migrations). A broadcast hiccup must NEVER
     500 a REST mutation.
 
-    v0.15.25 — concurrent-safe: wraps the seq-compute + create in a
-    ``transaction.atomic`` block (SQLite IMMEDIATE mode serializes
-    writers at transaction-start), and retries once on
-    ``IntegrityError`` if a concurrent write somehow grabbed the same
-    sequence (defense in depth: the atomic block should already
-    prevent this on IMMEDIATE, but if a future backend change relaxes
-    that, the retry catches it). Most mutation views already wrap the
+    v0.15.25 — concurrent-safe: the sequence allocation + insert run in
+    a ``transaction.atomic`` block with one retry on ``IntegrityError``
+    (see ``_write_log_rows``). Most mutation views already wrap the
     whole request in ``transaction.atomic``; Django flattens our
     nested block into the outer transaction in that case.
 
-    The Channels broadcast happens AFTER the transaction commits, so
-    a channel-layer failure can't roll back the persisted log row.
+    v0.15.72 — sequences come from the ``Encounter.log_sequence``
+    counter (``_reserve_sequences``), so an append is a constant number
+    of statements however long the log grows. Use ``_log_many`` when a
+    mutation writes several rows at once.
+
+    The Channels broadcast happens AFTER the insert, so a channel-layer
+    failure can't roll back the persisted log row.
+
+    v0.15.73 — ``broadcast_combat_event`` only queues: the event leaves
+    after the transaction commits, in the request's single batched
+    envelope (see ``combat.consumers.broadcast_buffer``).
     """
-    entry = None
-    for attempt in range(2):
-        try:
-            with transaction.atomic():
-                entry = CombatLog.objects.create(
-                    encounter=encounter,
-                    sequence=_next_sequence(encounter),
-                    round_number=encounter.round_number,
-                    action_type=action_type,
-                    message=message,
-                    data=data,
-                )
-            break
-        except IntegrityError:
-            if attempt == 1:
-                # Second collision = unrecoverable. Re-raise so the
-                # caller sees the 500 instead of silently corrupting.
-                raise
-            # First collision: another writer beat us to this
-            # sequence number. Loop and recompute via _next_sequence.
-            continue
+    [entry] = _write_log_rows(encounter, [(action_type, message, data)])
 
     # ---- Real-time fan-out (v0.15.6) -------------------------------------
-    # Broadcast OUTSIDE the transaction. Channel-layer failure cannot
-    # 500 the REST request (helper swallows internally; belt-and-
-    # suspenders catch here too).
+    # Queued for after commit. Channel-layer failure cannot 500 the
+    # REST request (helper swallows internally; belt-and-suspenders
+    # catch here too).
     try:
         broadcast_combat_event(
-            encounter.id,
-            action_type,
-            {
-                "encounter_id": encounter.id,
-                "sequence": entry.sequence,
-                "round_number": encounter.round_number,
-                "action_type": action_type,
-                "message": message,
-                "data": data,
-                "timestamp": entry.created_at.isoformat(),
-            },
+            encounter.id, action_type, _log_entry_payload(encounter, entry),
         )
     except Exception:
         # Defence-in-depth: keep REST 200/302 even when the channel
@@ -198,6 +237,29 @@ def _log(encounter, action_type, message, **data):
     return entry
 
 
+def _log_many(encounter, rows):
+    """Append several CombatLog rows with one insert.
+
+    ``rows`` is a sequence of ``(action_type, message, data)`` tuples,
+    written in order with consecutive sequence numbers. Each row queues
+    the same typed event ``_log`` would; the request's broadcast buffer
+    delivers them together. Returns the saved entries.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    entries = _write_log_rows(encounter, rows)
+    try:
+        for entry in entries:
+            broadcast_combat_event(
+                encounter.id, entry.action_type,
+                _log_entry_payload(encounter, entry),
+            )
+    except Exception:
+        pass
+    return entries
+
+
 def _safe_int(value, fallback=0):
     """Cast a catalogue field to int, falling back gracefully.
 
@@ -214,11 +276,11 @@ def _safe_int(value, fallback=0):
 def _roll_d10():
     """Single d10 face for WoD 2.0 initiative tiebreak.
 
-    Uses ``secrets.randbelow`` for cryptographic-quality randomness —
-    same source as the rest of the project's roll endpoints. Returns
-    an int in ``[1, 10]``.
+    Draws from the shared ``exodus.dice`` source (OS entropy unless a
+    test or replay swaps it with ``dice_engine.use_rng``). Returns an int in
+    ``[1, 10]``.
     """
-    return secrets.randbelow(10) + 1
+    return dice_engine.d10()
 
 
 def _clamp_again_local(value):
@@ -284,46 +346,18 @@ def _roll_pool(n, again_threshold=10):
     # ``_clamp_again_local`` already, but a stray ``None`` or arbitrary
     # int from a hand-rolled call still has to land safely.
     threshold = max(8, min(10, int(again_threshold or 10)))
-    dice = []
-    successes = 0
-    for _ in range(n):
-        base_idx = len(dice)
-        face = _roll_d10()
-        is_succ = face >= 8
-        triggers = face >= threshold
-        dice.append({
-            "face": face,
-            "kind": "base",
-            "from_index": None,
-            "success": is_succ,
-            "exploded": triggers,
-        })
-        if is_succ:
-            successes += 1
-        # X-again: keep rolling while the latest face hits the
-        # threshold, capped at 5 levels of recursion. ``from_index``
-        # chains each explode back to its immediate parent (which may
-        # itself be an explode die).
-        parent_idx = base_idx
-        parent_face = face
-        depth = 0
-        while parent_face >= threshold and depth < 5:
-            explode_face = _roll_d10()
-            explode_succ = explode_face >= 8
-            explode_triggers = explode_face >= threshold
-            dice.append({
-                "face": explode_face,
-                "kind": "explode",
-                "from_index": parent_idx,
-                "success": explode_succ,
-                "exploded": explode_triggers,
-            })
-            if explode_succ:
-                successes += 1
-            parent_idx = len(dice) - 1
-            parent_face = explode_face
-            depth += 1
-    return successes, dice
+    result = dice_engine.roll(n, again=threshold, max_depth=5, chance_die=False)
+    return result.successes, [
+        {
+            "face": d.face,
+            "kind": d.kind,
+            "from_index": d.parent,
+            "success": d.success,
+            # A capped chain's last trigger face still glows.
+            "exploded": d.face >= threshold,
+        }
+        for d in result.dice
+    ]
 
 
 def _normalize_dice_payload(dice_raw):
@@ -1612,6 +1646,45 @@ def _weapon_skill_for(weapon_data):
     return WEAPON_CATEGORY_SKILL.get(category, "Weaponry")
 
 
+def _attack_odds(pool, weapon_data, armor_rating="", range_band="close"):
+    """Exact hit / damage odds for an attack pool of ``pool`` dice.
+
+    Reads the memoized ``dice_engine.distribution`` table for the same
+    roll ``_roll_pool`` makes (weapon X-again, explosion chain capped at
+    5, no chance die), so a render costs a dict lookup per distinct pool
+    rather than a Monte Carlo run. ``expected_damage`` mirrors the
+    resolver's damage math: on a hit, successes + the band's weapon
+    damage minus the target's B or L armor (aggravated ignores armor),
+    floored at zero. ``armor_rating`` is the ``"B/L"`` string; empty
+    means an unarmored target.
+    """
+    weapon_data = weapon_data or {}
+    again = _clamp_again_local(weapon_data.get("again", 10))
+    parsed = _parse_weapon_damage(weapon_data.get("damage", ""))
+    band = parsed.get(range_band) or parsed["close"]
+    amount, band_type = band
+    damage_type = (weapon_data.get("damage_type") or band_type or "L").upper()
+    if damage_type not in ("B", "L", "A"):
+        damage_type = "L"
+    b_armor, l_armor = _parse_armor_rating(armor_rating)
+    armor = {"B": b_armor, "L": l_armor}.get(damage_type, 0)
+
+    kwargs = dict(again=again, max_depth=5, chance_die=False)
+    dist = dice_engine.distribution(pool, **kwargs)
+    expected_damage = sum(
+        p * max(0, k + amount - armor) for k, p in enumerate(dist) if k
+    )
+    block = dice_engine.odds(pool, **kwargs)
+    block.update(
+        pool=pool,
+        again=again,
+        damage_type=damage_type,
+        armor=armor,
+        expected_damage=round(expected_damage, 2),
+    )
+    return block
+
+
 def _attack_preview(actor, weapon_data, gm_modifier, weapon_skill_name=""):
     """Return a dict breaking down the attacker's pool for UI preview.
 
@@ -1792,6 +1865,10 @@ def _attack_preview(actor, weapon_data, gm_modifier, weapon_skill_name=""):
         "close_range_penalty":   close_range_penalty,
         "range_band":            "close",
         "total":            total,
+        # v0.15.71 — exact odds for ``total`` against an unarmored,
+        # undefended target (see ``_attack_odds``). ``encounter_page``
+        # adds a per-opponent breakdown under ``odds_vs``.
+        "odds":             _attack_odds(total, weapon_data),
     }
 
 
@@ -1834,6 +1911,17 @@ def _parse_armor_rating(rating_str):
         return 0, 0
 
 
+def _armor_rating_of(participant):
+    """The ``"B/L"`` armor string a hit on ``participant`` is reduced by.
+
+    Mooks carry their catalogue rating inline; characters and NPCs read
+    it from the snapshotted ``armor_data``.
+    """
+    if participant.participant_kind == "mook":
+        return participant.mook_armor_rating or ""
+    return (participant.armor_data or {}).get("rating", "")
+
+
 def _parse_damage_token(text):
     """Parse a single damage token like ``"4L"`` or ``"2L"``.
 
@@ -2502,6 +2590,31 @@ def encounter_page(request, pk):
     for p in participants:
         p.incapacitated_targets = [o for o in incap_pool if o.id != p.id]
 
+    # v0.15.71 — per-opponent odds for the attack preview. Each row
+    # gets ``attack_preview["odds_vs"]``: one entry per participant on
+    # the other side (players + allies vs hostiles; neutrals vs
+    # everyone else), with the preview total minus that target's defense
+    # and the expected damage after its armor. Defense is computed
+    # once per participant; the odds come from the shared distribution
+    # table, so the N^2 pass is dictionary lookups.
+    side_of = {"player": "friendly", "ally": "friendly"}
+    defense_of = {p.id: _compute_defense(p) for p in participants}
+    for p in participants:
+        side = side_of.get(p.faction, p.faction)
+        weapon_data = p.weapon_data
+        total = p.attack_preview["total"]
+        odds_vs = []
+        for other in participants:
+            if other.id == p.id or side_of.get(other.faction, other.faction) == side:
+                continue
+            defense = defense_of[other.id]
+            entry = _attack_odds(
+                max(0, total - defense), weapon_data, _armor_rating_of(other),
+            )
+            entry.update(target_id=other.id, target_name=other.name, defense=defense)
+            odds_vs.append(entry)
+        p.attack_preview["odds_vs"] = odds_vs
+
     by_faction = {
         "player_or_ally": [p for p in participants if p.faction in ("player", "ally")],
         "hostile": [p for p in participants if p.faction == "hostile"],
@@ -2564,7 +2677,7 @@ def encounter_page(request, pk):
         npcs_grouped.append(("PLAYER NPCS", npcs_by_group.pop("PLAYER NPCS")))
     for label in sorted(npcs_by_group.keys()):
         npcs_grouped.append((label, npcs_by_group[label]))
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     combat_npc_templates = settings_obj.get_combat_npcs()
 
     # Group templates by category for the optgroup layout.
@@ -3034,7 +3147,7 @@ def participant_add(request, pk):
         # Catalogue lookup is by name. The catalogue is a JSON list of
         # dicts on SiteSettings; enforce-uniqueness happens in the
         # editor, so the first match wins here.
-        templates = SiteSettings.load().get_combat_npcs()
+        templates = SiteSettings.for_request(request).get_combat_npcs()
         entry = next((t for t in templates if t.get("name") == template_name), None)
         if entry is None:
             return redirect("combat:detail", pk=encounter.pk)
@@ -3668,18 +3781,22 @@ def _advance_turn_pointer(encounter):
                 "updated_at",
             ]
         )
-        _log(
-            encounter,
+        log_rows = [(
             "round_advance",
             f"Round {encounter.round_number} begins. Initiative re-rolled — order: " + ", ".join(rolled_lines) + ".",
-            round_number=encounter.round_number,
-            initiative_order=new_order,
-            rolled=rolled_lines,
-        )
+            dict(
+                round_number=encounter.round_number,
+                initiative_order=new_order,
+                rolled=rolled_lines,
+            ),
+        )]
         if cleared_any:
             # Phrasing covers both stance and aim clears — the
             # template reader doesn't need to know which fired.
-            _log(encounter, "system", "Defensive stances and aim cleared at round boundary.")
+            log_rows.append(
+                ("system", "Defensive stances and aim cleared at round boundary.", {})
+            )
+        _log_many(encounter, log_rows)
         # v0.15.29 — apply persistent grenade effects (burning tick,
         # smoke / tear gas / EMP / blinded expiry) at the round
         # boundary. Lives after the stance/aim sweep so a participant
@@ -4131,7 +4248,7 @@ def equip_weapon(request, pk, participant_id):
         )
         return redirect("combat:detail", pk=encounter.pk)
 
-    weapons = SiteSettings.load().get_weapons()
+    weapons = SiteSettings.for_request(request).get_weapons()
     entry = next((w for w in weapons if w.get("name") == name), None)
 
     if entry is None:
@@ -4268,7 +4385,7 @@ def equip_offhand(request, pk, participant_id):
         )
         return redirect("combat:detail", pk=encounter.pk)
 
-    weapons = SiteSettings.load().get_weapons()
+    weapons = SiteSettings.for_request(request).get_weapons()
     entry = next((w for w in weapons if w.get("name") == name), None)
 
     if entry is None:
@@ -4367,7 +4484,7 @@ def equip_armor(request, pk, participant_id):
         )
         return redirect("combat:detail", pk=encounter.pk)
 
-    armors = SiteSettings.load().get_armor()
+    armors = SiteSettings.for_request(request).get_armor()
     entry = next((a for a in armors if a.get("name") == name), None)
 
     if entry is None:
@@ -4453,7 +4570,7 @@ def set_cover(request, pk, participant_id):
     durability = None
     health = None
     if entry_name:
-        cover_catalogue = SiteSettings.load().get_cover()
+        cover_catalogue = SiteSettings.for_request(request).get_cover()
         entry = next(
             (c for c in cover_catalogue if c.get("name") == entry_name),
             None,
@@ -4783,11 +4900,7 @@ def _resolve_single_attack(
     weapon_amount = band_amount
     raw_damage = successes + weapon_amount
 
-    if target.participant_kind == "mook":
-        rating = target.mook_armor_rating or ""
-    else:
-        rating = (target.armor_data or {}).get("rating", "")
-    b_armor, l_armor = _parse_armor_rating(rating)
+    b_armor, l_armor = _parse_armor_rating(_armor_rating_of(target))
     if damage_type == "B":
         armor_reduction = b_armor
     elif damage_type == "L":
@@ -4826,22 +4939,25 @@ def _resolve_single_attack(
         cover_destroyed=cover_destroyed_this_attack,
     )
 
-    _log(
-        encounter,
-        "attack",
-        f"{attacker.name} hits {target.name} for {final_damage} {type_label} damage."
-        + msg_tail + spread_tail + gun_fu_tail + skill_merit_tail
-        + surprise_tail + range_tail,
-        **payload,
-    )
-    _log(
-        encounter,
-        "health_change",
-        f"{target.name} takes {final_damage} {type_label} damage."
-        + spread_tail + gun_fu_tail + skill_merit_tail
-        + surprise_tail + range_tail,
-        **payload,
-    )
+    # v0.15.72 — the hit's rows (attack, health change, and any
+    # incapacitation / knockdown follow-ups) are collected here and
+    # written by one ``_log_many`` at the end: one insert, one broadcast.
+    log_rows = [
+        (
+            "attack",
+            f"{attacker.name} hits {target.name} for {final_damage} {type_label} damage."
+            + msg_tail + spread_tail + gun_fu_tail + skill_merit_tail
+            + surprise_tail + range_tail,
+            payload,
+        ),
+        (
+            "health_change",
+            f"{target.name} takes {final_damage} {type_label} damage."
+            + spread_tail + gun_fu_tail + skill_merit_tail
+            + surprise_tail + range_tail,
+            dict(payload),
+        ),
+    ]
 
     # Auto-incapacitation: if the total damage now fills the track,
     # tag the target and emit a condition_set row. Idempotent.
@@ -4853,13 +4969,11 @@ def _resolve_single_attack(
         new_conds.append("incapacitated")
         target.conditions = new_conds
         target.save(update_fields=["conditions"])
-        _log(
-            encounter,
+        log_rows.append((
             "condition_set",
             f"{target.name} is INCAPACITATED.",
-            target_participant_id=target.id,
-            condition="incapacitated",
-        )
+            dict(target_participant_id=target.id, condition="incapacitated"),
+        ))
 
     # v0.15.26 — knockdown auto-trigger. Fires when the equipped weapon
     # carries the ``knockdown_capable`` catalogue flag, the attack
@@ -4894,43 +5008,47 @@ def _resolve_single_attack(
                 new_conds.append("prone")
             target.conditions = new_conds
             target.save(update_fields=["conditions"])
-            _log(
-                encounter,
+            log_rows.append((
                 "knockdown",
                 (
                     f"{target.name} knocked down: "
                     f"{resistance_pool}d → {ko_successes} successes "
                     f"(failed by {successes - ko_successes})."
                 ),
-                actor_participant_id=attacker.id,
-                target_participant_id=target.id,
-                weapon_name=weapon_name,
-                attacker_successes=successes,
-                resistance_pool=resistance_pool,
-                resistance_successes=ko_successes,
-                resistance_dice=ko_dice,
-                outcome="knocked_down",
-            )
+                dict(
+                    actor_participant_id=attacker.id,
+                    target_participant_id=target.id,
+                    weapon_name=weapon_name,
+                    attacker_successes=successes,
+                    resistance_pool=resistance_pool,
+                    resistance_successes=ko_successes,
+                    resistance_dice=ko_dice,
+                    outcome="knocked_down",
+                ),
+            ))
         else:
             # Resistance held — stay up. Still log a row so the timeline
             # captures the contest for narrative completeness.
-            _log(
-                encounter,
+            log_rows.append((
                 "knockdown",
                 (
                     f"{target.name} resists knockdown: "
                     f"{resistance_pool}d → {ko_successes} successes "
                     f"(stayed up)."
                 ),
-                actor_participant_id=attacker.id,
-                target_participant_id=target.id,
-                weapon_name=weapon_name,
-                attacker_successes=successes,
-                resistance_pool=resistance_pool,
-                resistance_successes=ko_successes,
-                resistance_dice=ko_dice,
-                outcome="stayed_up",
-            )
+                dict(
+                    actor_participant_id=attacker.id,
+                    target_participant_id=target.id,
+                    weapon_name=weapon_name,
+                    attacker_successes=successes,
+                    resistance_pool=resistance_pool,
+                    resistance_successes=ko_successes,
+                    resistance_dice=ko_dice,
+                    outcome="stayed_up",
+                ),
+            ))
+
+    _log_many(encounter, log_rows)
 
 
 @login_required
@@ -6473,7 +6591,7 @@ def grenade_inventory(request, pk, participant_id):
         return redirect("combat:detail", pk=encounter.pk)
 
     # Validate against the live catalogue. Bad / unknown slug bounces.
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     catalogue = _grenade_catalogue_by_slug(settings_obj.get_weapons())
     if gtype not in catalogue:
         messages.error(
@@ -6566,7 +6684,7 @@ def throw_grenade(request, pk, participant_id):
         return redirect("combat:detail", pk=encounter.pk)
 
     # 2) Catalogue lookup.
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     catalogue = _grenade_catalogue_by_slug(settings_obj.get_weapons())
     if gtype not in catalogue:
         messages.error(request, f"Unknown grenade type: {gtype}.")
@@ -7490,6 +7608,7 @@ def _serialize_participant(p):
     additive — existing callers keep working.
     """
     aim = _aim_state(p)
+    wound_pen = _wound_penalty(p)
     return {
         "id": p.id,
         "encounter_id": p.encounter_id,
@@ -7552,9 +7671,18 @@ def _serialize_participant(p):
         # v0.15.36 — grenade inventory map (slug → count).
         "grenade_inventory": _get_grenade_inventory(p),
         # v0.15.36 — wound + condition attack modifier sums.
-        "wound_penalty": _wound_penalty(p),
-        "attack_modifier_total": (
-            _wound_penalty(p) + _condition_attack_modifier(p)
+        "wound_penalty": wound_pen,
+        "attack_modifier_total": wound_pen + _condition_attack_modifier(p),
+        # v0.15.71 — pre-target attack pool and its exact odds
+        # (P(>=1/3/5 successes), expected successes, expected damage
+        # against an unarmored target). Same pool as the encounter
+        # page's attack preview, but via ``_actor_total_pool`` so a
+        # participant list doesn't build the full preview per row.
+        "attack_odds": _attack_odds(
+            max(0, _actor_total_pool(
+                p, p.weapon_data, 0, _weapon_skill_for(p.weapon_data),
+            )),
+            p.weapon_data,
         ),
     }
 
@@ -7594,11 +7722,15 @@ def _serialize_encounter(enc, with_log=False, log_limit=50):
         "metadata": {
             "is_surprise_round": bool(metadata.get("is_surprise_round", False)),
         },
+        # v0.15.74 — highest log sequence so far; WebSocket clients
+        # resume from it (``?resume_from=``).
+        "log_sequence": enc.log_sequence,
     }
     if with_log:
         out["participants"] = [
             _serialize_participant(p)
-            for p in enc.participants.all().order_by("position_order", "id")
+            for p in enc.participants.select_related("character", "npc")
+            .order_by("position_order", "id")
         ]
         # Last N entries newest-first; the GM's LLM usually wants the
         # most recent context, not the whole log of a 30-round fight.
@@ -8026,7 +8158,7 @@ def api_encounter_participants(request, pk):
         template_name = (body.get("template_name") or "").strip()
         if not template_name:
             return JsonResponse({"error": "template_name is required."}, status=400)
-        templates = SiteSettings.load().get_combat_npcs()
+        templates = SiteSettings.for_request(request).get_combat_npcs()
         entry = next((t for t in templates if t.get("name") == template_name), None)
         if entry is None:
             return JsonResponse({
@@ -8197,7 +8329,7 @@ def api_participant_equip(request, pk, participant_id):
         Participant, pk=participant_id, encounter=encounter
     )
 
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     action_cost = "instant"
 
     if slot == "armor":
@@ -8401,7 +8533,7 @@ def api_participant_set_cover(request, pk, participant_id):
     durability = None
     health = None
     if entry_name:
-        cover_catalogue = SiteSettings.load().get_cover()
+        cover_catalogue = SiteSettings.for_request(request).get_cover()
         entry = next(
             (c for c in cover_catalogue if c.get("name") == entry_name),
             None,
@@ -8469,7 +8601,7 @@ def api_participant_grenade_inventory(request, pk, participant_id):
         Participant, pk=participant_id, encounter=encounter
     )
 
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     catalogue = _grenade_catalogue_by_slug(settings_obj.get_weapons())
     if gtype not in catalogue:
         return JsonResponse({
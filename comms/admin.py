@@ -8,7 +8,7 @@ from .models import Message, Thread, ThreadMembership
 class ThreadMembershipInline(admin.TabularInline):
     model = ThreadMembership
     extra = 0
-    readonly_fields = ("joined_at", "last_read_at")
+    readonly_fields = ("joined_at", "last_read_at", "unread_count")
 
 
 class MessageInline(admin.TabularInline):
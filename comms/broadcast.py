@@ -0,0 +1,48 @@
+"""
+Channel-layer fan-out for the comms application.
+
+Views queue ``(group, event)`` pairs with ``send_after_commit``; nothing
+leaves the process until the surrounding transaction commits (immediately
+when there is none), and the whole batch goes out concurrently in a single
+``async_to_sync`` hop instead of one blocking round-trip per send.
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def send_after_commit(events):
+    """Queue ``[(group, event), ...]`` for one batched send after commit."""
+    events = list(events)
+    if events:
+        transaction.on_commit(lambda: flush(events))
+
+
+def flush(events):
+    """Send ``events`` now, concurrently.
+
+    Swallows channel-layer failures so a Redis outage can't 500 the
+    calling endpoint — the write already committed; clients catch up on
+    their next fetch.
+    """
+    try:
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        async_to_sync(_send_all)(layer, events)
+    except Exception:
+        logger.exception("comms broadcast failed (%d event(s))", len(events))
+
+
+async def _send_all(layer, events):
+    # ``group`` lets the multiplexed socket route the event to the topic
+    # that joined it (see ``exodus.consumers``).
+    await asyncio.gather(*(
+        layer.group_send(group, {**event, "group": group}) for group, event in events
+    ))
@@ -2,76 +2,113 @@
 WebSocket consumer for the comms application.
 
 Single connection per user at ws://host/ws/comms/.
-Uses sync WebsocketConsumer (safe with SQLite).
+Async consumer: an idle socket holds no worker thread. The one ORM read
+(thread memberships on connect) goes through ``database_sync_to_async``,
+which runs on the shared thread-sensitive executor (safe with SQLite).
 """
 
+import asyncio
 import json
 
-from asgiref.sync import async_to_sync
-from channels.generic.websocket import WebsocketConsumer
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
 
 from .models import ThreadMembership
 
 
-class CommsConsumer(WebsocketConsumer):
+@database_sync_to_async
+def _is_member(user, thread_id):
+    return ThreadMembership.objects.filter(user=user, thread_id=thread_id).exists()
+
+
+@database_sync_to_async
+def _thread_ids(user):
+    return list(
+        ThreadMembership.objects.filter(user=user).values_list("thread_id", flat=True)
+    )
+
+
+class CommsConsumer(AsyncWebsocketConsumer):
     """Handles WebSocket connections for real-time messaging."""
 
-    def connect(self):
+    async def connect(self):
         """Join user-specific group and all thread groups on connect."""
         user = self.scope["user"]
         if not user.is_authenticated:
-            self.close()
+            await self.close()
             return
 
         self.user_group = f"user_{user.pk}"
-        async_to_sync(self.channel_layer.group_add)(
-            self.user_group, self.channel_name
-        )
-
-        # Join all thread groups the user is a member of
-        self.thread_groups = set()
-        memberships = ThreadMembership.objects.filter(user=user)
-        for m in memberships:
-            group = f"thread_{m.thread_id}"
-            self.thread_groups.add(group)
-            async_to_sync(self.channel_layer.group_add)(
-                group, self.channel_name
-            )
+        # Join all thread groups the user is a member of, concurrently.
+        self.thread_groups = {f"thread_{tid}" for tid in await _thread_ids(user)}
+        await asyncio.gather(*(
+            self.channel_layer.group_add(group, self.channel_name)
+            for group in [self.user_group, *self.thread_groups]
+        ))
 
-        self.accept()
+        await self.accept()
 
-    def disconnect(self, close_code):
+    async def disconnect(self, close_code):
         """Leave all groups on disconnect."""
+        groups = []
         if hasattr(self, "user_group"):
-            async_to_sync(self.channel_layer.group_discard)(
-                self.user_group, self.channel_name
-            )
-        if hasattr(self, "thread_groups"):
-            for group in self.thread_groups:
-                async_to_sync(self.channel_layer.group_discard)(
-                    group, self.channel_name
-                )
+            groups.append(self.user_group)
+        groups.extend(getattr(self, "thread_groups", ()))
+        await asyncio.gather(*(
+            self.channel_layer.group_discard(group, self.channel_name)
+            for group in groups
+        ))
 
     # -----------------------------------------------------------------------
     # Channel layer event handlers
     # -----------------------------------------------------------------------
 
-    def chat_message(self, event):
+    async def chat_message(self, event):
         """Forward a new message to the client."""
-        self.send(text_data=json.dumps({
+        await self.send(text_data=json.dumps({
             "type": "new_message",
             "message": event["message"],
         }))
 
-    def unread_update(self, event):
+    async def unread_update(self, event):
         """Forward unread count update to the client."""
-        self.send(text_data=json.dumps({
+        await self.send(text_data=json.dumps({
             "type": "unread_update",
             "threadId": event["thread_id"],
             "unreadCount": event["unread_count"],
         }))
 
-    def membership_change(self, event):
+    async def unread_counts(self, event):
+        """Pick this user's counter out of a thread-wide unread fan-out.
+
+        ``send_message`` sends one event per thread carrying every other
+        member's fresh count (keyed by user id) instead of one event per
+        member; the sender has no entry and gets nothing.
+        """
+        count = event["counts"].get(str(self.scope["user"].pk))
+        if count is None:
+            return
+        await self.send(text_data=json.dumps({
+            "type": "unread_update",
+            "threadId": event["thread_id"],
+            "unreadCount": count,
+        }))
+
+    async def message_edited(self, event):
+        """Forward an edited message to the client."""
+        await self.send(text_data=json.dumps({
+            "type": "message_edited",
+            "message": event["message"],
+        }))
+
+    async def message_deleted(self, event):
+        """Forward a message deletion to the client."""
+        await self.send(text_data=json.dumps({
+            "type": "message_deleted",
+            "messageId": event["message_id"],
+        }))
+
+    async def membership_change(self, event):
         """Handle membership changes — join/leave thread groups."""
         thread_id = event["thread_id"]
         action = event["action"]
@@ -79,17 +116,53 @@ class CommsConsumer(WebsocketConsumer):
 
         if action == "added":
             self.thread_groups.add(group)
-            async_to_sync(self.channel_layer.group_add)(
-                group, self.channel_name
-            )
+            await self.channel_layer.group_add(group, self.channel_name)
         elif action == "removed":
             self.thread_groups.discard(group)
-            async_to_sync(self.channel_layer.group_discard)(
-                group, self.channel_name
-            )
+            await self.channel_layer.group_discard(group, self.channel_name)
 
-        self.send(text_data=json.dumps({
+        await self.send(text_data=json.dumps({
             "type": "membership_change",
             "threadId": thread_id,
             "action": action,
         }))
+
+
+class ThreadConsumer(CommsConsumer):
+    """One thread's messages — the ``thread:<id>`` topic of the mux socket.
+
+    Members only: anyone else is closed with 4403. Carries new / edited /
+    deleted messages and unread counters for that thread. It also joins
+    the user's group, but only to hear that the user was removed from
+    the thread: that closes the topic with 4403 (the mux drops it), so a
+    former member stops receiving the thread at once.
+    """
+
+    async def connect(self):
+        user = self.scope["user"]
+        if not user.is_authenticated:
+            await self.close()
+            return
+        thread_id = int(self.scope["url_route"]["kwargs"]["thread_id"])
+        if not await _is_member(user, thread_id):
+            await self.close(code=4403)
+            return
+
+        self.thread_id = thread_id
+        self.user_group = f"user_{user.pk}"
+        self.thread_groups = {f"thread_{thread_id}"}
+        await asyncio.gather(*(
+            self.channel_layer.group_add(group, self.channel_name)
+            for group in [self.user_group, *self.thread_groups]
+        ))
+        await self.accept()
+
+    async def dispatch(self, message):
+        # The rest of the user group's traffic belongs to the ``comms`` topic.
+        if message.get("group") == self.user_group and message["type"] != "membership.change":
+            return
+        await super().dispatch(message)
+
+    async def membership_change(self, event):
+        if event["thread_id"] == self.thread_id and event["action"] == "removed":
+            await self.close(code=4403)
@@ -54,10 +54,10 @@ def _mark_intrusion_detected(thread):
 
 def _post_system_alert(thread, message_text):
     """Post a system alert message to a thread and broadcast via WebSocket."""
-    from asgiref.sync import async_to_sync
-    from channels.layers import get_channel_layer
+    from .broadcast import send_after_commit
     from .models import Message
     from .serializers import serialize_message
+    from .unread import record_new_message
 
     # Get or create system user
     system_user, _ = User.objects.get_or_create(
@@ -71,16 +71,15 @@ def _post_system_alert(thread, message_text):
         posted_as_type="system",
         posted_as_name="SYSTEM",
     )
+    record_new_message(msg)
 
     # Broadcast to all non-hidden members
     msg_data = serialize_message(msg)
-    channel_layer = get_channel_layer()
-    memberships = thread.memberships.filter(hidden=False).select_related("user")
-    for m in memberships:
-        async_to_sync(channel_layer.group_send)(
-            f"user_{m.user_id}",
-            {"type": "chat.message", "message": msg_data},
-        )
+    user_ids = thread.memberships.filter(hidden=False).values_list("user_id", flat=True)
+    send_after_commit(
+        (f"user_{user_id}", {"type": "chat.message", "message": msg_data})
+        for user_id in user_ids
+    )
 
 
 def _get_actor_stats(user, persona_type=None, persona_id=None):
@@ -502,7 +501,7 @@ def cyber_roll(request, thread_id):
         return JsonResponse({"error": "Connection closed — no further actions possible."}, status=400)
     if not request.user.is_superuser:
         from exodus.models import SiteSettings
-        if SiteSettings.load().lock_comms:
+        if SiteSettings.for_request(request).lock_comms:
             return JsonResponse({"error": "Cyber terminal is locked between sessions."}, status=403)
 
     try:
@@ -1266,12 +1265,11 @@ def _roll_response(action_type, pool_desc, result, outcome,
 @require_GET
 def intercepted_threads(request):
     """List threads where the user has hidden (shadow) membership."""
-    from .serializers import serialize_thread_summary
-    hidden_memberships = ThreadMembership.objects.filter(
-        user=request.user, hidden=True,
-    ).select_related("thread")
-    threads = [m.thread for m in hidden_memberships]
-    data = [serialize_thread_summary(t, request.user) for t in threads]
+    from .serializers import serialize_thread_summaries
+    threads = Thread.objects.filter(
+        memberships__user=request.user, memberships__hidden=True,
+    ).order_by("memberships__pk")
+    data = serialize_thread_summaries(threads, request.user)
     for d in data:
         d["intercepted"] = True
     return JsonResponse(data, safe=False)
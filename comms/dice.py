@@ -9,9 +9,10 @@ Rules:
 - Dramatic failure: zero successes when any die shows 1 (only on chance die / 0-pool)
 """
 
-import random
 from dataclasses import dataclass, field
 
+from exodus import dice as dice_engine
+
 
 @dataclass
 class RollResult:
@@ -34,39 +35,19 @@ class RollResult:
 
 
 def roll_dice(pool: int) -> RollResult:
-    """Roll a WoD 2.0 dice pool.
+    """Roll a WoD 2.0 dice pool through the shared ``exodus.dice`` engine.
 
     Args:
         pool: Number of dice to roll. If <= 0, rolls a single chance die.
     """
-    result = RollResult(dice_pool=max(pool, 0))
-
-    if pool <= 0:
-        # Chance die: single d10, only 10 succeeds, 1 is dramatic failure
-        die = random.randint(1, 10)
-        result.rolls = [die]
-        if die == 10:
-            result.successes = 1
-        elif die == 1:
-            result.is_dramatic_failure = True
-            result.successes = 0
-        else:
-            result.successes = 0
-        return result
-
-    rolls = []
-    dice_to_roll = pool
-    while dice_to_roll > 0:
-        new_rolls = [random.randint(1, 10) for _ in range(dice_to_roll)]
-        rolls.extend(new_rolls)
-        # 10s explode — count them and roll again
-        dice_to_roll = sum(1 for d in new_rolls if d == 10)
-
-    result.rolls = rolls
-    result.successes = sum(1 for d in rolls if d >= 8)
-    result.is_exceptional = result.successes >= 5
-
-    return result
+    roll = dice_engine.roll(pool)
+    return RollResult(
+        dice_pool=max(pool, 0),
+        rolls=roll.faces,
+        successes=roll.successes,
+        is_exceptional=not roll.is_chance and roll.is_exceptional,
+        is_dramatic_failure=roll.is_dramatic_failure,
+    )
 
 
 # Deploy sub-action pool definitions: {action: (attribute_path, skill_category, skill_name)}
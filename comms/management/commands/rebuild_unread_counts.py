@@ -0,0 +1,31 @@
+"""Rebuild the denormalized ThreadMembership.unread_count counters.
+
+    python manage.py rebuild_unread_counts            # every membership
+    python manage.py rebuild_unread_counts --user 7   # one user's threads
+
+The counters are maintained incrementally by the comms write paths; this
+recomputes them from the Message table (see ``comms.unread.recount_unread``)
+after imports, manual DB edits, or any suspected drift.
+"""
+
+from django.core.management.base import BaseCommand
+
+from comms.models import ThreadMembership
+from comms.unread import recount_unread
+
+
+class Command(BaseCommand):
+    help = "Recompute ThreadMembership.unread_count from the Message table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, default=None,
+            help="Only rebuild memberships of the user with this ID.",
+        )
+
+    def handle(self, *args, **options):
+        memberships = ThreadMembership.objects.all()
+        if options["user"] is not None:
+            memberships = memberships.filter(user_id=options["user"])
+        rebuilt = recount_unread(memberships)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} unread counter(s)."))
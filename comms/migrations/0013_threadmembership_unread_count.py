@@ -0,0 +1,42 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_counts(apps, schema_editor):
+    """Seed the new counter from the Message table (one UPDATE)."""
+    Message = apps.get_model("comms", "Message")
+    ThreadMembership = apps.get_model("comms", "ThreadMembership")
+    counted = (
+        Message.objects.filter(
+            thread_id=OuterRef("thread_id"),
+            created_at__gt=OuterRef("last_read_at"),
+        )
+        .exclude(sender_id=OuterRef("user_id"))
+        .order_by()
+        .values("thread_id")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    ThreadMembership.objects.update(
+        unread_count=Coalesce(Subquery(counted), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comms", "0012_message_edited_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="threadmembership",
+            name="unread_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Messages newer than last_read_at not sent by this user.",
+            ),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
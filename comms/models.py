@@ -84,6 +84,12 @@ class ThreadMembership(models.Model):
         default=False,
         help_text="Whether this user has activated Defend on this thread.",
     )
+    # Denormalized unread counter — maintained by comms.unread, rebuilt
+    # by ``manage.py rebuild_unread_counts``.
+    unread_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Messages newer than last_read_at not sent by this user.",
+    )
 
     class Meta:
         unique_together = ("thread", "user")
@@ -124,6 +130,13 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # Keyset pagination of thread history (comms.serializers.message_page)
+            # and the latest-message-per-thread preview.
+            models.Index(
+                fields=["thread", "created_at", "id"], name="comms_msg_thread_keyset",
+            ),
+        ]
 
     def __str__(self) -> str:
         name = self.posted_as_name or self.sender.username
@@ -5,28 +5,88 @@ Manual JSON serialization (no DRF), following project conventions.
 Uses Character model to build display names.
 """
 
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
 from django.contrib.auth.models import User
+from django.db.models import OuterRef, Q, QuerySet, Subquery
 from django.utils.timezone import localtime
 
 from characters.models import Character
+from exodus.images import image_url
 from npcs.models import NPC
 
 from .models import Message, Thread, ThreadMembership
 
 
-def _get_display_name(user: User) -> str:
+class IdentityLookup:
+    """Batch-loaded Character / NPC rows behind member and sender names.
+
+    Built once per response so serializing N members costs a fixed number
+    of queries instead of one ``Character`` / ``NPC`` lookup per member.
+    ``owner_ids`` resolve to each user's *first* character under the
+    model's default ordering — the same row ``filter(owner=...).first()``
+    returns.
+    """
+
+    def __init__(self, owner_ids=(), character_ids=(), npc_ids=()):
+        owner_ids = {i for i in owner_ids if i}
+        character_ids = {i for i in character_ids if i}
+        npc_ids = {i for i in npc_ids if i}
+        self.owner_characters = {}
+        if owner_ids:
+            for char in Character.objects.filter(owner_id__in=owner_ids).only(
+                "id", "owner_id", "name", "profile_picture", "updated_at",
+            ):
+                self.owner_characters.setdefault(char.owner_id, char)
+        self.characters = {}
+        if character_ids:
+            self.characters = {
+                c.pk: c for c in Character.objects.filter(pk__in=character_ids).only(
+                    "id", "name", "profile_picture",
+                )
+            }
+        self.npcs = {}
+        if npc_ids:
+            self.npcs = {
+                n.pk: n for n in NPC.objects.filter(pk__in=npc_ids).only("id", "name", "image")
+            }
+
+    @classmethod
+    def for_memberships(cls, memberships, extra_owner_ids=()):
+        """Lookup covering every member (alias targets included)."""
+        owner_ids, character_ids, npc_ids = set(extra_owner_ids), set(), set()
+        for m in memberships:
+            if m.alias_type == "character" and m.alias_id:
+                character_ids.add(m.alias_id)
+            elif m.alias_type == "npc" and m.alias_id:
+                npc_ids.add(m.alias_id)
+            elif not m.alias_type:
+                owner_ids.add(m.user_id)
+        return cls(owner_ids, character_ids, npc_ids)
+
+
+def _get_display_name(user: User, lookup: IdentityLookup | None = None) -> str:
     """Return 'CharacterName (username)' or just username if no character."""
-    character = Character.objects.filter(owner=user).first()
+    if lookup is not None:
+        character = lookup.owner_characters.get(user.pk)
+    else:
+        character = Character.objects.filter(owner=user).first()
     if character:
         return f"{character.name} ({user.username})"
     return user.username
 
 
-def _serialize_member(user: User, membership: ThreadMembership | None = None) -> dict:
+def _serialize_member(
+    user: User,
+    membership: ThreadMembership | None = None,
+    lookup: IdentityLookup | None = None,
+) -> dict:
     """Serialize a thread member with display name and portrait.
 
     If the membership has an alias (GM/NPC persona), use that instead
-    of the user's real character identity.
+    of the user's real character identity. Pass a prebuilt ``lookup`` to
+    avoid per-member queries when serializing lists.
     """
     data = {"id": user.pk}
 
@@ -35,15 +95,21 @@ def _serialize_member(user: User, membership: ThreadMembership | None = None) ->
         if membership.alias_type == "gm":
             data["displayName"] = "GM"
             profile = getattr(user, "profile", None)
-            data["portrait"] = profile.avatar.url if profile and profile.avatar else None
+            data["portrait"] = image_url(profile.avatar, "avatar") if profile else None
         elif membership.alias_type == "npc" and membership.alias_id:
-            npc = NPC.objects.filter(pk=membership.alias_id).first()
+            if lookup is not None:
+                npc = lookup.npcs.get(membership.alias_id)
+            else:
+                npc = NPC.objects.filter(pk=membership.alias_id).first()
             data["displayName"] = membership.alias_name or (npc.name if npc else "NPC")
-            data["portrait"] = npc.image.url if npc and npc.image else None
+            data["portrait"] = image_url(npc.image, "avatar") if npc else None
         elif membership.alias_type == "character" and membership.alias_id:
-            char = Character.objects.filter(pk=membership.alias_id).first()
+            if lookup is not None:
+                char = lookup.characters.get(membership.alias_id)
+            else:
+                char = Character.objects.filter(pk=membership.alias_id).first()
             data["displayName"] = membership.alias_name or (char.name if char else "Character")
-            data["portrait"] = char.profile_picture.url if char and char.profile_picture else None
+            data["portrait"] = image_url(char.profile_picture, "avatar") if char else None
         else:
             data["displayName"] = membership.alias_name or user.username
             data["portrait"] = None
@@ -51,10 +117,13 @@ def _serialize_member(user: User, membership: ThreadMembership | None = None) ->
         return data
 
     # Default: use the user's character portrait, fall back to avatar
-    character = Character.objects.filter(owner=user).first()
+    if lookup is not None:
+        character = lookup.owner_characters.get(user.pk)
+    else:
+        character = Character.objects.filter(owner=user).first()
     if character:
         data["displayName"] = f"{character.name} ({user.username})"
-        data["portrait"] = character.profile_picture.url if character.profile_picture else None
+        data["portrait"] = image_url(character.profile_picture, "avatar")
     else:
         data["displayName"] = user.username
         data["portrait"] = None
@@ -63,22 +132,22 @@ def _serialize_member(user: User, membership: ThreadMembership | None = None) ->
     if not data["portrait"]:
         profile = getattr(user, "profile", None)
         if profile and profile.avatar:
-            data["portrait"] = profile.avatar.url
+            data["portrait"] = image_url(profile.avatar, "avatar")
 
     return data
 
 
-def serialize_message(message: Message) -> dict:
+def serialize_message(message: Message, lookup: IdentityLookup | None = None) -> dict:
     """Serialize a single message."""
     data = {
         "id": message.pk,
         "threadId": message.thread_id,
         "sender": {
             "id": message.sender_id,
-            "displayName": _get_display_name(message.sender),
+            "displayName": _get_display_name(message.sender, lookup),
         },
         "content": message.content,
-        "image": message.image.url if message.image else None,
+        "image": image_url(message.image, "full"),
         "createdAt": localtime(message.created_at).isoformat(),
         "editedAt": localtime(message.edited_at).isoformat() if message.edited_at else None,
     }
@@ -93,47 +162,160 @@ def serialize_message(message: Message) -> dict:
 
 def serialize_thread_summary(thread: Thread, user: User) -> dict:
     """Serialize a thread for the list view."""
-    memberships = thread.memberships.select_related("user").all()
-    # Filter out hidden members (shadow access from cyber terminal)
-    visible = [m for m in memberships if not m.hidden]
-    members = [_serialize_member(m.user, m) for m in visible]
-
-    # Last message preview
-    last_msg = thread.messages.select_related("sender").order_by("-created_at").first()
-    last_message = None
-    if last_msg:
-        last_message = {
-            "sender": _get_display_name(last_msg.sender),
-            "content": last_msg.content[:100],
-            "createdAt": localtime(last_msg.created_at).isoformat(),
-        }
+    return serialize_thread_summaries([thread], user)[0]
+
+
+def serialize_thread_summaries(threads, user: User) -> list[dict]:
+    """Serialize many threads for the list view in a constant number of queries.
+
+    Loads, for the whole page at once: the threads with their latest
+    message id (correlated subquery), every membership with its user and
+    profile, the latest messages with their senders, and the Character /
+    NPC rows behind member and sender names (``IdentityLookup``).
+    """
+    latest_id = (
+        Message.objects.filter(thread_id=OuterRef("pk"))
+        .order_by("-created_at", "-id")
+        .values("id")[:1]
+    )
+    if isinstance(threads, QuerySet):
+        threads = list(threads.annotate(last_message_id=Subquery(latest_id)))
+    else:
+        # Plain instances (e.g. the single-thread detail path): re-read
+        # them with the annotation, keeping the caller's order.
+        rank = {t.pk: i for i, t in enumerate(threads)}
+        threads = sorted(
+            Thread.objects.filter(pk__in=rank).annotate(last_message_id=Subquery(latest_id)),
+            key=lambda t: rank[t.pk],
+        )
+    if not threads:
+        return []
+
+    memberships_by_thread = {t.pk: [] for t in threads}
+    memberships = list(
+        ThreadMembership.objects.filter(thread_id__in=memberships_by_thread)
+        .select_related("user", "user__profile")
+        .order_by("pk")
+    )
+    for m in memberships:
+        memberships_by_thread[m.thread_id].append(m)
+
+    last_ids = [t.last_message_id for t in threads if t.last_message_id]
+    last_messages = Message.objects.select_related("sender").in_bulk(last_ids) if last_ids else {}
 
-    # Unread count for this user
-    unread_count = 0
+    lookup = IdentityLookup.for_memberships(
+        memberships, extra_owner_ids=[m.sender_id for m in last_messages.values()],
+    )
+
+    results = []
+    for thread in threads:
+        thread_memberships = memberships_by_thread[thread.pk]
+        # Filter out hidden members (shadow access from cyber terminal)
+        members = [
+            _serialize_member(m.user, m, lookup) for m in thread_memberships if not m.hidden
+        ]
+
+        # Last message preview
+        last_msg = last_messages.get(thread.last_message_id)
+        last_message = None
+        if last_msg:
+            last_message = {
+                "sender": _get_display_name(last_msg.sender, lookup),
+                "content": last_msg.content[:100],
+                "createdAt": localtime(last_msg.created_at).isoformat(),
+            }
+
+        # Unread count for this user (denormalized counter, see comms.unread)
+        own = next((m for m in thread_memberships if m.user_id == user.pk), None)
+
+        results.append({
+            "id": thread.pk,
+            "title": thread.title,
+            "creator": thread.creator_id,
+            "members": members,
+            "lastMessage": last_message,
+            "unreadCount": own.unread_count if own else 0,
+            "updatedAt": localtime(thread.updated_at).isoformat(),
+            "isConnectionClosed": thread.is_connection_closed,
+            "isIntercepted": bool(own and own.hidden),
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Message history (keyset pagination)
+# ---------------------------------------------------------------------------
+
+MESSAGE_PAGE_SIZE = 100
+MESSAGE_PAGE_MAX = 200
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(message: Message) -> str:
+    """Opaque keyset cursor for ``message``: ``<epoch µs>.<id>``."""
+    micros = (message.created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{message.pk}"
+
+
+def decode_cursor(cursor: str):
+    """Inverse of ``encode_cursor``. Raises ``ValueError`` on garbage,
+    including values past what a datetime or an SQLite integer holds."""
+    micros, _, pk = (cursor or "").partition(".")
     try:
-        membership = thread.memberships.get(user=user)
-        unread_count = thread.messages.filter(
-            created_at__gt=membership.last_read_at
-        ).exclude(sender=user).count()
-    except ThreadMembership.DoesNotExist:
-        pass
+        created_at = _EPOCH + timedelta(microseconds=int(micros))
+    except OverflowError:
+        raise ValueError(f"cursor out of range: {cursor!r}")
+    pk = int(pk)
+    if not 0 <= pk < 2 ** 63:
+        raise ValueError(f"cursor out of range: {cursor!r}")
+    return created_at, pk
+
+
+def message_page(thread: Thread, before=None, after=None, limit=MESSAGE_PAGE_SIZE) -> dict:
+    """One page of ``thread``'s messages, keyset-paginated on ``(created_at, id)``.
 
+    With no cursor this is the LATEST page. ``before`` / ``after`` are
+    ``encode_cursor`` strings and walk older / newer from that message.
+    Messages are always returned oldest-first; every page is a single
+    indexed range scan (``comms_msg_thread_keyset``), so its cost doesn't
+    depend on how long the thread is.
+    """
+    limit = max(1, min(int(limit), MESSAGE_PAGE_MAX))
+    qs = Message.objects.filter(thread=thread).select_related("sender")
+    if after is not None:
+        created_at, pk = decode_cursor(after)
+        qs = qs.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        ).order_by("created_at", "id")
+        rows = list(qs[:limit + 1])
+        has_newer, has_older = len(rows) > limit, True
+        rows = rows[:limit]
+    else:
+        if before is not None:
+            created_at, pk = decode_cursor(before)
+            qs = qs.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+        rows = list(qs.order_by("-created_at", "-id")[:limit + 1])
+        has_older, has_newer = len(rows) > limit, before is not None
+        rows = rows[:limit][::-1]
+
+    lookup = IdentityLookup(owner_ids=[m.sender_id for m in rows])
     return {
-        "id": thread.pk,
-        "title": thread.title,
-        "creator": thread.creator_id,
-        "members": members,
-        "lastMessage": last_message,
-        "unreadCount": unread_count,
-        "updatedAt": localtime(thread.updated_at).isoformat(),
-        "isConnectionClosed": thread.is_connection_closed,
-        "isIntercepted": ThreadMembership.objects.filter(thread=thread, user=user, hidden=True).exists(),
+        "messages": [serialize_message(m, lookup) for m in rows],
+        "page": {
+            "hasOlder": has_older,
+            "hasNewer": has_newer,
+            "olderCursor": encode_cursor(rows[0]) if rows else before,
+            "newerCursor": encode_cursor(rows[-1]) if rows else after,
+        },
     }
 
 
 def serialize_thread_detail(thread: Thread, user: User) -> dict:
-    """Serialize a thread with its recent messages."""
+    """Serialize a thread with its latest page of messages."""
     summary = serialize_thread_summary(thread, user)
-    messages = thread.messages.select_related("sender").order_by("created_at")[:100]
-    summary["messages"] = [serialize_message(m) for m in messages]
+    page = message_page(thread)
+    summary["messages"] = page["messages"]
+    summary["messagePage"] = page["page"]
     return summary
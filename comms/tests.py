@@ -0,0 +1,324 @@
+"""Tests for the comms unread counters and the batched thread-list serializer.
+
+The channel layer points at Redis, which isn't running under test; the
+views' ``group_send`` calls are patched out so only DB behaviour is
+exercised.
+"""
+
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from characters.models import Character
+from comms.consumers import CommsConsumer
+from comms.models import Message, Thread, ThreadMembership
+from comms.unread import recount_unread, total_unread
+from exodus.models import SiteSettings
+from npcs.models import NPC
+
+
+class _FakeLayer:
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, event):
+        self.sent.append((group, event))
+
+
+def _no_channel_layer(layer=None):
+    return mock.patch("comms.broadcast.get_channel_layer", return_value=layer or _FakeLayer())
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+        self.thread = Thread.objects.create(title="Ops", creator=self.alice)
+        for u in (self.alice, self.bob):
+            ThreadMembership.objects.create(thread=self.thread, user=u)
+        self.alice_client = Client()
+        self.alice_client.force_login(self.alice)
+        self.bob_client = Client()
+        self.bob_client.force_login(self.bob)
+
+        s = SiteSettings.load()
+        s.lock_comms = False
+        s.save()
+
+    def _send(self, client, content="hello"):
+        with _no_channel_layer():
+            resp = client.post(
+                f"/api/comms/threads/{self.thread.pk}/messages/",
+                data=json.dumps({"content": content}),
+                content_type="application/json",
+            )
+        self.assertEqual(resp.status_code, 201)
+        return resp.json()
+
+    def test_image_derivatives_are_built_after_commit(self):
+        depth = len(connection.atomic_blocks)  # the TestCase's own blocks
+        seen = []
+        with mock.patch(
+            "comms.views.generate_derivatives",
+            side_effect=lambda image: seen.append(len(connection.atomic_blocks)),
+        ):
+            self._send(self.alice_client)
+        self.assertEqual(seen, [depth])
+
+    def _counter(self, user):
+        return ThreadMembership.objects.get(thread=self.thread, user=user).unread_count
+
+    def test_send_bumps_other_members_only(self):
+        self._send(self.alice_client)
+        self._send(self.alice_client)
+        self.assertEqual(self._counter(self.bob), 2)
+        self.assertEqual(self._counter(self.alice), 0)
+        self.assertEqual(total_unread(self.bob), 2)
+
+        # Replying marks the thread read for the sender.
+        self._send(self.bob_client)
+        self.assertEqual(self._counter(self.bob), 0)
+        self.assertEqual(self._counter(self.alice), 1)
+
+    def test_send_fans_out_once_per_thread_after_commit(self):
+        User = get_user_model()
+        for i in range(10):
+            ThreadMembership.objects.create(
+                thread=self.thread, user=User.objects.create_user(f"extra{i}", password="pw"),
+            )
+        layer = _FakeLayer()
+        with _no_channel_layer(layer), self.captureOnCommitCallbacks(execute=True):
+            resp = self.alice_client.post(
+                f"/api/comms/threads/{self.thread.pk}/messages/",
+                data=json.dumps({"content": "ping"}),
+                content_type="application/json",
+            )
+            self.assertEqual(resp.status_code, 201)
+            self.assertEqual(layer.sent, [])  # nothing leaves before commit
+
+        group = f"thread_{self.thread.pk}"
+        self.assertEqual([(g, e["type"]) for g, e in layer.sent], [
+            (group, "chat.message"), (group, "unread.counts"),
+        ])
+        counts = layer.sent[1][1]["counts"]
+        self.assertEqual(len(counts), 11)
+        self.assertNotIn(str(self.alice.pk), counts)
+        self.assertEqual(counts[str(self.bob.pk)], 1)
+
+    def test_mark_read_resets_counter(self):
+        self._send(self.alice_client)
+        resp = self.bob_client.post(f"/api/comms/threads/{self.thread.pk}/read/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._counter(self.bob), 0)
+        self.assertEqual(self.bob_client.get("/api/comms/unread/").json(), {"unreadCount": 0})
+
+    def test_deleting_unread_message_decrements(self):
+        User = get_user_model()
+        gm = User.objects.create_superuser("gm", "gm@example.com", "pw")
+        gm_client = Client()
+        gm_client.force_login(gm)
+        msg = self._send(self.alice_client)
+        self._send(self.alice_client)
+        with _no_channel_layer():
+            resp = gm_client.delete(f"/api/comms/threads/{self.thread.pk}/messages/{msg['id']}/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._counter(self.bob), 1)
+
+    def test_recount_matches_message_table(self):
+        self._send(self.alice_client)
+        self._send(self.alice_client)
+        ThreadMembership.objects.update(unread_count=99)  # simulate drift
+        recount_unread()
+        self.assertEqual(self._counter(self.bob), 2)
+        self.assertEqual(self._counter(self.alice), 0)
+
+        ThreadMembership.objects.update(unread_count=0)
+        call_command("rebuild_unread_counts", stdout=open("/dev/null", "w"))
+        self.assertEqual(self._counter(self.bob), 2)
+
+    def test_nav_badge_query_count_independent_of_thread_count(self):
+        def badge_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                total_unread(self.bob)
+            return len(ctx.captured_queries)
+
+        baseline = badge_queries()
+        for i in range(20):
+            t = Thread.objects.create(title=f"T{i}", creator=self.alice)
+            ThreadMembership.objects.create(thread=t, user=self.bob)
+            Message.objects.create(thread=t, sender=self.alice, content="x")
+        recount_unread()
+        self.assertEqual(badge_queries(), baseline)
+        self.assertEqual(total_unread(self.bob), 20)
+
+
+class ThreadListQueryCountTests(TestCase):
+    """``GET /api/comms/threads/`` must not scale queries with thread count."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.player = User.objects.create_user("player", password="pw")
+        self.other = User.objects.create_user("other", password="pw")
+        self.gm = User.objects.create_superuser("gm", "gm@example.com", "pw")
+        Character.objects.create(owner=self.player, name="Vex")
+        Character.objects.create(owner=self.other, name="Kade")
+        self.alias_char = Character.objects.create(owner=self.gm, name="Double Agent")
+        self.npc = NPC.objects.create(name="Fixer", created_by=self.gm)
+        self.client = Client()
+        self.client.force_login(self.player)
+
+    def _seed(self, n):
+        start = Thread.objects.count()
+        threads = Thread.objects.bulk_create(
+            Thread(title=f"T{start + i}", creator=self.player) for i in range(n)
+        )
+        memberships, messages = [], []
+        for i, t in enumerate(threads):
+            memberships += [
+                ThreadMembership(thread=t, user=self.player),
+                ThreadMembership(thread=t, user=self.other, hidden=(i % 7 == 0)),
+                ThreadMembership(
+                    thread=t, user=self.gm,
+                    alias_type="npc" if i % 2 else "character",
+                    alias_id=self.npc.pk if i % 2 else self.alias_char.pk,
+                ),
+            ]
+            messages += [
+                Message(thread=t, sender=self.other, content="first"),
+                Message(thread=t, sender=self.gm, content="second"),
+            ]
+        ThreadMembership.objects.bulk_create(memberships)
+        Message.objects.bulk_create(messages)
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/comms/threads/")
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp.json()
+
+    def test_query_count_flat_from_5_to_500_threads(self):
+        self._seed(5)
+        self._list_queries()  # warm-up: first request creates the UserProfile
+        small_count, small = self._list_queries()
+        self.assertEqual(len(small), 5)
+
+        self._seed(495)
+        large_count, large = self._list_queries()
+        self.assertEqual(len(large), 500)
+        self.assertEqual(large_count, small_count)
+
+        sample = large[0]
+        self.assertEqual(sample["lastMessage"]["content"], "second")
+        names = {m["displayName"] for m in sample["members"]}
+        self.assertIn("Vex (player)", names)
+        self.assertTrue(names & {"Fixer", "Double Agent"})
+
+
+class MessageHistoryTests(TestCase):
+    """Keyset-paginated history: latest page first, cursors both ways."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("reader", password="pw")
+        self.thread = Thread.objects.create(title="Long", creator=self.user)
+        ThreadMembership.objects.create(thread=self.thread, user=self.user)
+        # bulk_create rows can share a timestamp — the id tiebreak in the
+        # cursor keeps the ordering total regardless.
+        Message.objects.bulk_create(
+            Message(thread=self.thread, sender=self.user, content=f"m{i}") for i in range(250)
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _contents(self, messages):
+        return [m["content"] for m in messages]
+
+    def test_detail_returns_latest_page(self):
+        data = self.client.get(f"/api/comms/threads/{self.thread.pk}/").json()
+        self.assertEqual(len(data["messages"]), 100)
+        self.assertEqual(data["messages"][-1]["content"], "m249")
+        self.assertEqual(data["messages"][0]["content"], "m150")
+        self.assertTrue(data["messagePage"]["hasOlder"])
+        self.assertFalse(data["messagePage"]["hasNewer"])
+
+    def test_walk_backwards_then_forwards(self):
+        url = f"/api/comms/threads/{self.thread.pk}/history/"
+        first = self.client.get(url, {"limit": 100}).json()
+        second = self.client.get(url, {"before": first["page"]["olderCursor"], "limit": 100}).json()
+        third = self.client.get(url, {"before": second["page"]["olderCursor"], "limit": 100}).json()
+        self.assertEqual(self._contents(second["messages"]), [f"m{i}" for i in range(50, 150)])
+        self.assertEqual(self._contents(third["messages"]), [f"m{i}" for i in range(50)])
+        self.assertFalse(third["page"]["hasOlder"])
+
+        newer = self.client.get(url, {"after": third["page"]["newerCursor"], "limit": 10}).json()
+        self.assertEqual(self._contents(newer["messages"]), [f"m{i}" for i in range(50, 60)])
+        self.assertTrue(newer["page"]["hasNewer"])
+
+    def test_bad_cursor_is_400(self):
+        url = f"/api/comms/threads/{self.thread.pk}/history/"
+        for cursor in ("nope", "99999999999999999999.1", f"0.{10 ** 30}"):
+            self.assertEqual(self.client.get(url, {"before": cursor}).status_code, 400, cursor)
+
+    def test_page_query_count_independent_of_thread_length(self):
+        url = f"/api/comms/threads/{self.thread.pk}/history/"
+        self.client.get(url)  # warm-up
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {"limit": 50})
+        before = len(ctx.captured_queries)
+        Message.objects.bulk_create(
+            Message(thread=self.thread, sender=self.user, content="x") for _ in range(2000)
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {"limit": 50})
+        self.assertEqual(len(ctx.captured_queries), before)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class CommsConsumerTests(TransactionTestCase):
+    """The async consumer joins every thread group and forwards events."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("ws_user", password="pw")
+        self.threads = [
+            Thread.objects.create(title=f"T{i}", creator=self.user) for i in range(3)
+        ]
+        for thread in self.threads:
+            ThreadMembership.objects.create(thread=thread, user=self.user)
+
+    async def test_connect_joins_thread_groups_and_forwards(self):
+        communicator = WebsocketCommunicator(CommsConsumer.as_asgi(), "/ws/comms/")
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        layer = get_channel_layer()
+        await layer.group_send(f"thread_{self.threads[2].pk}", {
+            "type": "message.deleted", "message_id": 7,
+        })
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "message_deleted", "messageId": 7},
+        )
+        await layer.group_send(f"user_{self.user.pk}", {
+            "type": "unread.update", "thread_id": 1, "unread_count": 2,
+        })
+        self.assertEqual(
+            (await communicator.receive_json_from())["unreadCount"], 2,
+        )
+        await communicator.disconnect()
+
+    async def test_anonymous_is_rejected(self):
+        from django.contrib.auth.models import AnonymousUser
+        communicator = WebsocketCommunicator(CommsConsumer.as_asgi(), "/ws/comms/")
+        communicator.scope["user"] = AnonymousUser()
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
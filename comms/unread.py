@@ -0,0 +1,86 @@
+"""
+Unread-message counters for the comms application.
+
+``ThreadMembership.unread_count`` is a denormalized counter of messages in
+the thread newer than ``last_read_at`` and not sent by the member. It is
+maintained incrementally by the write paths (send, system alert, delete,
+mark read) so the nav badge is a single ``SUM`` instead of one ``COUNT``
+per thread.
+
+``recount_unread`` is the authoritative fallback: one ``UPDATE`` with a
+correlated aggregate subquery that rewrites the counters from the
+``Message`` table. ``manage.py rebuild_unread_counts`` runs it for every
+membership.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Message, Thread, ThreadMembership
+
+
+def record_new_message(message: Message) -> None:
+    """Bump every other member's counter and clear the sender's.
+
+    Posting implies the sender has read the thread (``last_read_at`` moves
+    to now), matching the pre-counter behaviour of ``send_message``.
+    """
+    ThreadMembership.objects.filter(thread_id=message.thread_id).exclude(
+        user_id=message.sender_id
+    ).update(unread_count=F("unread_count") + 1)
+    ThreadMembership.objects.filter(
+        thread_id=message.thread_id, user_id=message.sender_id
+    ).update(last_read_at=timezone.now(), unread_count=0)
+
+
+def record_deleted_message(message: Message) -> None:
+    """Decrement the members who still had ``message`` counted as unread."""
+    ThreadMembership.objects.filter(
+        thread_id=message.thread_id,
+        last_read_at__lt=message.created_at,
+        unread_count__gt=0,
+    ).exclude(user_id=message.sender_id).update(unread_count=F("unread_count") - 1)
+
+
+def mark_thread_read(thread: Thread, user: User) -> int:
+    """Reset ``user``'s counter on ``thread``. Returns rows updated (0/1)."""
+    return ThreadMembership.objects.filter(thread=thread, user=user).update(
+        last_read_at=timezone.now(), unread_count=0,
+    )
+
+
+def total_unread(user: User) -> int:
+    """Nav-badge total across every thread ``user`` belongs to. One query."""
+    total = ThreadMembership.objects.filter(user=user).aggregate(
+        total=Sum("unread_count"),
+    )["total"]
+    return total or 0
+
+
+def exact_unread_subquery():
+    """Correlated ``COUNT`` of unread messages for an outer membership row."""
+    counted = (
+        Message.objects.filter(
+            thread_id=OuterRef("thread_id"),
+            created_at__gt=OuterRef("last_read_at"),
+        )
+        .exclude(sender_id=OuterRef("user_id"))
+        .order_by()
+        .values("thread_id")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counted), Value(0))
+
+
+def recount_unread(memberships=None) -> int:
+    """Rewrite ``unread_count`` from the ``Message`` table in one statement.
+
+    ``memberships`` narrows the rebuild (e.g. one user's rows); defaults to
+    every membership. Returns the number of rows rewritten.
+    """
+    if memberships is None:
+        memberships = ThreadMembership.objects.all()
+    return memberships.update(unread_count=exact_unread_subquery())
@@ -7,26 +7,32 @@ plus the page view that renders the React SPA.
 
 import json
 
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
+from django.db import transaction
 from django.utils import timezone
 from django.views.decorators.http import require_GET, require_http_methods, require_POST
 
 from characters.models import Character
 from npcs.models import NPC
 
+from exodus.images import generate_derivatives
+
+from .broadcast import send_after_commit
 from .models import Message, Thread, ThreadMembership
 from .serializers import (
+    MESSAGE_PAGE_SIZE,
+    IdentityLookup,
     _get_display_name,
     _serialize_member,
+    message_page,
     serialize_message,
     serialize_thread_detail,
-    serialize_thread_summary,
+    serialize_thread_summaries,
 )
+from .unread import mark_thread_read, record_deleted_message, record_new_message, total_unread
 
 
 # ---------------------------------------------------------------------------
@@ -59,7 +65,7 @@ def thread_list(request):
             threads = Thread.objects.filter(pk__in=thread_ids)
 
         threads = threads.order_by("-updated_at")
-        data = [serialize_thread_summary(t, request.user) for t in threads]
+        data = serialize_thread_summaries(threads, request.user)
         return JsonResponse(data, safe=False)
 
     # POST: create thread
@@ -148,6 +154,31 @@ def thread_detail(request, thread_id):
     return JsonResponse(data)
 
 
+@login_required
+@require_GET
+def message_history(request, thread_id):
+    """Page through a thread's messages with keyset cursors.
+
+    ``?before=<cursor>`` walks older, ``?after=<cursor>`` walks newer, no
+    cursor returns the latest page. ``?limit=`` caps the page size.
+    """
+    thread = get_object_or_404(Thread, pk=thread_id)
+    if not _can_view_thread(request.user, thread):
+        return JsonResponse({"error": "Forbidden"}, status=403)
+    before = request.GET.get("before") or None
+    after = request.GET.get("after") or None
+    if before and after:
+        return JsonResponse({"error": "Pass either before or after, not both"}, status=400)
+    try:
+        page = message_page(
+            thread, before=before, after=after,
+            limit=request.GET.get("limit", MESSAGE_PAGE_SIZE),
+        )
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor or limit"}, status=400)
+    return JsonResponse(page)
+
+
 @login_required
 @require_POST
 def update_alias(request, thread_id):
@@ -206,7 +237,7 @@ def send_message(request, thread_id):
         return JsonResponse({"error": "Connection closed"}, status=400)
     if not request.user.is_superuser:
         from exodus.models import SiteSettings
-        if SiteSettings.load().lock_comms:
+        if SiteSettings.for_request(request).lock_comms:
             return JsonResponse({"error": "Comms are locked between sessions."}, status=403)
 
     # Support both JSON and multipart (for image uploads)
@@ -255,54 +286,43 @@ def send_message(request, thread_id):
             except NPC.DoesNotExist:
                 pass
 
-    message = Message.objects.create(
-        thread=thread,
-        sender=request.user,
-        content=content,
-        image=image,
-        posted_as_type=posted_as_type,
-        posted_as_id=posted_as_id,
-        posted_as_name=posted_as_name,
-    )
-
-    # Touch thread updated_at
-    thread.updated_at = timezone.now()
-    thread.save(update_fields=["updated_at"])
+    with transaction.atomic():
+        message = Message.objects.create(
+            thread=thread,
+            sender=request.user,
+            content=content,
+            image=image,
+            posted_as_type=posted_as_type,
+            posted_as_id=posted_as_id,
+            posted_as_name=posted_as_name,
+        )
 
-    # Mark as read for sender
-    ThreadMembership.objects.filter(
-        thread=thread, user=request.user
-    ).update(last_read_at=timezone.now())
+        # Touch thread updated_at
+        thread.updated_at = timezone.now()
+        thread.save(update_fields=["updated_at"])
 
-    # Broadcast message via channel layer
-    msg_data = serialize_message(message)
-    channel_layer = get_channel_layer()
+        # Bump everyone else's unread counter; mark as read for sender
+        record_new_message(message)
 
-    # Send to all thread members
-    memberships = thread.memberships.select_related("user").all()
-    for membership in memberships:
-        async_to_sync(channel_layer.group_send)(
-            f"user_{membership.user_id}",
-            {
-                "type": "chat.message",
-                "message": msg_data,
-            },
-        )
+    # Resized copies are built outside the transaction: SQLite holds its
+    # write lock for the whole atomic block.
+    generate_derivatives(message.image)
 
-    # Send unread updates to all members except sender
-    for membership in memberships:
-        if membership.user_id != request.user.pk:
-            unread = thread.messages.filter(
-                created_at__gt=membership.last_read_at
-            ).exclude(sender=membership.user).count()
-            async_to_sync(channel_layer.group_send)(
-                f"user_{membership.user_id}",
-                {
-                    "type": "unread.update",
-                    "thread_id": thread.pk,
-                    "unread_count": unread,
-                },
-            )
+    # One aggregate read of the other members' fresh counters, then two
+    # thread-group sends (message + unread counters) regardless of how
+    # many members there are. Each CommsConsumer picks out its own count.
+    msg_data = serialize_message(message)
+    unread = {
+        str(user_id): count
+        for user_id, count in ThreadMembership.objects.filter(thread=thread)
+        .exclude(user=request.user)
+        .values_list("user_id", "unread_count")
+    }
+    group = f"thread_{thread.pk}"
+    send_after_commit([
+        (group, {"type": "chat.message", "message": msg_data}),
+        (group, {"type": "unread.counts", "thread_id": thread.pk, "counts": unread}),
+    ])
 
     return JsonResponse(msg_data, status=201)
 
@@ -317,13 +337,13 @@ def edit_message(request, thread_id, message_id):
     message = get_object_or_404(Message, pk=message_id, thread=thread)
 
     if request.method == "DELETE":
-        message.delete()
-        # Broadcast deletion to WebSocket clients
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f"thread_{thread.pk}",
-            {"type": "message.deleted", "message_id": message_id},
-        )
+        with transaction.atomic():
+            record_deleted_message(message)
+            message.delete()
+            # Broadcast deletion to WebSocket clients
+            send_after_commit([
+                (f"thread_{thread.pk}", {"type": "message.deleted", "message_id": message_id}),
+            ])
         return JsonResponse({"status": "deleted"})
 
     # PUT — edit content
@@ -340,11 +360,9 @@ def edit_message(request, thread_id, message_id):
     msg_data = serialize_message(message)
 
     # Broadcast edit to WebSocket clients
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f"thread_{thread.pk}",
-        {"type": "message.edited", "message": msg_data},
-    )
+    send_after_commit([
+        (f"thread_{thread.pk}", {"type": "message.edited", "message": msg_data}),
+    ])
 
     return JsonResponse(msg_data)
 
@@ -437,10 +455,7 @@ def admin_join(request, thread_id):
 def mark_read(request, thread_id):
     """Mark a thread as read for the current user."""
     thread = get_object_or_404(Thread, pk=thread_id)
-    now = timezone.now()
-    updated = ThreadMembership.objects.filter(
-        thread=thread, user=request.user
-    ).update(last_read_at=now)
+    updated = mark_thread_read(thread, request.user)
 
     if not updated:
         return JsonResponse({"error": "Not a member"}, status=403)
@@ -465,8 +480,11 @@ def unread_count(request):
 @require_GET
 def user_list(request):
     """List all users for the member picker."""
-    users = User.objects.filter(is_active=True).order_by("username")
-    data = [_serialize_member(u) for u in users]
+    users = list(
+        User.objects.filter(is_active=True).select_related("profile").order_by("username")
+    )
+    lookup = IdentityLookup(owner_ids=[u.pk for u in users])
+    data = [_serialize_member(u, lookup=lookup) for u in users]
     return JsonResponse(data, safe=False)
 
 
@@ -501,24 +519,18 @@ def _can_view_thread(user: User, thread: Thread) -> bool:
 
 def _get_total_unread(user: User) -> int:
     """Count total unread messages across all threads for a user."""
-    memberships = ThreadMembership.objects.filter(user=user).select_related("thread")
-    total = 0
-    for m in memberships:
-        total += Message.objects.filter(
-            thread=m.thread,
-            created_at__gt=m.last_read_at,
-        ).exclude(sender=user).count()
-    return total
+    return total_unread(user)
 
 
 def _notify_membership_change(thread: Thread, user: User, action: str):
     """Notify a user about membership changes via WebSocket."""
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f"user_{user.pk}",
-        {
-            "type": "membership.change",
-            "thread_id": thread.pk,
-            "action": action,
-        },
-    )
+    send_after_commit([
+        (
+            f"user_{user.pk}",
+            {
+                "type": "membership.change",
+                "thread_id": thread.pk,
+                "action": action,
+            },
+        ),
+    ])
@@ -1,7 +1,9 @@
 """
 ASGI config for Exodus project.
 
-Routes HTTP to Django and WebSocket to Channels consumers.
+Routes HTTP to Django and WebSocket to Channels consumers. Pages share
+one multiplexed socket per tab (``ws/mux/``); the per-feature sockets
+stay routed for older clients.
 """
 
 import os
@@ -20,12 +22,15 @@ from comms.routing import websocket_urlpatterns as comms_ws  # noqa: E402
 from agencies.routing import websocket_urlpatterns as council_ws  # noqa: E402
 from spacebattle.routing import websocket_urlpatterns as battle_ws  # noqa: E402
 from combat.routing import websocket_urlpatterns as combat_ws  # noqa: E402
+from exodus.routing import websocket_urlpatterns as mux_ws  # noqa: E402
 
 application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
         "websocket": AllowedHostsOriginValidator(
-            AuthMiddlewareStack(URLRouter(comms_ws + council_ws + battle_ws + combat_ws))
+            AuthMiddlewareStack(URLRouter(
+                mux_ws + comms_ws + council_ws + battle_ws + combat_ws
+            ))
         ),
     }
 )
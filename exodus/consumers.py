@@ -0,0 +1,318 @@
+"""Multiplexed WebSocket at ws://host/ws/mux/ — one socket per tab.
+
+Instead of one socket (and one session lookup in ``AuthMiddlewareStack``)
+per live feature, a page opens this socket once and subscribes to topics:
+
+``comms``
+    The user's whole inbox stream — what ``/ws/comms/`` sends.
+``thread:<id>``
+    One comms thread; members only (``ThreadConsumer``).
+``council``
+    Council vote updates — what ``/ws/council/`` sends.
+``battle:<id>``
+    A spacebattle's events — what ``/ws/spacebattle/<id>/`` sends.
+``combat:<id>``
+    A personal-combat encounter — what ``/ws/combat/<id>/`` sends,
+    with the same hidden / participant checks.
+
+Client frames::
+
+    {"op": "subscribe", "topic": "combat:7", "resume_from": 41}
+    {"op": "unsubscribe", "topic": "combat:7"}
+    {"op": "ping"} / {"op": "pong"}
+
+Server frames are either control frames (``subscribed``,
+``unsubscribed``, ``error`` with a close-style ``code``, ``ping``,
+``pong``, ``lagged``) or a topic's own frame with a ``"topic"`` key
+added — ``{"topic": "combat:7", "type": "batch", "events": [...]}``.
+
+Each topic is served by an instance of the existing per-feature consumer
+running inside this one: its ``connect`` makes the authorization call
+(an ``accept`` is a grant, a ``close`` a denial with that code; a
+``close`` after the grant revokes it, e.g. a member removed from a
+thread, and drops the topic with an ``error`` frame), its
+group handlers format the frames, and its ``resume_from`` replay works
+unchanged. Group joins are reference-counted so two topics can share a
+group (``comms`` and ``thread:<id>``). Broadcasters tag group messages
+with ``"group"`` so a message reaches only the topics that joined it.
+
+Heartbeat: the server sends ``ping`` after ``heartbeat_interval``
+seconds without client traffic and closes with 4408 after
+``heartbeat_timeout``. Backpressure: outgoing frames go through a
+bounded queue drained by one writer task (the ASGI send awaits the
+transport under load); a topic whose frames overflow it is dropped
+until the queue drains, then gets one ``lagged`` frame telling the
+client to re-subscribe (with ``resume_from`` where the topic supports
+it) or refetch.
+"""
+
+import asyncio
+import json
+import logging
+from functools import partial
+
+from channels.consumer import get_handler_name
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from agencies.consumers import CouncilConsumer
+from combat.consumers import EncounterConsumer
+from comms.consumers import CommsConsumer, ThreadConsumer
+from spacebattle.consumers import BattleConsumer
+
+logger = logging.getLogger(__name__)
+
+# topic name -> (consumer class, url_route kwarg carrying the topic id)
+TOPICS = {
+    "comms": (CommsConsumer, None),
+    "thread": (ThreadConsumer, "thread_id"),
+    "council": (CouncilConsumer, None),
+    "battle": (BattleConsumer, "battle_id"),
+    "combat": (EncounterConsumer, "encounter_id"),
+}
+
+
+def parse_topic(topic):
+    """``(consumer class, url_route kwargs)`` for a topic string, or None."""
+    if not isinstance(topic, str):
+        return None
+    name, _, ident = topic.partition(":")
+    entry = TOPICS.get(name)
+    if entry is None:
+        return None
+    cls, kwarg = entry
+    if kwarg is None:
+        return (cls, {}) if not ident else None
+    if not ident.isdigit() or int(ident) <= 0:
+        return None
+    return cls, {kwarg: ident}
+
+
+class _TopicLayer:
+    """The channel layer as one topic's consumer sees it.
+
+    ``group_add`` / ``group_discard`` go through the mux's reference
+    counts; everything else is the real layer.
+    """
+
+    def __init__(self, mux, topic):
+        self._mux = mux
+        self._topic = topic
+
+    async def group_add(self, group, channel):
+        await self._mux._join(self._topic, group)
+
+    async def group_discard(self, group, channel):
+        await self._mux._leave(self._topic, group)
+
+    def __getattr__(self, name):
+        return getattr(self._mux.channel_layer, name)
+
+
+class MuxConsumer(AsyncWebsocketConsumer):
+    """One authenticated socket carrying many topic subscriptions."""
+
+    max_topics = 32
+    max_pending = 256
+    heartbeat_interval = 25
+    heartbeat_timeout = 75
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.topics = {}  # topic -> consumer instance
+        self.members = {}  # group -> {topic, ...}
+        self.lagging = set()
+        self.outbox = asyncio.Queue(maxsize=self.max_pending)
+        loop = asyncio.get_running_loop()
+        self.last_seen = loop.time()
+        await self.accept()
+        self.tasks = [
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+
+    async def disconnect(self, code):
+        for task in getattr(self, "tasks", ()):
+            task.cancel()
+        for topic in list(getattr(self, "topics", ())):
+            await self._drop(topic)
+
+    # -----------------------------------------------------------------------
+    # Client frames
+    # -----------------------------------------------------------------------
+
+    async def receive(self, text_data=None, bytes_data=None):
+        self.last_seen = asyncio.get_running_loop().time()
+        try:
+            frame = json.loads(text_data or "")
+        except ValueError:
+            frame = None
+        if not isinstance(frame, dict):
+            self.emit({"op": "error", "code": 4400, "error": "invalid frame"})
+            return
+        op = frame.get("op")
+        topic = frame.get("topic")
+        if op == "ping":
+            self.emit({"op": "pong"})
+        elif op == "pong":
+            pass
+        elif op == "subscribe":
+            await self.subscribe(topic, frame.get("resume_from"))
+        elif op == "unsubscribe":
+            if topic in self.topics:
+                await self._drop(topic)
+            self.emit({"op": "unsubscribed", "topic": topic})
+        else:
+            self.emit({"op": "error", "code": 4400, "error": "unknown op"})
+
+    async def subscribe(self, topic, resume_from=None):
+        """Run the topic consumer's ``connect`` and report the outcome.
+
+        Subscribing to a topic already held starts it over, which is how
+        a client catches up after a ``lagged`` frame.
+        """
+        target = parse_topic(topic)
+        if target is None:
+            self.emit({"op": "error", "topic": topic, "code": 4400, "error": "unknown topic"})
+            return
+        if topic in self.topics:
+            await self._drop(topic)
+        elif len(self.topics) >= self.max_topics:
+            self.emit({"op": "error", "topic": topic, "code": 4429, "error": "too many topics"})
+            return
+
+        cls, kwargs = target
+        consumer = cls()
+        query = b""
+        if isinstance(resume_from, int) and resume_from >= 0:
+            query = f"resume_from={resume_from}".encode()
+        consumer.scope = {
+            **self.scope,
+            "url_route": {"args": (), "kwargs": kwargs},
+            "query_string": query,
+        }
+        consumer.channel_layer = _TopicLayer(self, topic)
+        consumer.channel_name = self.channel_name
+        outcome = {}
+        consumer.base_send = partial(self._from_topic, topic, consumer, outcome)
+        await consumer.connect()
+        if "accepted" not in outcome:
+            self._release(topic)
+            await self._discard_unused()
+            code = outcome.get("code") or 4403
+            self.emit({"op": "error", "topic": topic, "code": code, "error": "denied"})
+
+    async def _from_topic(self, topic, consumer, outcome, message):
+        """``base_send`` of a topic consumer: accept / close / frames."""
+        kind = message["type"]
+        if kind == "websocket.accept":
+            outcome["accepted"] = True
+            self.topics[topic] = consumer
+            self.emit({"op": "subscribed", "topic": topic})
+        elif kind == "websocket.close":
+            if self.topics.get(topic) is consumer:
+                # A live subscription revoked by its consumer.
+                await self._drop(topic)
+                code = message.get("code") or 4403
+                self.emit({"op": "error", "topic": topic, "code": code, "error": "revoked"})
+            else:
+                outcome["code"] = message.get("code")
+        elif kind == "websocket.send" and topic in self.topics:
+            frame = json.loads(message["text"])
+            self.emit({"topic": topic, **frame}, topic)
+
+    async def _drop(self, topic):
+        consumer = self.topics.pop(topic)
+        await consumer.disconnect(1000)
+        self._release(topic)
+        await self._discard_unused()
+        self.lagging.discard(topic)
+
+    # -----------------------------------------------------------------------
+    # Groups
+    # -----------------------------------------------------------------------
+
+    async def _join(self, topic, group):
+        topics = self.members.setdefault(group, set())
+        if not topics:
+            await self.channel_layer.group_add(group, self.channel_name)
+        topics.add(topic)
+
+    async def _leave(self, topic, group):
+        self.members.get(group, set()).discard(topic)
+        await self._discard_unused()
+
+    def _release(self, topic):
+        for topics in self.members.values():
+            topics.discard(topic)
+
+    async def _discard_unused(self):
+        unused = [group for group, topics in self.members.items() if not topics]
+        for group in unused:
+            del self.members[group]
+        await asyncio.gather(*(
+            self.channel_layer.group_discard(group, self.channel_name)
+            for group in unused
+        ))
+
+    async def dispatch(self, message):
+        """Hand group messages to the topic consumers that joined the group.
+
+        A message without a ``"group"`` tag goes to the one topic with a
+        handler for it; if several have one it is dropped rather than
+        guessed at, so an untagged combat event can never reach another
+        encounter's subscription.
+        """
+        if message["type"].startswith("websocket."):
+            await super().dispatch(message)
+            return
+        group = message.get("group")
+        if group is not None:
+            topics = sorted(self.members.get(group, ()))
+        else:
+            handler = get_handler_name(message)
+            topics = [t for t, c in self.topics.items() if hasattr(c, handler)]
+            if len(topics) > 1:
+                logger.warning("untagged %s message dropped by mux", message["type"])
+                return
+        for topic in topics:
+            consumer = self.topics.get(topic)
+            if consumer is not None:
+                await consumer.dispatch(message)
+
+    # -----------------------------------------------------------------------
+    # Outgoing frames
+    # -----------------------------------------------------------------------
+
+    def emit(self, frame, topic=None):
+        """Queue a frame for the writer; overflow drops the topic's frames."""
+        if topic is not None and topic in self.lagging:
+            return
+        try:
+            self.outbox.put_nowait(json.dumps(frame))
+        except asyncio.QueueFull:
+            if topic is not None:
+                self.lagging.add(topic)
+                logger.info("mux topic %s lagging; frames dropped", topic)
+
+    async def _writer(self):
+        while True:
+            text = await self.outbox.get()
+            await self.send(text_data=text)
+            if self.outbox.empty() and self.lagging:
+                lagging, self.lagging = sorted(self.lagging), set()
+                for topic in lagging:
+                    await self.send(text_data=json.dumps({"op": "lagged", "topic": topic}))
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            idle = loop.time() - self.last_seen
+            if idle >= self.heartbeat_timeout:
+                await self.close(code=4408)
+                return
+            if idle >= self.heartbeat_interval:
+                self.emit({"op": "ping"})
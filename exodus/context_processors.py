@@ -8,24 +8,59 @@ from django.conf import settings
 logger = logging.getLogger(__name__)
 
 
-def version(request):
-    """Add the application version to template context."""
-    version_file = Path(settings.BASE_DIR) / "version.txt"
+# Process-wide cache of small repo files surfaced in the chrome
+# (version.txt, CHANGELOG.md): {path: (mtime_ns, text)}. Each render costs
+# one ``stat``; the file is only re-read when its mtime moves.
+_FILE_CACHE = {}
+
+
+def cached_file_text(name, default):
+    """Stripped contents of ``BASE_DIR / name``, re-read only on mtime change.
+
+    Returns ``default`` when the file is missing.
+    """
+    path = Path(settings.BASE_DIR) / name
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _FILE_CACHE.pop(path, None)
+        return default
+    hit = _FILE_CACHE.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
     try:
-        app_version = version_file.read_text().strip()
+        text = path.read_text().strip()
     except FileNotFoundError:
-        app_version = "unknown"
-    return {"APP_VERSION": app_version}
+        return default
+    _FILE_CACHE[path] = (mtime, text)
+    return text
+
 
+def cached_file_mtime(name):
+    """Last-modified ``datetime`` of ``BASE_DIR / name`` (None if missing)."""
+    from datetime import datetime, timezone
 
-def changelog(request):
-    """Add the changelog content to template context."""
-    changelog_file = Path(settings.BASE_DIR) / "CHANGELOG.md"
     try:
-        content = changelog_file.read_text().strip()
+        mtime = (Path(settings.BASE_DIR) / name).stat().st_mtime
     except FileNotFoundError:
-        content = "No changelog available."
-    return {"CHANGELOG": content}
+        return None
+    return datetime.fromtimestamp(mtime, tz=timezone.utc)
+
+
+def app_version():
+    """The deployed version string from ``version.txt``."""
+    return cached_file_text("version.txt", "unknown")
+
+
+def changelog_text():
+    """Full ``CHANGELOG.md`` text. Served by the ``changelog`` endpoint —
+    deliberately NOT a context variable so pages don't carry it."""
+    return cached_file_text("CHANGELOG.md", "No changelog available.")
+
+
+def version(request):
+    """Add the application version to template context."""
+    return {"APP_VERSION": app_version()}
 
 
 def game_date(request):
@@ -33,8 +68,7 @@ def game_date(request):
     from .models import SiteSettings
 
     try:
-        settings_obj = SiteSettings.objects.filter(pk=1).first()
-        next_date = settings_obj.next_game_date if settings_obj else None
+        next_date = SiteSettings.for_request(request).next_game_date
     except Exception:
         logger.exception("Failed to load SiteSettings")
         next_date = None
@@ -61,7 +95,7 @@ def tweaks(request):
     from .models import SiteSettings
 
     try:
-        settings_obj = SiteSettings.load()
+        settings_obj = SiteSettings.for_request(request)
         return {"TWEAKS": settings_obj.get_tweaks()}
     except Exception:
         logger.exception("Failed to load SiteSettings tweaks")
@@ -153,12 +187,13 @@ def map_visibility(request):
     """Add map visibility settings to template context."""
     from .models import SiteSettings
     try:
-        settings_obj = SiteSettings.objects.filter(pk=1).first()
+        settings_obj = SiteSettings.for_request(request)
         show_world = settings_obj.show_world_map if settings_obj else True
         show_star = settings_obj.show_star_map if settings_obj else False
         show_public_star = settings_obj.show_public_star_map if settings_obj else False
         show_starships = settings_obj.show_starships if settings_obj else False
     except Exception:
+        settings_obj = None
         show_world = True
         show_star = False
         show_public_star = False
@@ -178,9 +213,6 @@ def map_visibility(request):
 
     # Nav labels and council
     try:
-        if settings_obj is None:
-            from .models import SiteSettings
-            settings_obj = SiteSettings.objects.filter(pk=1).first()
         labels = {
             "NAV_DISPATCH": settings_obj.label_dispatch if settings_obj else "DISPATCH",
             "NAV_PLAYERS": settings_obj.label_players if settings_obj else "PLAYERS",
@@ -0,0 +1,311 @@
+"""WoD 2.0 d10 dice pools — the one implementation every subsystem rolls with.
+
+Rules (shared by combat, comms/cyber, starmap scans, agency project and
+FTL rolls, and the spacebattle simulator):
+
+- a die succeeds on 8+;
+- ``again`` is the explosion threshold: a face at or above it adds
+  another die (10-again by default, 9- and 8-again for better weapons /
+  projects, ``None`` for no explosions);
+- ``max_depth`` caps how many times one starting die can chain
+  (``None`` = unbounded; combat caps at 5);
+- ``rote`` re-rolls each failed die of the starting pool once;
+- a pool of 0 or less is a single chance die (only a 10 succeeds, a 1
+  is a dramatic failure) unless ``chance_die=False``, in which case it
+  rolls nothing.
+
+Three ways in:
+
+``roll``
+    One pool, die by die, with every face and its parent recorded for
+    the UIs that render chains.
+``batch_successes``
+    Success counts of many pools at once as a numpy array (balance lab,
+    spacebattle Monte Carlo). Drawn as binomials per explosion wave.
+``distribution`` / ``p_at_least`` / ``expected_successes`` / ``odds``
+    Exact success distributions, memoized per
+    ``(pool, again, rote, max_depth)``.
+
+Randomness is pluggable. ``roll`` and ``d10`` draw from any object with
+``random.Random``'s ``randint`` — by default a ``SystemRandom`` (OS
+entropy, like the ``secrets`` source combat used before). ``use_rng`` /
+``seeded`` swap the source for the current context, which is how tests
+and replays get deterministic rolls; ``batch_successes`` derives its
+numpy generator from the same source unless handed one.
+
+This module deliberately imports nothing from Django so any app can use
+it without dragging a model graph in at import time.
+"""
+
+import contextvars
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+SUCCESS_FACE = 8
+AGAIN_CHOICES = (8, 9, 10)
+
+_SYSTEM_RNG = random.SystemRandom()
+_rng_override = contextvars.ContextVar("dice_rng", default=None)
+
+# Distribution tails lighter than this are dropped.
+_TAIL = 1e-15
+
+
+# ---------------------------------------------------------------------------
+# RNG plumbing
+# ---------------------------------------------------------------------------
+
+def get_rng():
+    """The RNG rolls draw from right now (``use_rng`` override or system)."""
+    return _rng_override.get() or _SYSTEM_RNG
+
+
+@contextmanager
+def use_rng(rng):
+    """Route every roll in this context through ``rng`` (``randint`` API)."""
+    token = _rng_override.set(rng)
+    try:
+        yield rng
+    finally:
+        _rng_override.reset(token)
+
+
+def seeded(seed):
+    """``use_rng`` with a fresh ``random.Random(seed)`` — replayable rolls."""
+    return use_rng(random.Random(seed))
+
+
+def clamp_again(value):
+    """Coerce an X-again setting to 8, 9 or 10; anything else is 10."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return 10
+    return value if value in AGAIN_CHOICES else 10
+
+
+def _again(again):
+    return None if again is None else clamp_again(again)
+
+
+def d10(rng=None):
+    """One d10 face in ``[1, 10]``."""
+    return (rng or get_rng()).randint(1, 10)
+
+
+# ---------------------------------------------------------------------------
+# Single rolls
+# ---------------------------------------------------------------------------
+
+class Die(NamedTuple):
+    face: int
+    kind: str  # "base" | "explode" | "rote" | "chance"
+    parent: int | None  # index of the die that triggered this one
+    success: bool
+    exploded: bool  # this face triggered a re-roll
+
+
+@dataclass
+class Roll:
+    pool: int
+    again: int | None = 10
+    rote: bool = False
+    dice: list[Die] = field(default_factory=list)
+    successes: int = 0
+
+    @property
+    def faces(self):
+        return [d.face for d in self.dice]
+
+    @property
+    def is_chance(self):
+        return bool(self.dice) and self.dice[0].kind == "chance"
+
+    @property
+    def is_dramatic_failure(self):
+        return self.is_chance and self.dice[0].face == 1
+
+    @property
+    def is_exceptional(self):
+        return self.successes >= 5
+
+
+def roll(pool, again=10, rote=False, max_depth=None, chance_die=True, rng=None):
+    """Roll one pool. Each starting die's explosion chain is rolled
+    before the next starting die, so ``Die.parent`` always points back."""
+    rng = rng or get_rng()
+    again = _again(again)
+    result = Roll(pool=pool, again=again, rote=rote)
+    dice = result.dice
+
+    if pool <= 0:
+        if chance_die:
+            face = rng.randint(1, 10)
+            dice.append(Die(face, "chance", None, face == 10, False))
+            result.successes = int(face == 10)
+        return result
+
+    def chain(kind, parent):
+        depth = 0
+        while True:
+            face = rng.randint(1, 10)
+            explodes = again is not None and face >= again and (max_depth is None or depth < max_depth)
+            dice.append(Die(face, kind, parent, face >= SUCCESS_FACE, explodes))
+            if not explodes:
+                return
+            kind, parent, depth = "explode", len(dice) - 1, depth + 1
+
+    for _ in range(pool):
+        start = len(dice)
+        chain("base", None)
+        if rote and not dice[start].success:
+            chain("rote", start)
+
+    result.successes = sum(1 for d in dice if d.success)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Batched success counts
+# ---------------------------------------------------------------------------
+
+def numpy_rng(rng=None):
+    """A numpy ``Generator``: ``rng`` itself if it is one, else seeded
+    from the current ``randint`` source (so ``seeded`` covers batches)."""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng((rng or get_rng()).getrandbits(64))
+
+
+def batch_successes(pool, size, again=10, rote=False, max_depth=None, chance_die=True, rng=None):
+    """Success counts of ``size`` independent rolls of ``pool`` dice.
+
+    Same distribution as ``roll``, drawn wave by wave: the hits of a
+    wave are ``Binomial(dice, 0.3)`` and the explosions among them are a
+    binomial thinning of the hits.
+    """
+    rng = numpy_rng(rng)
+    again = _again(again)
+    if pool <= 0:
+        if not chance_die:
+            return np.zeros(size, dtype=np.int64)
+        return (rng.random(size) < 0.1).astype(np.int64)
+
+    p_hit = (11 - SUCCESS_FACE) / 10
+    p_explode_given_hit = 0.0 if again is None else (11 - again) / (11 - SUCCESS_FACE)
+    successes = np.zeros(size, dtype=np.int64)
+    dice = np.full(size, pool, dtype=np.int64)
+    depth = 0
+    while dice.any():
+        hits = rng.binomial(dice, p_hit)
+        if rote and depth == 0:
+            rerolls = rng.binomial(dice - hits, p_hit)
+            hits = hits + rerolls
+        successes += hits
+        if p_explode_given_hit == 0.0 or (max_depth is not None and depth >= max_depth):
+            break
+        dice = rng.binomial(hits, p_explode_given_hit)
+        depth += 1
+    return successes
+
+
+# ---------------------------------------------------------------------------
+# Exact distributions
+# ---------------------------------------------------------------------------
+
+def _trim(dist):
+    end = len(dist)
+    while end > 1 and dist[end - 1] < _TAIL:
+        end -= 1
+    return dist[:end]
+
+
+@lru_cache(maxsize=None)
+def _single_die(again, rote, max_depth):
+    """Success distribution of one starting die, explosions included."""
+    p_explode = 0.0 if again is None else (11 - again) / 10
+    p_stop_hit = 0.3 - p_explode
+    p_miss = 0.7
+    # P(k): the first k-1 dice explode, then the k-th succeeds without
+    # chaining (or explodes into a miss). The depth cap stops the chain
+    # at max_depth + 1 dice, where any hit ends it.
+    limit = max_depth if max_depth is not None else 10_000
+    dist = [p_miss]
+    k = 1
+    while k <= limit:
+        pk = p_explode ** (k - 1) * (p_stop_hit + p_explode * p_miss)
+        if pk < _TAIL and k > 1:
+            break
+        dist.append(pk)
+        k += 1
+    else:
+        dist.append(p_explode ** limit * 0.3)
+    dist = np.array(dist)
+    if rote:
+        # A miss on the starting die re-rolls it once as a fresh chain.
+        dist = dist * np.r_[0.0, np.ones(len(dist) - 1)] + p_miss * dist
+    return _trim(dist)
+
+
+@lru_cache(maxsize=4096)
+def _pool_dist(pool, again, rote, max_depth):
+    if pool == 1:
+        return _single_die(again, rote, max_depth)
+    half = pool // 2
+    return _trim(np.convolve(
+        _pool_dist(half, again, rote, max_depth),
+        _pool_dist(pool - half, again, rote, max_depth),
+    ))
+
+
+def distribution(pool, again=10, rote=False, max_depth=None, chance_die=True):
+    """Exact ``P(successes == k)`` for ``k = 0, 1, ...`` as a tuple.
+
+    Memoized; tail probabilities below 1e-15 are dropped. A pool of 0 or
+    less is the chance die (``(0.9, 0.1)``) or, without one, ``(1.0,)``.
+    """
+    if pool <= 0:
+        return (0.9, 0.1) if chance_die else (1.0,)
+    return _distribution(pool, _again(again), bool(rote), max_depth)
+
+
+@lru_cache(maxsize=4096)
+def _distribution(pool, again, rote, max_depth):
+    return tuple(float(p) for p in _pool_dist(pool, again, rote, max_depth))
+
+
+def p_at_least(successes, pool, **kwargs):
+    """Exact ``P(successes >= n)`` for the pool (``distribution`` kwargs)."""
+    dist = distribution(pool, **kwargs)
+    return float(sum(dist[max(0, successes):]))
+
+
+def expected_successes(pool, **kwargs):
+    """Mean success count for the pool (``distribution`` kwargs)."""
+    return float(sum(k * p for k, p in enumerate(distribution(pool, **kwargs))))
+
+
+ODDS_THRESHOLDS = (1, 3, 5)
+
+
+def odds(pool, bonus=0, **kwargs):
+    """Preview block for a pool: ``P(>= 1 / 3 / 5 successes)`` and the
+    mean, from the memoized ``distribution`` (kwargs as there).
+
+    ``bonus`` is a flat count of automatic successes added to every
+    roll. Probabilities are rounded to four places for display.
+    """
+    dist = distribution(pool, **kwargs)
+    block = {
+        f"at_least_{n}": round(float(sum(dist[max(0, n - bonus):])), 4)
+        for n in ODDS_THRESHOLDS
+    }
+    block["expected_successes"] = round(
+        bonus + sum(k * p for k, p in enumerate(dist)), 2,
+    )
+    return block
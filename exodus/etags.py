@@ -0,0 +1,63 @@
+"""Strong ETags for polled JSON endpoints.
+
+An ETag here is a digest of *version stamps*, never of the response body,
+so a matching ``If-None-Match`` lets the view return 304 before it
+serializes anything. Views pass an ``etag_func`` built from these helpers
+to Django's ``condition`` decorator.
+
+- ``table_stamps`` folds ``(count, max(stamp), sum(total))`` for any number
+  of querysets into ONE ``UNION ALL`` query. Count catches deletes, the
+  max timestamp catches edits, the optional sum catches counters that
+  change without touching a timestamp.
+- ``rows_digest`` hashes the raw values of a small, untimestamped table.
+- ``make_etag`` folds everything into a quoted strong ETag.
+"""
+
+import hashlib
+
+from django.db.models import CharField, Count, IntegerField, Max, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def _stamp_query(label, qs, stamp, total=None):
+    return qs.order_by().values(src=Value(label, output_field=CharField())).annotate(
+        n=Count("pk"),
+        m=Cast(Max(stamp), CharField()),
+        s=Coalesce(Sum(total), 0) if total else Value(0, output_field=IntegerField()),
+    )
+
+
+def table_stamps(sources):
+    """``[(label, count, max_stamp, total)]`` for every source, in one query.
+
+    ``sources`` is an iterable of ``(label, queryset, stamp_field)`` or
+    ``(label, queryset, stamp_field, total_field)``.
+    """
+    queries = [_stamp_query(*source) for source in sources]
+    if not queries:
+        return []
+    first, *rest = queries
+    combined = first.union(*rest, all=True) if rest else first
+    return sorted(
+        (row["src"], row["n"], row["m"], row["s"]) for row in combined
+    )
+
+
+def rows_digest(qs, *fields):
+    """Hash of ``fields`` over every row of ``qs`` (keep ``qs`` small)."""
+    return hashlib.sha1(
+        repr(list(qs.order_by("pk").values_list(*fields))).encode()
+    ).hexdigest()
+
+
+def instance_digest(obj):
+    """Hash of every concrete field on ``obj`` (singleton settings rows, or
+    the one row a detail view has already loaded)."""
+    return hashlib.sha1(repr([
+        getattr(obj, f.attname) for f in obj._meta.concrete_fields
+    ]).encode()).hexdigest()
+
+
+def make_etag(*parts):
+    """Quoted strong ETag over ``parts`` (anything with a stable ``repr``)."""
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
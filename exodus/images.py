@@ -0,0 +1,138 @@
+"""Sized WebP / JPEG derivatives of uploaded images.
+
+Uploads (character portraits, NPC images, user avatars, comms message
+images, news featured images) are stored as sent — up to 5-10 MB of
+PNG. Each upload also gets three downscaled copies, written next to the
+original by name::
+
+    character_portraits/ada.png
+    character_portraits/ada.png.avatar.webp   character_portraits/ada.png.avatar.jpg
+    character_portraits/ada.png.card.webp     character_portraits/ada.png.card.jpg
+    character_portraits/ada.png.full.webp     character_portraits/ada.png.full.jpg
+
+(The original's extension stays in the name so ``ada.png`` and
+``ada.jpg`` in one folder never share derivatives.)
+
+Serializers ask for a size with ``image_url(field, "avatar")`` and get
+the WebP derivative, or the original when none exists yet (files
+uploaded before derivatives existed, until ``build_image_derivatives``
+has run). JPEG copies are there for clients without WebP.
+
+Upload views call ``generate_derivatives`` after saving the file and
+``delete_derivatives`` before removing or replacing one.
+"""
+
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels; images are never upscaled.
+SIZES = {"avatar": 160, "card": 480, "full": 1280}
+# format -> (Pillow format, extension, save options)
+FORMATS = {
+    "webp": ("WEBP", ".webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", ".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+# JPEG has no alpha; transparent pixels are flattened onto the UI's
+# panel colour rather than black.
+_JPEG_BACKGROUND = (10, 14, 18)
+
+# Derivative names known to exist. Only hits are remembered: a miss is
+# re-checked so a backfill shows up without a restart.
+_existing = set()
+
+
+def derivative_name(name, size, fmt="webp"):
+    """Storage name of one derivative of the file stored as ``name``."""
+    return f"{name}.{size}{FORMATS[fmt][1]}"
+
+
+def derivative_names(name):
+    return [derivative_name(name, size, fmt) for size in SIZES for fmt in FORMATS]
+
+
+def _storage(field_file):
+    return getattr(field_file, "storage", None) or default_storage
+
+
+def _exists(storage, name):
+    if name in _existing:
+        return True
+    if storage.exists(name):
+        _existing.add(name)
+        return True
+    return False
+
+
+def image_url(field_file, size="card", fmt="webp"):
+    """URL of the ``size`` derivative of an image field, falling back to
+    the original; None when the field is empty."""
+    if not field_file:
+        return None
+    storage = _storage(field_file)
+    name = derivative_name(field_file.name, size, fmt)
+    if _exists(storage, name):
+        return storage.url(name)
+    return field_file.url
+
+
+def _render(image, box, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    copy = image.copy()
+    copy.thumbnail((box, box), Image.LANCZOS)
+    if fmt == "jpeg" and copy.mode != "RGB":
+        rgba = copy.convert("RGBA")
+        copy = Image.new("RGB", rgba.size, _JPEG_BACKGROUND)
+        copy.paste(rgba, mask=rgba.getchannel("A"))
+    buffer = BytesIO()
+    copy.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate_derivatives(field_file):
+    """Write every size / format derivative of an image field's file,
+    replacing any already there. Returns the names written.
+
+    An unreadable or non-image upload, or one that decodes past Pillow's
+    decompression-bomb limit, is logged and yields nothing; the original
+    keeps being served.
+    """
+    if not field_file:
+        return []
+    storage = _storage(field_file)
+    try:
+        with storage.open(field_file.name, "rb") as handle:
+            image = Image.open(handle)
+            image.seek(0)  # first frame of an animated GIF / WebP
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.warning("cannot build derivatives of %s", field_file.name, exc_info=True)
+        return []
+
+    written = []
+    for size, box in SIZES.items():
+        for fmt in FORMATS:
+            name = derivative_name(field_file.name, size, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            saved = storage.save(name, ContentFile(_render(image, box, fmt)))
+            _existing.add(saved)
+            written.append(saved)
+    return written
+
+
+def delete_derivatives(field_file):
+    """Remove an image field's derivatives (before the original goes)."""
+    if not field_file:
+        return
+    storage = _storage(field_file)
+    for name in derivative_names(field_file.name):
+        _existing.discard(name)
+        if storage.exists(name):
+            storage.delete(name)
@@ -0,0 +1,54 @@
+"""Build the WebP / JPEG size derivatives of every uploaded image.
+
+    python manage.py build_image_derivatives           # only images missing some
+    python manage.py build_image_derivatives --force   # rebuild everything
+
+Uploads get their derivatives when they are saved (see ``exodus.images``);
+this backfills files uploaded before that, and rebuilds after the sizes
+or encoder settings change.
+"""
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import UserProfile
+from characters.models import Character
+from comms.models import Message
+from exodus.images import derivative_names, generate_derivatives
+from news.models import NewsArticle
+from npcs.models import NPC
+
+# (model, image field) pairs served through ``exodus.images.image_url``.
+IMAGE_FIELDS = [
+    (Character, "profile_picture"),
+    (NPC, "image"),
+    (UserProfile, "avatar"),
+    (Message, "image"),
+    (NewsArticle, "featured_image"),
+]
+
+
+class Command(BaseCommand):
+    help = "Generate missing thumbnail derivatives for uploaded images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Rebuild derivatives that already exist.",
+        )
+
+    def handle(self, *args, **options):
+        built = skipped = 0
+        for model, field in IMAGE_FIELDS:
+            rows = model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+            for obj in rows.only("pk", field).iterator():
+                image = getattr(obj, field)
+                if not options["force"] and all(
+                    image.storage.exists(name) for name in derivative_names(image.name)
+                ):
+                    skipped += 1
+                    continue
+                if generate_derivatives(image):
+                    built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Built derivatives for {built} image(s); {skipped} already up to date."
+        ))
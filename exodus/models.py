@@ -1,6 +1,9 @@
 """Core models for Exodus site configuration."""
 
-from django.db import models
+import threading
+
+from django.db import connection, models, transaction
+from django.db.models.signals import post_migrate
 
 
 def _clamp_again(value):
@@ -998,6 +1001,11 @@ class SiteSettings(models.Model):
         merged.update({k: v for k, v in (self.tweaks or {}).items() if k in merged})
         self.tweaks = merged
         super().save(*args, **kwargs)
+        # Drop the process-wide snapshot now and again once the write is
+        # visible to other connections — a reader that raced the save
+        # between the two can't pin the pre-save row.
+        SiteSettings.invalidate_cache()
+        transaction.on_commit(SiteSettings.invalidate_cache)
 
     def delete(self, *args, **kwargs):
         """Prevent deletion of the singleton."""
@@ -1008,3 +1016,64 @@ class SiteSettings(models.Model):
         """Load or create the singleton instance."""
         obj, _ = cls.objects.get_or_create(pk=1)
         return obj
+
+    @classmethod
+    def cached(cls):
+        """Process-wide read-only snapshot of the singleton.
+
+        Use for READ paths only — anything that mutates and saves must
+        keep going through ``load()``. The snapshot is dropped by
+        ``save()`` (and by ``flush``/``migrate`` via ``post_migrate``).
+
+        Inside an open transaction the cache is bypassed entirely: the
+        row we'd read could still be rolled back, and a caller holding
+        uncommitted settings edits must see its own writes.
+        """
+        if connection.in_atomic_block:
+            return cls.load()
+        with _SITE_SETTINGS_LOCK:
+            obj = _SITE_SETTINGS_CACHE["obj"]
+            generation = _SITE_SETTINGS_CACHE["generation"]
+        if obj is not None:
+            return obj
+        obj = cls.load()
+        with _SITE_SETTINGS_LOCK:
+            # Only publish if no save landed while we were reading.
+            if _SITE_SETTINGS_CACHE["generation"] == generation:
+                _SITE_SETTINGS_CACHE["obj"] = obj
+        return obj
+
+    @classmethod
+    def for_request(cls, request):
+        """Per-request snapshot: the first call on a request pins the
+        settings row on ``request`` so every context processor and view
+        rendering that request shares one read (and one consistent view
+        of the settings, even if a GM saves mid-render)."""
+        if request is None:
+            return cls.cached()
+        obj = getattr(request, "_site_settings", None)
+        if obj is None:
+            obj = cls.cached()
+            request._site_settings = obj
+        return obj
+
+    @staticmethod
+    def invalidate_cache(**kwargs):
+        """Drop the process-wide snapshot. Accepts signal kwargs."""
+        with _SITE_SETTINGS_LOCK:
+            _SITE_SETTINGS_CACHE["obj"] = None
+            _SITE_SETTINGS_CACHE["generation"] += 1
+
+
+# Process-wide SiteSettings snapshot for ``SiteSettings.cached()``. The
+# generation counter stops a reader that started before a save from
+# publishing the stale row it fetched.
+_SITE_SETTINGS_CACHE = {"obj": None, "generation": 0}
+_SITE_SETTINGS_LOCK = threading.Lock()
+
+# ``flush`` (TransactionTestCase teardown) and ``migrate`` rewrite the
+# table without going through ``save()``.
+post_migrate.connect(
+    SiteSettings.invalidate_cache,
+    dispatch_uid="exodus.sitesettings.invalidate_cache",
+)
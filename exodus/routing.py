@@ -0,0 +1,9 @@
+"""WebSocket URL routing for the multiplexed socket."""
+
+from django.urls import re_path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(r"ws/mux/$", consumers.MuxConsumer.as_asgi()),
+]
@@ -45,6 +45,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "exodus.mcp_auth.MCPTokenAuthMiddleware",
     "accounts.middleware.LastActivityMiddleware",
+    "combat.middleware.CombatBroadcastMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -63,7 +64,6 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "exodus.context_processors.version",
-                "exodus.context_processors.changelog",
                 "exodus.context_processors.game_date",
                 "comms.context_processors.unread_count",
                 "exodus.context_processors.impersonation",
@@ -90,6 +90,10 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Worker processes for background spacebattle simulation jobs
+# (spacebattle.jobs). Unset: one per CPU core.
+SIMULATION_WORKERS = int(os.environ.get("SIMULATION_WORKERS", "0")) or None
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
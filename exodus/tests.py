@@ -0,0 +1,420 @@
+"""Tests for the SiteSettings read cache, the cached chrome files, the
+shared ``exodus.dice`` engine, the multiplexed WebSocket and the image
+derivative pipeline.
+
+``SiteSettings.cached()`` is a process-wide snapshot that bypasses itself
+inside open transactions, so those run as ``TransactionTestCase`` — under
+a plain ``TestCase`` every read would go straight to the DB.
+"""
+
+import asyncio
+import io
+import os
+import random
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+from PIL import Image
+
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from combat.consumers import flush as flush_combat
+from combat.tests.factories import make_character, make_encounter, make_participant, make_user
+from comms.broadcast import flush as flush_comms
+from comms.dice import roll_dice
+from comms.models import Thread, ThreadMembership
+from characters.models import Character
+from characters.serializers import serialize_character_summary
+from exodus import dice, images
+from exodus.consumers import MuxConsumer, parse_topic
+from exodus.context_processors import app_version
+from exodus.models import SiteSettings
+from exodus.ws import resume_from_scope
+
+
+def _settings_queries(ctx):
+    return [q for q in ctx.captured_queries if "exodus_sitesettings" in q["sql"]]
+
+
+class SiteSettingsCacheTests(TransactionTestCase):
+    def setUp(self):
+        SiteSettings.load()  # first-ever load INSERTs the singleton row
+        SiteSettings.invalidate_cache()
+
+    def test_cached_reuses_snapshot_until_save(self):
+        first = SiteSettings.cached()
+        with CaptureQueriesContext(connection) as ctx:
+            again = SiteSettings.cached()
+        self.assertIs(again, first)
+        self.assertEqual(_settings_queries(ctx), [])
+
+        s = SiteSettings.load()
+        s.lock_comms = not first.lock_comms
+        s.save()
+
+        fresh = SiteSettings.cached()
+        self.assertIsNot(fresh, first)
+        self.assertEqual(fresh.lock_comms, s.lock_comms)
+
+    def test_page_render_reads_settings_at_most_once(self):
+        User = get_user_model()
+        gm = User.objects.create_superuser("gm", "gm@example.com", "pw")
+        client = Client()
+        client.force_login(gm)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get("/rules/combat/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertLessEqual(len(_settings_queries(ctx)), 1)
+
+        # Warm process cache: later renders skip the settings row entirely.
+        with CaptureQueriesContext(connection) as ctx:
+            client.get("/rules/combat/")
+        self.assertEqual(_settings_queries(ctx), [])
+
+
+class ChangelogEndpointTests(TestCase):
+    def test_changelog_served_lazily_not_in_page_context(self):
+        resp = self.client.get("/changelog/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.content.decode().startswith("# Changelog"))
+        self.assertIn("Last-Modified", resp)
+
+        again = self.client.get(
+            "/changelog/", HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"],
+        )
+        self.assertEqual(again.status_code, 304)
+
+    def test_cached_file_text_reloads_on_mtime_change(self):
+        with tempfile.TemporaryDirectory() as tmp, self.settings(BASE_DIR=Path(tmp)):
+            path = Path(tmp) / "version.txt"
+            path.write_text("1.0.0\n")
+            self.assertEqual(app_version(), "1.0.0")
+
+            path.write_text("1.0.1\n")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            self.assertEqual(app_version(), "1.0.1")
+
+            path.unlink()
+            self.assertEqual(app_version(), "unknown")
+
+
+class DiceEngineTests(SimpleTestCase):
+    def test_exact_distributions(self):
+        for kwargs, per_die in (
+            ({}, 1 / 3),  # 10-again: 0.3 / (1 - 0.1)
+            ({"again": 8}, 0.3 / 0.7),
+            ({"again": None}, 0.3),
+        ):
+            dist = dice.distribution(6, **kwargs)
+            self.assertAlmostEqual(sum(dist), 1.0, places=12)
+            self.assertAlmostEqual(dice.expected_successes(6, **kwargs), 6 * per_die, places=9)
+        self.assertAlmostEqual(dice.p_at_least(1, 3, again=None), 1 - 0.7 ** 3, places=12)
+        self.assertEqual(dice.distribution(0), (0.9, 0.1))
+        self.assertEqual(dice.distribution(-2, chance_die=False), (1.0,))
+        # Rote: a miss gets one fresh chain, so P(0) per die is 0.7².
+        self.assertAlmostEqual(dice.distribution(1, rote=True)[0], 0.49, places=12)
+        # Capped chain: one die can score at most max_depth + 1.
+        self.assertEqual(len(dice.distribution(1, again=8, max_depth=2)), 4)
+        # Memoized: the same table comes back, however ``again`` is spelled.
+        self.assertIs(dice.distribution(9, again=9), dice.distribution(9, again="9"))
+
+    def test_roll_records_chains_and_caps_depth(self):
+        always_ten = Mock(randint=Mock(return_value=10))
+        with dice.use_rng(always_ten):
+            result = dice.roll(2, max_depth=3)
+        self.assertEqual([d.kind for d in result.dice], ["base", "explode", "explode", "explode"] * 2)
+        self.assertEqual([d.parent for d in result.dice[:4]], [None, 0, 1, 2])
+        self.assertEqual(result.successes, 8)
+        self.assertFalse(result.dice[3].exploded)
+
+        chance = dice.roll(0, rng=Mock(randint=Mock(return_value=1)))
+        self.assertTrue(chance.is_chance and chance.is_dramatic_failure)
+        self.assertEqual(dice.roll(0, chance_die=False).dice, [])
+
+    def test_seeded_replay_covers_single_and_batched_rolls(self):
+        with dice.seeded(5):
+            first = [dice.roll(7, rote=True).faces for _ in range(20)], list(dice.batch_successes(4, 50))
+            comms = roll_dice(6).rolls
+        with dice.seeded(5):
+            again = [dice.roll(7, rote=True).faces for _ in range(20)], list(dice.batch_successes(4, 50))
+            self.assertEqual(roll_dice(6).rolls, comms)
+        self.assertEqual(first, again)
+
+    def test_rolls_match_exact_distribution(self):
+        for kwargs in ({}, {"again": 8, "rote": True}, {"again": 9, "max_depth": 1}):
+            exact = np.array(dice.distribution(5, **kwargs))
+            batch = dice.batch_successes(5, 200_000, rng=np.random.default_rng(2), **kwargs)
+            sampled = np.bincount(batch, minlength=len(exact))[:len(exact)] / len(batch)
+            self.assertLess(np.abs(sampled - exact).max(), 0.006, kwargs)
+
+            rng = random.Random(3)
+            single = [dice.roll(5, rng=rng, **kwargs).successes for _ in range(20_000)]
+            self.assertAlmostEqual(
+                float(np.mean(single)), dice.expected_successes(5, **kwargs), delta=0.05,
+            )
+
+
+class ResumeFromScopeTests(SimpleTestCase):
+    def test_parses_non_negative_ints_only(self):
+        def parse(query):
+            return resume_from_scope({"query_string": query})
+
+        self.assertEqual(parse(b"resume_from=17"), 17)
+        self.assertEqual(parse(b"x=1&resume_from=0"), 0)
+        self.assertIsNone(parse(b""))
+        self.assertIsNone(parse(b"resume_from=-3"))
+        self.assertIsNone(parse(b"resume_from=abc"))
+        self.assertIsNone(resume_from_scope({}))
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class MuxConsumerTests(TransactionTestCase):
+    """One socket, many topics, each behind its own consumer's checks."""
+
+    def setUp(self):
+        self.player = make_user()
+        self.outsider = make_user()
+        self.encounter = make_encounter(status="active", round_number=1)
+        make_participant(
+            self.encounter, character=make_character(owner=self.player), kind="character",
+        )
+        self.other = make_encounter(status="active", round_number=1)
+        make_participant(
+            self.other, character=make_character(owner=self.player), kind="character",
+        )
+        self.thread = Thread.objects.create(title="Mux", creator=self.player)
+        ThreadMembership.objects.create(thread=self.thread, user=self.player)
+
+    async def _connect(self, user, app=None):
+        communicator = WebsocketCommunicator((app or MuxConsumer).as_asgi(), "/ws/mux/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def _subscribe(self, communicator, topic, **extra):
+        await communicator.send_json_to({"op": "subscribe", "topic": topic, **extra})
+        return await communicator.receive_json_from()
+
+    def test_parse_topic(self):
+        self.assertEqual(parse_topic("combat:7")[1], {"encounter_id": "7"})
+        self.assertEqual(parse_topic("council")[1], {})
+        for bad in ("combat", "combat:0", "combat:x", "council:1", "nope:1", None):
+            self.assertIsNone(parse_topic(bad), bad)
+
+    async def test_topics_are_routed_by_group(self):
+        communicator = await self._connect(self.player)
+        for topic in (f"combat:{self.encounter.pk}", f"combat:{self.other.pk}",
+                      f"thread:{self.thread.pk}", "council"):
+            self.assertEqual(
+                await self._subscribe(communicator, topic),
+                {"op": "subscribed", "topic": topic},
+            )
+
+        await asyncio.to_thread(flush_combat, {self.other.pk: [
+            {"event_type": "system", "payload": {"sequence": 1}},
+        ]})
+        self.assertEqual(await communicator.receive_json_from(), {
+            "topic": f"combat:{self.other.pk}", "type": "system", "payload": {"sequence": 1},
+        })
+        await asyncio.to_thread(flush_comms, [
+            (f"thread_{self.thread.pk}", {"type": "message.deleted", "message_id": 3}),
+        ])
+        self.assertEqual(await communicator.receive_json_from(), {
+            "topic": f"thread:{self.thread.pk}", "type": "message_deleted", "messageId": 3,
+        })
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_denials_reuse_consumer_checks(self):
+        communicator = await self._connect(self.outsider)
+        for topic, code in ((f"combat:{self.encounter.pk}", 4403),
+                            (f"thread:{self.thread.pk}", 4403),
+                            ("combat:abc", 4400)):
+            reply = await self._subscribe(communicator, topic)
+            self.assertEqual((reply["op"], reply["code"]), ("error", code))
+
+        await get_channel_layer().group_send(f"combat_{self.encounter.pk}", {
+            "type": "combat.event", "group": f"combat_{self.encounter.pk}", "events": [],
+        })
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_shared_group_survives_one_unsubscribe(self):
+        communicator = await self._connect(self.player)
+        await self._subscribe(communicator, "comms")
+        await self._subscribe(communicator, f"thread:{self.thread.pk}")
+        await communicator.send_json_to({"op": "unsubscribe", "topic": f"thread:{self.thread.pk}"})
+        self.assertEqual((await communicator.receive_json_from())["op"], "unsubscribed")
+
+        await asyncio.to_thread(flush_comms, [
+            (f"thread_{self.thread.pk}", {"type": "message.deleted", "message_id": 9}),
+        ])
+        self.assertEqual((await communicator.receive_json_from())["topic"], "comms")
+        await communicator.disconnect()
+
+    async def test_removed_member_loses_the_thread_topic(self):
+        communicator = await self._connect(self.player)
+        topic = f"thread:{self.thread.pk}"
+        await self._subscribe(communicator, topic)
+
+        await asyncio.to_thread(flush_comms, [(f"user_{self.player.pk}", {
+            "type": "membership.change", "thread_id": self.thread.pk, "action": "removed",
+        })])
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"op": "error", "topic": topic, "code": 4403, "error": "revoked"},
+        )
+
+        await asyncio.to_thread(flush_comms, [
+            (f"thread_{self.thread.pk}", {"type": "message.deleted", "message_id": 5}),
+        ])
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_resume_and_ping(self):
+        from combat.views import _log
+        for i in range(3):
+            await asyncio.to_thread(_log, self.encounter, "system", f"row {i}")
+        communicator = await self._connect(self.player)
+        await self._subscribe(communicator, f"combat:{self.encounter.pk}", resume_from=1)
+        replay = await communicator.receive_json_from()
+        self.assertEqual(replay["type"], "replay")
+        self.assertEqual([e["payload"]["sequence"] for e in replay["events"]], [2, 3])
+
+        await communicator.send_json_to({"op": "ping"})
+        self.assertEqual(await communicator.receive_json_from(), {"op": "pong"})
+        await communicator.disconnect()
+
+    async def test_idle_socket_is_pinged_then_closed(self):
+        class Quick(MuxConsumer):
+            heartbeat_interval = 0.05
+            heartbeat_timeout = 0.12
+
+        communicator = await self._connect(self.player, Quick)
+        self.assertEqual(await communicator.receive_json_from(), {"op": "ping"})
+        output = await communicator.receive_output()
+        while output["type"] == "websocket.send":
+            output = await communicator.receive_output()
+        self.assertEqual((output["type"], output["code"]), ("websocket.close", 4408))
+
+    def test_overflow_drops_topic_and_reports_lag(self):
+        mux = MuxConsumer()
+        mux.lagging = set()
+        mux.outbox = asyncio.Queue(maxsize=2)
+        for n in range(4):
+            mux.emit({"n": n}, "council")
+        self.assertEqual(mux.outbox.qsize(), 2)
+        self.assertEqual(mux.lagging, {"council"})
+        mux.outbox.get_nowait()
+        mux.emit({"n": 9}, "council")  # still lagging: dropped
+        mux.emit({"op": "pong"})  # control frames are not topic-gated
+        self.assertEqual(mux.outbox.qsize(), 2)
+
+
+def _png(size=(2000, 1500)):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, (200, 40, 40, 128)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ImageDerivativeTests(TestCase):
+    """Uploads get avatar / card / full copies in WebP and JPEG."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = self.settings(MEDIA_ROOT=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        images._existing.clear()
+        self.addCleanup(images._existing.clear)
+        self.user = make_user()
+        self.character = make_character(owner=self.user)
+        self.client.force_login(self.user)
+
+    def _upload(self):
+        return self.client.post(f"/api/characters/{self.character.pk}/image/", {
+            "image": SimpleUploadedFile("ada.png", _png(), content_type="image/png"),
+        })
+
+    def test_upload_writes_sized_derivatives(self):
+        response = self._upload()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["profilePicture"].endswith(".png.full.webp"))
+
+        self.character.refresh_from_db()
+        picture = self.character.profile_picture
+        for size, box in images.SIZES.items():
+            for fmt in images.FORMATS:
+                name = images.derivative_name(picture.name, size, fmt)
+                with picture.storage.open(name) as handle, Image.open(handle) as thumb:
+                    self.assertEqual(max(thumb.size), box)
+                    self.assertEqual(thumb.format, images.FORMATS[fmt][0])
+        summary = serialize_character_summary(self.character)
+        self.assertTrue(summary["profilePicture"].endswith(".png.card.webp"))
+
+    def test_delete_derivatives_clears_files_and_url_cache(self):
+        self._upload()
+        self.character.refresh_from_db()
+        picture = self.character.profile_picture
+        self.assertNotEqual(images.image_url(picture, "avatar"), picture.url)
+
+        images.delete_derivatives(picture)
+        self.assertFalse(any(
+            picture.storage.exists(name) for name in images.derivative_names(picture.name)
+        ))
+        self.assertEqual(images.image_url(picture, "avatar"), picture.url)
+
+    def test_missing_derivative_falls_back_to_original_until_backfill(self):
+        self.character.profile_picture.save("old.png", io.BytesIO(_png((64, 48))))
+        picture = self.character.profile_picture
+        self.assertEqual(images.image_url(picture, "avatar"), picture.url)
+        self.assertIsNone(images.image_url(Character().profile_picture, "avatar"))
+
+        out = io.StringIO()
+        call_command("build_image_derivatives", stdout=out)
+        self.assertIn("Built derivatives for 1 image(s)", out.getvalue())
+        self.assertTrue(images.image_url(picture, "avatar").endswith(".png.avatar.webp"))
+        with picture.storage.open(images.derivative_name(picture.name, "full")) as handle:
+            self.assertEqual(Image.open(handle).size, (64, 48))  # never upscaled
+
+        call_command("build_image_derivatives", stdout=out)
+        self.assertIn("0 image(s); 1 already up to date", out.getvalue())
+
+    def test_unreadable_upload_builds_nothing(self):
+        self.character.profile_picture.save("bad.png", io.BytesIO(b"not an image"))
+        with self.assertLogs("exodus.images", "WARNING"):
+            self.assertEqual(images.generate_derivatives(self.character.profile_picture), [])
+
+    def test_decompression_bomb_upload_keeps_the_original(self):
+        with patch.object(Image, "MAX_IMAGE_PIXELS", 1000), \
+                self.assertLogs("exodus.images", "WARNING"):
+            response = self._upload()
+        self.assertEqual(response.status_code, 200)
+        self.character.refresh_from_db()
+        self.assertEqual(response.json()["profilePicture"], self.character.profile_picture.url)
+
+    def test_removing_an_avatar_deletes_its_derivatives(self):
+        self.client.post(reverse("accounts:profile"), {
+            "action": "avatar",
+            "avatar": SimpleUploadedFile("me.png", _png((300, 300)), content_type="image/png"),
+        })
+        avatar = self.user.profile.avatar
+        names = images.derivative_names(avatar.name)
+        self.assertTrue(all(avatar.storage.exists(name) for name in names))
+
+        self.client.post(reverse("accounts:profile"), {"action": "avatar", "remove_avatar": "1"})
+        self.assertFalse(any(avatar.storage.exists(name) for name in names))
@@ -15,6 +15,7 @@ urlpatterns = [
     path("settings/stop-impersonate/", views.stop_impersonation, name="stop-impersonation"),
     path("api/transfer-player-to-agency/", views.api_transfer_player_to_agency, name="api-transfer-player-to-agency"),
     path("api/status/", views.api_status, name="api-status"),
+    path("changelog/", views.changelog, name="changelog"),
     path("api/pulling-strings/", views.api_pulling_strings, name="api-pulling-strings"),
     path("api/pulling-strings/<int:pk>/", views.api_pulling_string_detail, name="api-pulling-string-detail"),
     path("api/merits/", views.api_merits, name="api-merits"),
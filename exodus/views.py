@@ -1,16 +1,21 @@
 """Core views for Exodus site settings."""
 
 import json
-from pathlib import Path
 
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import redirect, render
-from django.views.decorators.http import require_GET, require_http_methods, require_POST
+from django.views.decorators.http import (
+    condition,
+    require_GET,
+    require_http_methods,
+    require_POST,
+)
 
+from .context_processors import app_version, cached_file_mtime, changelog_text
 from .models import (
     MeritDefinition,
     PullingString,
@@ -620,6 +625,7 @@ def api_transfer_player_to_agency(request):
     from django.db import transaction
     from django.core.files.base import ContentFile
     from characters.models import Character
+    from .images import generate_derivatives
     from npcs.models import NPC, NpcMerit, NpcPullingString
     from agencies.models import Agency, Base
 
@@ -678,6 +684,7 @@ def api_transfer_player_to_agency(request):
             try:
                 name = character.profile_picture.name.split("/")[-1]
                 npc.image.save(name, ContentFile(character.profile_picture.read()), save=True)
+                generate_derivatives(npc.image)
             except Exception:
                 pass
 
@@ -696,7 +703,7 @@ def api_transfer_player_to_agency(request):
 
         # Clean up workspace assignments referencing this character
         char_id = character.id
-        for base in Base.objects.all():
+        for base in Base.objects.filter(workspace_assignments__character_id=char_id).distinct():
             if base.workspaces:
                 cleaned = [
                     ws for ws in base.workspaces
@@ -1383,7 +1390,7 @@ def api_weapon_detail(request, name):
 def combat_page(request):
     """RULES → COMBAT — quick reference for WoD 2.0 personal combat,
     plus the live weapons catalogue (rendered as a per-category table)."""
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     weapons_by_cat = {
         "melee": [], "improvised": [], "firearm": [],
         "thrown": [], "grenade": [],
@@ -1511,6 +1518,17 @@ def merits_page(request):
     })
 
 
+@require_GET
+@condition(last_modified_func=lambda request: cached_file_mtime("CHANGELOG.md"))
+def changelog(request):
+    """Raw CHANGELOG.md for the footer BUILD modal.
+
+    Fetched on first open instead of riding along in every page context;
+    ``Last-Modified`` lets the browser revalidate with a 304.
+    """
+    return HttpResponse(changelog_text(), content_type="text/markdown; charset=utf-8")
+
+
 @login_required
 @require_GET
 def api_status(request):
@@ -1521,12 +1539,10 @@ def api_status(request):
     from django.contrib.auth.models import User
     from npcs.models import NPC
 
-    settings_obj = SiteSettings.load()
-    version_file = Path(__file__).resolve().parent.parent / "version.txt"
-    version = version_file.read_text().strip() if version_file.exists() else "unknown"
+    settings_obj = SiteSettings.for_request(request)
 
     return JsonResponse({
-        "appVersion": version,
+        "appVersion": app_version(),
         "nextGameDate": str(settings_obj.next_game_date) if settings_obj.next_game_date else None,
         "charterTextLength": len(settings_obj.charter_text or ""),
         "counts": {
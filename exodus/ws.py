@@ -0,0 +1,18 @@
+"""Helpers shared by the WebSocket consumers."""
+
+from urllib.parse import parse_qs
+
+
+def resume_from_scope(scope):
+    """The ``resume_from`` query parameter as a non-negative int, or None.
+
+    Reconnecting clients send the last log position they applied
+    (``CombatLog.sequence`` / ``BattleLog.id``) so the consumer can
+    replay only what they missed.
+    """
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    try:
+        value = int(query["resume_from"][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+    return value if value >= 0 else None
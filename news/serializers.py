@@ -1,5 +1,7 @@
 """Serializers for the news application."""
 
+from exodus.images import image_url
+
 
 def _character_name(user):
     """Get the character name for a user, or fall back to username."""
@@ -31,7 +33,7 @@ def serialize_article(article, user=None):
         "visibility": article.visibility,
         "gameDate": article.game_date,
         "gameDateSort": article.game_date_sort.isoformat() if article.game_date_sort else None,
-        "featuredImage": article.featured_image.url if article.featured_image else None,
+        "featuredImage": image_url(article.featured_image, "full"),
         "featuredImageFull": article.featured_image_full,
         "publishedAt": article.published_at.isoformat() if article.published_at else None,
         "createdAt": article.created_at.isoformat(),
@@ -80,7 +82,7 @@ def serialize_article_summary(article, user=None):
         "visibility": article.visibility,
         "gameDate": article.game_date,
         "gameDateSort": article.game_date_sort.isoformat() if article.game_date_sort else None,
-        "featuredImage": article.featured_image.url if article.featured_image else None,
+        "featuredImage": image_url(article.featured_image, "card"),
         "featuredImageFull": article.featured_image_full,
         "publishedAt": article.published_at.isoformat() if article.published_at else None,
         "createdAt": article.created_at.isoformat(),
@@ -13,6 +13,8 @@ from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.views.decorators.http import require_http_methods
 
+from exodus.images import delete_derivatives, generate_derivatives, image_url
+
 from .models import NewsArticle, NewsAttachment
 from .serializers import serialize_article, serialize_article_summary
 
@@ -167,6 +169,7 @@ def api_news_detail(request, pk):
     if request.method == "DELETE":
         # Clean up featured image
         if article.featured_image:
+            delete_derivatives(article.featured_image)
             path = article.featured_image.path
             if os.path.exists(path):
                 os.remove(path)
@@ -279,15 +282,17 @@ def api_news_image(request, pk):
     if image.content_type not in allowed_types:
         return JsonResponse({"error": "Invalid image type"}, status=400)
 
-    # Remove old image
+    # Remove old image and its derivatives
     if article.featured_image:
+        delete_derivatives(article.featured_image)
         old_path = article.featured_image.path
         if os.path.exists(old_path):
             os.remove(old_path)
 
     article.featured_image = image
     article.save()
-    return JsonResponse({"featuredImage": article.featured_image.url})
+    generate_derivatives(article.featured_image)
+    return JsonResponse({"featuredImage": image_url(article.featured_image, "full")})
 
 
 @login_required
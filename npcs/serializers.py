@@ -1,5 +1,7 @@
 """Manual JSON serialization for NPC model. No DRF dependency."""
 
+from exodus.images import image_url
+
 
 def serialize_npc_note(note):
     """Single note data."""
@@ -29,7 +31,7 @@ def serialize_npc(npc, is_admin=False, is_assigned=False):
         "name": npc.name,
         "characterClass": char_class,
         "classClassified": npc.class_classified if is_admin else None,
-        "image": npc.image.url if npc.image else None,
+        "image": image_url(npc.image, "full"),
         "age": npc.age,
         "sex": npc.sex,
         "pronouns": npc.pronouns,
@@ -124,7 +126,8 @@ def serialize_npc_summary(npc, is_admin=False):
         "id": npc.id,
         "name": npc.name,
         "characterClass": char_class,
-        "image": npc.image.url if npc.image else None,
+        "image": image_url(npc.image, "avatar"),
+        "imageFull": image_url(npc.image, "full"),
         "nationality": npc.nationality,
         "occupation": npc.occupation,
         "state": npc.state,
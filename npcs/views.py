@@ -10,6 +10,7 @@ from django.views.decorators.http import require_http_methods
 from .models import NPC, NPCNote, NpcMerit, NpcPullingString
 from .serializers import serialize_npc, serialize_npc_summary, serialize_npc_note
 from agencies.models import Agency
+from exodus.images import delete_derivatives, generate_derivatives, image_url
 from exodus.models import MeritDefinition, PullingString
 
 
@@ -325,15 +326,17 @@ def api_npc_image(request, pk):
             status=400,
         )
 
-    # Delete old image if exists
+    # Delete old image (and its derivatives) if exists
     if npc.image:
+        delete_derivatives(npc.image)
         old_path = npc.image.path
         if os.path.exists(old_path):
             os.remove(old_path)
 
     npc.image = image
     npc.save()
-    return JsonResponse({"image": npc.image.url})
+    generate_derivatives(npc.image)
+    return JsonResponse({"image": image_url(npc.image, "full")})
 
 
 # ---------------------------------------------------------------------------
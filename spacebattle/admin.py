@@ -4,7 +4,7 @@ from django.contrib import admin
 
 from .models import (
     Battle, BattleLog, BattleMap, BattleParticipant, BattleTerrain,
-    TerrainTemplate,
+    SimulationJob, TerrainTemplate,
 )
 
 
@@ -61,3 +61,13 @@ class BattleLogAdmin(admin.ModelAdmin):
     ]
     list_filter = ["battle", "action_type", "is_reverted"]
     search_fields = ["message"]
+
+
+@admin.register(SimulationJob)
+class SimulationJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "battle", "status", "iterations", "progress", "seed",
+        "created_by", "created_at", "finished_at",
+    ]
+    list_filter = ["status"]
+    readonly_fields = ["snapshot", "result", "created_at", "started_at", "finished_at"]
@@ -0,0 +1,424 @@
+"""Parameter-sweep balance lab.
+
+Evaluates a whole grid of balance parameters in one run instead of one
+``api_battle_simulate`` call (or one hand-edited balance script) per
+configuration. A spec has up to three independent sweeps:
+
+``fleet``
+    Ship combat through ``simulation.simulate_totals``. Each side lists
+    ``{"class": <id or name>, "count": n}`` entries; ``sizes`` and
+    ``loadouts`` map a class to the hull sizes / module loadouts to try
+    (a loadout is ``[{"module": <key>, "quantity": n}]``; ``null`` keeps
+    the installed one). Every combination is one cell.
+``cyber``
+    Gain Access + passive detection, the model of ``test_cyber_balance``
+    (``simulate_gain_access``), over lists of attacker Intelligence /
+    Computer / merits and defender Resolve / Computer / defense bonus.
+``bases``
+    ``compute_base_thrive`` over facility mixes × location types ×
+    merit sets × equipment sets × workspace counts.
+
+Derived inputs are computed once per distinct variant, not per cell or
+trial: ``compute_class_stats`` once per (class, size, loadout), and
+``compute_base_thrive`` once per distinct base layout. Fleet and cyber
+cells run as batched numpy kernels on a process pool, each cell seeded
+from the spec ``seed`` through ``SeedSequence``, so results are
+reproducible whatever the pool size.
+
+``run_sweep`` returns flat rows (one per cell) that ``to_csv`` / JSON
+can emit directly. Bad specs raise ``ValueError``; a grid over the
+run's ``SweepLimits`` raises its ``SweepTooLarge`` subclass.
+"""
+
+import copy
+import csv
+import io
+import itertools
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from exodus import dice as dice_engine
+
+from .simulation import simulate_totals, snapshot_unit, summarize
+
+SweepLimits = namedtuple("SweepLimits", [
+    "cells", "units_per_side", "module_quantity",
+    "fleet_iterations", "fleet_unit_iterations", "cyber_trials",
+])
+
+MAX_CELLS = 5_000
+MAX_UNITS_PER_SIDE = 200  # ships on one side of a fleet cell
+MAX_MODULE_QUANTITY = 50  # one loadout entry
+MAX_FLEET_ITERATIONS = 5_000_000  # summed over every fleet cell
+# Fleet work grows with iterations x ships per cell (~1 s per 100k on one core).
+MAX_FLEET_UNIT_ITERATIONS = 200_000_000
+MAX_CYBER_TRIALS = 20_000_000  # summed over every cyber cell
+# The ``balance_lab`` management command.
+LAB_LIMITS = SweepLimits(
+    cells=MAX_CELLS, units_per_side=MAX_UNITS_PER_SIDE, module_quantity=MAX_MODULE_QUANTITY,
+    fleet_iterations=MAX_FLEET_ITERATIONS, fleet_unit_iterations=MAX_FLEET_UNIT_ITERATIONS,
+    cyber_trials=MAX_CYBER_TRIALS,
+)
+# ``api_balance_lab`` holds a request thread for the whole sweep, so it
+# only takes what finishes in a few seconds; bigger grids go to the command.
+HTTP_LIMITS = SweepLimits(
+    cells=500, units_per_side=20, module_quantity=20,
+    fleet_iterations=100_000, fleet_unit_iterations=400_000,
+    cyber_trials=1_000_000,
+)
+# Plain input bounds, whatever the limits.
+MAX_RANGE = 30  # hexes between the two fleets
+MAX_WORKSPACES = 50
+
+THRIVE_DEPARTMENTS = [
+    "military", "intelligence", "engineering_ops",
+    "science_ops", "diplomatic_corps", "admin",
+]
+
+
+def _named(values, what):
+    """``[(label, value)]`` from a ``{label: value}`` dict or a plain list."""
+    if isinstance(values, dict):
+        return list(values.items())
+    if isinstance(values, list) and values:
+        return [(json.dumps(v) if not isinstance(v, str) else v, v) for v in values]
+    raise ValueError(f"{what} must be a non-empty list or object")
+
+
+def _int_list(values, what):
+    if not isinstance(values, list):
+        values = [values]
+    try:
+        return [int(v) for v in values]
+    except (TypeError, ValueError):
+        raise ValueError(f"{what} must be integers")
+
+
+class SweepTooLarge(ValueError):
+    """The grid is valid but over the run's ``SweepLimits``."""
+
+
+def _check_cells(count, max_cells):
+    if count > max_cells:
+        raise SweepTooLarge(f"grid has {count} cells (max {max_cells})")
+
+
+# ---------------------------------------------------------------------------
+# Cell kernels (worker side)
+# ---------------------------------------------------------------------------
+
+def cyber_cell(params, trials, seed):
+    """One cyber grid cell: Gain Access, detection and deploy detections."""
+    rng = np.random.default_rng(seed)
+    pool = (
+        params["attacker_int"] + params["attacker_comp"]
+        + params["attacker_merits"] - params["mental_load"]
+    )
+    successes = dice_engine.batch_successes(pool, trials, rng=rng)
+    access = successes > 0
+    exceptional = successes >= 5
+    deploys = np.where(access, successes // 2, 0)
+
+    detected = np.zeros(trials, dtype=bool)
+    deploy_detected = 0
+    if params["defender_comp"] >= 1:
+        detect_pool = params["defender_res"] + params["defender_comp"] + params["defense_bonus"]
+        detect = dice_engine.batch_successes(detect_pool, trials, rng=rng)
+        detected = access & ~exceptional & (detect >= successes)
+        against = np.repeat(successes, deploys)
+        detect = dice_engine.batch_successes(detect_pool, len(against), rng=rng)
+        deploy_detected = int((detect >= against).sum())
+
+    accessed = int(access.sum())
+    total_deploys = int(deploys.sum())
+    return {
+        "pool": pool,
+        "chance_die": pool <= 0,
+        "access_rate": accessed / trials,
+        "exceptional_rate": int(exceptional.sum()) / trials,
+        "detected_on_access_rate": int(detected.sum()) / accessed if accessed else 0.0,
+        "avg_successes": int(successes[access].sum()) / accessed if accessed else 0.0,
+        "avg_deploys": total_deploys / accessed if accessed else 0.0,
+        "deploy_detection_rate": deploy_detected / total_deploys if total_deploys else 0.0,
+    }
+
+
+def fleet_cell(snapshot, iterations, max_rounds, seed):
+    result = summarize(simulate_totals(snapshot, iterations, max_rounds, seed))
+    lo, hi = result.pop("player_win_rate_ci95")
+    result["player_win_rate_ci95_low"] = lo
+    result["player_win_rate_ci95_high"] = hi
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Grid expansion (request side)
+# ---------------------------------------------------------------------------
+
+def _resolve_class(ref, cache):
+    from starships.models import StarshipClass
+
+    if ref in cache:
+        return cache[ref]
+    qs = StarshipClass.objects.select_related("ship_type")
+    try:
+        cls = qs.get(pk=ref) if isinstance(ref, int) else qs.get(name=ref)
+    except (StarshipClass.DoesNotExist, StarshipClass.MultipleObjectsReturned):
+        raise ValueError(f"unknown or ambiguous starship class {ref!r}")
+    cache[ref] = cls
+    return cls
+
+
+def _loadout_rows(cls, loadout, modules, max_quantity):
+    from starships.models import ClassModule
+
+    rows = []
+    for entry in loadout:
+        key = entry.get("module") if isinstance(entry, dict) else entry
+        if key not in modules:
+            raise ValueError(f"unknown ship module {key!r}")
+        quantity = int(entry.get("quantity", 1)) if isinstance(entry, dict) else 1
+        if quantity < 0:
+            raise ValueError(f"module {key!r} quantity must not be negative")
+        if quantity > max_quantity:
+            raise SweepTooLarge(f"module {key!r} quantity {quantity} (max {max_quantity})")
+        rows.append(ClassModule(starship_class=cls, module=modules[key], quantity=quantity))
+    return rows
+
+
+def _fleet_cells(spec, limits):
+    """``[(labels, snapshot)]`` for every fleet cell."""
+    from starships.models import ShipModule
+    from starships.views import compute_class_stats
+
+    classes = {}
+    sides = {}
+    for side in ("players", "enemies"):
+        entries = spec.get(side) or []
+        if not entries:
+            raise ValueError(f"fleet.{side} must list at least one class")
+        sides[side] = [
+            (_resolve_class(e["class"], classes), max(1, int(e.get("count", 1))))
+            for e in entries
+        ]
+        units = sum(count for _, count in sides[side])
+        if units > limits.units_per_side:
+            raise SweepTooLarge(f"fleet.{side} has {units} ships (max {limits.units_per_side})")
+
+    def axis(name):
+        out = {}
+        for ref, values in (spec.get(name) or {}).items():
+            ref = int(ref) if str(ref).isdigit() else ref
+            out[_resolve_class(ref, classes).pk] = (ref, values)
+        return out
+
+    sizes = axis("sizes")
+    loadouts = axis("loadouts")
+    modules = None
+    if loadouts:
+        modules = {m.key: m for m in ShipModule.objects.select_related("section")}
+
+    # One axis per swept class: sizes first, then loadouts.
+    axes = []
+    for pk, (ref, values) in sizes.items():
+        axes.append((f"size[{ref}]", pk, "size", [(str(v), int(v)) for v in _int_list(values, "fleet.sizes")]))
+    for pk, (ref, values) in loadouts.items():
+        axes.append((f"loadout[{ref}]", pk, "loadout", _named(values, "fleet.loadouts")))
+    combos = list(itertools.product(*[values for *_, values in axes]))
+    _check_cells(len(combos), limits.cells)
+
+    stats_cache = {}
+
+    def stats_for(cls, size, loadout_label, loadout):
+        key = (cls.pk, size, loadout_label)
+        if key not in stats_cache:
+            variant = copy.copy(cls)
+            variant.size = size
+            rows = None if loadout is None else _loadout_rows(
+                variant, loadout, modules, limits.module_quantity,
+            )
+            stats_cache[key] = compute_class_stats(variant, rows)
+        return stats_cache[key]
+
+    distance = int(spec.get("range", 4))
+    if not 0 <= distance <= MAX_RANGE:
+        raise ValueError(f"fleet.range must be 0..{MAX_RANGE}")
+    cells = []
+    for combo in combos:
+        labels = {}
+        overrides = {}
+        for (label, pk, kind, _), (value_label, value) in zip(axes, combo):
+            labels[label] = value_label
+            overrides.setdefault(pk, {})[kind] = (value_label, value)
+        snapshot = []
+        for side, q in (("players", 0), ("enemies", distance)):
+            r = 0
+            for cls, count in sides[side]:
+                over = overrides.get(cls.pk, {})
+                size = over.get("size", (None, cls.size))[1]
+                loadout_label, loadout = over.get("loadout", (None, None))
+                stats = stats_for(cls, size, loadout_label, loadout)
+                for i in range(count):
+                    snapshot.append(snapshot_unit(
+                        stats, id=len(snapshot), side=side, name=f"{cls.name} {i + 1}",
+                        type_key=cls.ship_type.key, q=q, r=r,
+                    ))
+                    r += 1
+        cells.append((labels, snapshot))
+    return cells, len(stats_cache)
+
+
+def _cyber_cells(spec, limits):
+    axes = {
+        "attacker_int": _int_list(spec.get("attacker_int", [3]), "cyber.attacker_int"),
+        "attacker_comp": _int_list(spec.get("attacker_comp", [3]), "cyber.attacker_comp"),
+        "attacker_merits": _int_list(spec.get("attacker_merits", [0]), "cyber.attacker_merits"),
+        "mental_load": _int_list(spec.get("mental_load", [0]), "cyber.mental_load"),
+        "defender_res": _int_list(spec.get("defender_res", [2]), "cyber.defender_res"),
+        "defender_comp": _int_list(spec.get("defender_comp", [2]), "cyber.defender_comp"),
+        "defense_bonus": _int_list(spec.get("defense_bonus", [0]), "cyber.defense_bonus"),
+    }
+    names = list(axes)
+    cells = [dict(zip(names, combo)) for combo in itertools.product(*axes.values())]
+    _check_cells(len(cells), limits.cells)
+    return cells
+
+
+def _facility(entry):
+    if isinstance(entry, dict):
+        return {"key": entry["key"], "level": int(entry.get("level", 1))}
+    key, _, level = str(entry).partition(":")
+    return {"key": key, "level": int(level or 1)}
+
+
+def _base_rows(spec, limits):
+    from agencies.models import Base
+    from agencies.serializers import compute_base_thrive
+
+    mixes = [
+        (label, [_facility(f) for f in mix])
+        for label, mix in _named(spec.get("facility_mixes"), "bases.facility_mixes")
+    ]
+    locations = spec.get("location_types") or [""]
+    merit_sets = _named(spec.get("merits") or [[]], "bases.merits")
+    equipment_sets = _named(spec.get("equipment") or [[]], "bases.equipment")
+    workspaces = _int_list(spec.get("workspaces", [0]), "bases.workspaces")
+    if any(not 0 <= ws <= MAX_WORKSPACES for ws in workspaces):
+        raise ValueError(f"bases.workspaces must be 0..{MAX_WORKSPACES}")
+    combos = list(itertools.product(mixes, locations, merit_sets, equipment_sets, workspaces))
+    _check_cells(len(combos), limits.cells)
+
+    thrive_cache = {}
+    rows = []
+    for (mix_label, mix), location, (merit_label, merits), (eq_label, equipment), ws in combos:
+        key = json.dumps([sorted((f["key"], f["level"]) for f in mix), location,
+                          sorted(merits), sorted(equipment), ws])
+        if key not in thrive_cache:
+            base = Base(
+                name="balance lab", location_type=location, facilities=mix,
+                merits=list(merits), equipment=list(equipment),
+                workspaces=[{"level": 1} for _ in range(ws)],
+            )
+            depts, global_mod, _ = compute_base_thrive(base)
+            thrive_cache[key] = (global_mod, {d["key"]: d["thrive"] for d in depts})
+        global_mod, thrive = thrive_cache[key]
+        row = {
+            "sweep": "bases", "facility_mix": mix_label, "location_type": location,
+            "merits": merit_label, "equipment": eq_label, "workspaces": ws,
+            "global_mod": global_mod,
+        }
+        for dept in THRIVE_DEPARTMENTS:
+            row[f"thrive_{dept}"] = thrive.get(dept, "")
+        rows.append(row)
+    return rows, len(thrive_cache)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def _expand(name, fn, section, limits):
+    """Run a grid expander, reporting malformed input as ``ValueError``."""
+    if not isinstance(section, dict):
+        raise ValueError(f"{name} must be an object")
+    try:
+        return fn(section, limits)
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise ValueError(f"malformed {name} spec: {exc!r}")
+
+
+def _map(pool, fn, arg_lists):
+    if pool is None:
+        return [fn(*args) for args in arg_lists]
+    return [f.result() for f in [pool.submit(fn, *args) for args in arg_lists]]
+
+
+def run_sweep(spec, pool=None, limits=LAB_LIMITS):
+    """Evaluate every grid cell in ``spec``.
+
+    ``pool`` is any ``concurrent.futures`` executor (``None`` runs
+    inline); ``limits`` caps the grid (``SweepLimits``). Returns
+    ``{"rows": [...], "stats": {...}}`` where ``stats`` counts cells and
+    the distinct variants actually computed.
+    """
+    if not isinstance(spec, dict) or not any(k in spec for k in ("fleet", "cyber", "bases")):
+        raise ValueError("spec needs at least one of fleet, cyber, bases")
+    seed = spec.get("seed")
+    if seed is not None and (not isinstance(seed, int) or seed < 0):
+        raise ValueError("seed must be a non-negative integer")
+    fleet_seeds, cyber_seeds = np.random.SeedSequence(seed).spawn(2)
+    rows = []
+    stats = {}
+
+    if "fleet" in spec:
+        fleet = spec["fleet"]
+        cells, variants = _expand("fleet", _fleet_cells, fleet, limits)
+        iterations = max(1, int(fleet.get("iterations", 1000)))
+        max_rounds = max(1, min(100, int(fleet.get("max_rounds", 30))))
+        if iterations * len(cells) > limits.fleet_iterations:
+            raise SweepTooLarge(f"fleet grid needs {iterations * len(cells)} iterations (max {limits.fleet_iterations})")
+        unit_iterations = iterations * sum(len(snapshot) for _, snapshot in cells)
+        if unit_iterations > limits.fleet_unit_iterations:
+            raise SweepTooLarge(
+                f"fleet grid needs {unit_iterations} ship-iterations (max {limits.fleet_unit_iterations})"
+            )
+        seeds = [int(s.generate_state(1, dtype=np.uint64)[0]) for s in fleet_seeds.spawn(len(cells))]
+        results = _map(pool, fleet_cell, [
+            (snapshot, iterations, max_rounds, s) for (_, snapshot), s in zip(cells, seeds)
+        ])
+        for (labels, _), result in zip(cells, results):
+            rows.append({"sweep": "fleet", **labels, **result})
+        stats["fleet_cells"] = len(cells)
+        stats["class_stat_variants"] = variants
+
+    if "cyber" in spec:
+        cyber = spec["cyber"]
+        cells = _expand("cyber", _cyber_cells, cyber, limits)
+        trials = max(1, int(cyber.get("trials", 10_000)))
+        if trials * len(cells) > limits.cyber_trials:
+            raise SweepTooLarge(f"cyber grid needs {trials * len(cells)} trials (max {limits.cyber_trials})")
+        seeds = [int(s.generate_state(1, dtype=np.uint64)[0]) for s in cyber_seeds.spawn(len(cells))]
+        results = _map(pool, cyber_cell, [(c, trials, s) for c, s in zip(cells, seeds)])
+        for params, result in zip(cells, results):
+            rows.append({"sweep": "cyber", **params, **result})
+        stats["cyber_cells"] = len(cells)
+
+    if "bases" in spec:
+        base_rows, variants = _expand("bases", _base_rows, spec["bases"], limits)
+        rows.extend(base_rows)
+        stats["base_cells"] = len(base_rows)
+        stats["thrive_variants"] = variants
+
+    return {"rows": rows, "stats": stats}
+
+
+def to_csv(rows):
+    """CSV text for ``rows``; columns are the union of keys, first-seen order."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns, restval="")
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
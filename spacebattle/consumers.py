@@ -5,12 +5,25 @@ One group per battle id. Server-side action endpoints call
 to every connected client. Clients never send data up — they POST
 mutations through the REST API and rely on the broadcast reply for
 consistency.
+
+Only users who may view the battle over HTTP (``_can_view_battle``)
+can subscribe; anyone else is closed with 4404, as the page 404s.
+
+A reconnecting client passes ``?resume_from=<log id>`` (the newest
+``BattleLog`` id it has) and gets the entries it missed as one
+``replay`` frame, or a bare ``snapshot`` frame telling it to refetch
+the battle when more than ``REPLAY_LIMIT`` entries were missed.
 """
 
 import json
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from exodus.ws import resume_from_scope
+
+REPLAY_LIMIT = 200
+
 
 def battle_group_name(battle_id):
     return f"battle_{battle_id}"
@@ -26,10 +39,55 @@ class BattleConsumer(AsyncWebsocketConsumer):
         if user is None or not user.is_authenticated:
             await self.close()
             return
+        if not await database_sync_to_async(self.may_view)(user):
+            await self.close(code=4404)
+            return
 
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
 
+        resume_from = resume_from_scope(self.scope)
+        if resume_from is not None:
+            frame = await database_sync_to_async(self.resume_frame)(resume_from)
+            if frame is not None:
+                await self.send(text_data=json.dumps(frame))
+
+    def may_view(self, user):
+        """Whether ``user`` may see the battle (``api_battle_detail``'s check)."""
+        from .models import Battle
+        from .views import _can_view_battle
+
+        battle = Battle.objects.filter(pk=self.battle_id).first()
+        return battle is not None and _can_view_battle(user, battle)
+
+    def resume_frame(self, resume_from):
+        """The catch-up frame for a client last synced at log id
+        ``resume_from``, or None when it missed nothing.
+
+        Log entries are replayed as the same ``log`` frames the live
+        stream sends. The socket joins the group before this runs, so an
+        entry can arrive both live and in the replay — clients skip ids
+        they already hold.
+        """
+        from .models import Battle
+        from .views import _serialize_log
+
+        battle = Battle.objects.filter(pk=self.battle_id).first()
+        if battle is None:
+            return None
+        missed = list(
+            battle.log_entries.filter(id__gt=resume_from)
+            .order_by("id")[:REPLAY_LIMIT + 1]
+        )
+        if not missed:
+            return None
+        if len(missed) > REPLAY_LIMIT:
+            return {"type": "snapshot"}
+        return {
+            "type": "replay",
+            "events": [{"type": "log", "payload": _serialize_log(e)} for e in missed],
+        }
+
     async def disconnect(self, close_code):
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
@@ -58,10 +116,12 @@ def broadcast_battle_event(battle_id, event_type, payload):
     layer = get_channel_layer()
     if layer is None:
         return
+    group = battle_group_name(battle_id)
     async_to_sync(layer.group_send)(
-        battle_group_name(battle_id),
+        group,
         {
             "type": "battle_event",
+            "group": group,
             "event_type": event_type,
             "payload": payload,
         },
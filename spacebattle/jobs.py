@@ -0,0 +1,167 @@
+"""Background runner for ``SimulationJob``.
+
+``submit`` schedules a job after the creating transaction commits and
+returns at once. A single coordinator thread per process then:
+
+- splits the job's iterations into shards of ``SHARD_SIZE`` and derives
+  one seed per shard from the job seed with ``numpy.random.SeedSequence``,
+  so a seeded job gives the same result however many workers run it;
+- runs the shards on a lazily created process pool (``spawn`` context,
+  ``settings.SIMULATION_WORKERS`` processes; every core by default);
+- writes ``progress`` as shards land and pushes ``simulation_progress`` /
+  ``simulation_done`` over the battle's ``BattleConsumer`` group;
+- merges the shard totals and stores the ``summarize`` block as ``result``.
+
+The pool lives in the web process, so jobs do not survive a restart; a
+job left ``queued`` / ``running`` by a restart stays that way and can be
+resubmitted.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import SimulationJob
+from .simulation import merge_totals, simulate_totals, summarize
+
+logger = logging.getLogger(__name__)
+
+SHARD_SIZE = 25_000
+MAX_ITERATIONS = 5_000_000
+
+_lock = threading.Lock()
+_pool = None
+_coordinator = None
+
+
+def shard_plan(iterations, seed, shard_size=None):
+    """``[(shard_iterations, shard_seed), ...]`` covering ``iterations``.
+
+    Shard seeds are spawned from ``seed`` (fresh entropy when ``None``),
+    so the plan, and therefore a seeded result, is independent of pool size.
+    """
+    shard_size = shard_size or SHARD_SIZE
+    counts = [shard_size] * (iterations // shard_size)
+    if iterations % shard_size:
+        counts.append(iterations % shard_size)
+    children = np.random.SeedSequence(seed).spawn(len(counts))
+    return [
+        (count, int(child.generate_state(1, dtype=np.uint64)[0]))
+        for count, child in zip(counts, children)
+    ]
+
+
+def _workers():
+    return getattr(settings, "SIMULATION_WORKERS", None) or os.cpu_count() or 1
+
+
+def get_pool():
+    """The process-wide shard pool, created on first use."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _get_coordinator():
+    global _coordinator
+    with _lock:
+        if _coordinator is None:
+            _coordinator = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="simulation-jobs",
+            )
+        return _coordinator
+
+
+def _broadcast(job, event_type, payload):
+    try:
+        from .consumers import broadcast_battle_event
+        broadcast_battle_event(job.battle_id, event_type, payload)
+    except Exception:
+        pass
+
+
+def serialize_job(job):
+    return {
+        "id": job.id,
+        "battle_id": job.battle_id,
+        "status": job.status,
+        "iterations": job.iterations,
+        "max_rounds": job.max_rounds,
+        "seed": job.seed,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def run_job(job_id, pool=None):
+    """Run one job to completion on ``pool`` (default: ``get_pool()``)."""
+    job = SimulationJob.objects.get(pk=job_id)
+    jobs = SimulationJob.objects.filter(pk=job_id)
+    job.status = "running"
+    job.started_at = timezone.now()
+    jobs.update(status=job.status, started_at=job.started_at)
+
+    pool = pool or get_pool()
+    try:
+        futures = {
+            pool.submit(simulate_totals, job.snapshot, count, job.max_rounds, shard_seed): index
+            for index, (count, shard_seed) in enumerate(shard_plan(job.iterations, job.seed))
+        }
+        parts = [None] * len(futures)
+        for future in as_completed(futures):
+            part = future.result()
+            parts[futures[future]] = part
+            job.progress += part["iterations"]
+            jobs.update(progress=job.progress)
+            _broadcast(job, "simulation_progress", {
+                "job_id": job.id,
+                "progress": job.progress,
+                "iterations": job.iterations,
+            })
+        # Merged in shard order, so float sums do not depend on which
+        # shard finished first.
+        job.result = summarize(merge_totals(parts))
+        job.status = "done"
+    except Exception as exc:
+        logger.exception("simulation job %s failed", job_id)
+        job.status = "failed"
+        job.error = f"{type(exc).__name__}: {exc}"
+
+    job.finished_at = timezone.now()
+    jobs.update(
+        status=job.status, result=job.result, error=job.error,
+        finished_at=job.finished_at,
+    )
+    _broadcast(job, "simulation_done", serialize_job(job))
+    return job
+
+
+def _run_on_coordinator(job_id):
+    try:
+        run_job(job_id)
+    except Exception:
+        logger.exception("simulation job %s could not run", job_id)
+    finally:
+        # The coordinator thread owns its own DB connection.
+        connections.close_all()
+
+
+def submit(job):
+    """Queue ``job`` on the coordinator once the current transaction commits."""
+    transaction.on_commit(lambda: _get_coordinator().submit(_run_on_coordinator, job.id))
@@ -0,0 +1,83 @@
+"""Run a balance-lab parameter sweep (see ``spacebattle.balance_lab``).
+
+    python manage.py balance_lab sweep.json                   # CSV to stdout
+    python manage.py balance_lab sweep.json --format json -o out.json
+    python manage.py balance_lab sweep.json --workers 8 --seed 42
+
+``sweep.json`` holds the grid spec (``fleet`` / ``cyber`` / ``bases``
+sections); ``-`` reads it from stdin. Fleet and cyber cells run on a
+local process pool, one worker per core unless ``--workers`` says
+otherwise (``--workers 1`` runs inline).
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from spacebattle.balance_lab import run_sweep, to_csv
+
+
+class Command(BaseCommand):
+    help = "Evaluate a grid of ship, cyber and base balance parameters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("spec", help="Path to the JSON grid spec, or - for stdin.")
+        parser.add_argument(
+            "--format", choices=["csv", "json"], default="csv",
+            help="Output format (default: csv).",
+        )
+        parser.add_argument(
+            "-o", "--output", default=None,
+            help="Write results to this file instead of stdout.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Worker processes (default: CPU count; 1 = no pool).",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None,
+            help="Override the spec's seed.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["spec"] == "-":
+                spec = json.load(sys.stdin)
+            else:
+                with open(options["spec"]) as fh:
+                    spec = json.load(fh)
+        except (OSError, json.JSONDecodeError) as exc:
+            raise CommandError(f"Cannot read spec: {exc}")
+        if options["seed"] is not None and isinstance(spec, dict):
+            spec["seed"] = options["seed"]
+
+        workers = options["workers"] or os.cpu_count() or 1
+        try:
+            if workers <= 1:
+                result = run_sweep(spec)
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                ) as pool:
+                    result = run_sweep(spec, pool=pool)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options["format"] == "json":
+            text = json.dumps(result, indent=2)
+        else:
+            text = to_csv(result["rows"])
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as fh:
+                fh.write(text)
+            summary = ", ".join(f"{k} {v}" for k, v in result["stats"].items())
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {len(result['rows'])} row(s) to {options['output']} ({summary})."
+            ))
+        else:
+            self.stdout.write(text, ending="")
@@ -324,3 +324,56 @@ class BattleLog(models.Model):
 
     def __str__(self):
         return f"[{self.battle_id}] {self.action_type} r{self.round_number}"
+
+
+class SimulationJob(models.Model):
+    """A long balance simulation run off the request thread.
+
+    ``api_battle_simulate_job`` freezes the battle's participant snapshot
+    and parameters here and returns at once; ``spacebattle.jobs`` shards
+    the iterations across a local process pool, writes ``progress`` as
+    shards land (also pushed to the battle's WebSocket group), and stores
+    the merged ``result`` — the same block ``api_battle_simulate`` returns.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    battle = models.ForeignKey(
+        Battle, on_delete=models.CASCADE, related_name="simulation_jobs",
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name="simulation_jobs",
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="queued",
+    )
+    iterations = models.PositiveIntegerField()
+    max_rounds = models.PositiveIntegerField(default=30)
+    seed = models.BigIntegerField(
+        null=True, blank=True,
+        help_text="Request seed. Per-shard seeds are derived from it, so a seeded job is reproducible.",
+    )
+    snapshot = models.JSONField(
+        default=list,
+        help_text="Participant combat values frozen at submit time (simulation.battle_snapshot).",
+    )
+    progress = models.PositiveIntegerField(
+        default=0, help_text="Iterations completed so far.",
+    )
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"[{self.battle_id}] sim x{self.iterations} ({self.status})"
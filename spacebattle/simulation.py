@@ -0,0 +1,306 @@
+"""Monte Carlo balance engine behind ``api_battle_simulate``.
+
+The toy combat model (unchanged since Release B): every round each unit
+rolls initiative (d10 + bonus) and, in descending order (ties: smaller
+hull first, then last round's order), fires its dice pool at the nearest
+living enemy (ties: whoever acts first this round). Each die succeeds on
+8+, successes minus the target's defense are hits, hits minus armor are
+damage. The fight ends when a side is wiped or ``max_rounds`` is hit.
+
+``simulate`` runs every iteration at once: state is an
+``(iterations, units)`` array, the hex-distance matrix is built once,
+finished fights drop out of the working set, and each unit's pool is one
+batched ``exodus.dice`` draw per round (no explosions in this model, so
+``n`` d10s at 8+ is exactly ``Binomial(n, 0.3)``).
+Only the action slots within a round are a Python loop, so cost scales
+with ``rounds × units`` array operations rather than
+``iterations × rounds × units × dice`` interpreter steps.
+
+Same model, same result block, same statistics as the scalar loop — but
+not the same random stream, so a given ``seed`` reproduces its own run,
+not a pre-batching one.
+
+``simulate_scalar`` is the original one-fight-at-a-time loop, kept as the
+reference the vectorized engine is tested against.
+"""
+
+import math
+import random
+
+import numpy as np
+
+from exodus import dice as dice_engine
+
+PLAYERS, ENEMIES, NEUTRAL = 0, 1, 2
+_SIDE_CODES = {"players": PLAYERS, "enemies": ENEMIES}
+
+_UNREACHABLE = 1 << 20  # targeting score for "cannot / need not shoot this"
+
+# Request-side cap. Memory is ~a dozen int64 arrays of iterations × units.
+MAX_ITERATIONS = 200_000
+
+
+def battle_snapshot(battle):
+    """Per-participant combat values for ``battle``, in roster order.
+
+    Pulls stats from ``compute_class_stats`` so every module's delta is
+    respected. Plain dicts, so the snapshot can be shipped to workers.
+    """
+    from starships.views import compute_class_stats
+
+    snapshot = []
+    parts = battle.participants.select_related(
+        "starship__starship_class__ship_type",
+    ).all()
+    for p in parts:
+        cls = p.starship.starship_class
+        snapshot.append(snapshot_unit(
+            compute_class_stats(cls),
+            id=p.id, side=p.side, name=p.starship.name,
+            type_key=cls.ship_type.key, q=p.q, r=p.r,
+        ))
+    return snapshot
+
+
+def snapshot_unit(stats, *, id, side, name, type_key, q, r):
+    """One snapshot entry from a ``compute_class_stats`` result."""
+    return {
+        "id": id,
+        "side": side,
+        "name": name,
+        "type_key": type_key,
+        "size": stats["size"],
+        "q": q, "r": r,
+        "health_max": stats["health"],
+        "health": stats["health"],
+        "speed": stats["speed"],
+        "defense": stats["defense"],
+        "armor": stats["armor"],
+        "initiative_bonus": stats["initiative_bonus"],
+        # Attack dice pool: hull size + 2. A drone gets 3,
+        # a titan gets ~12. Tuneable here, retune as rules evolve.
+        "dice": max(1, stats["size"] + 2),
+    }
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """Wilson score interval for a binomial rate (95% by default)."""
+    if trials <= 0:
+        return [0.0, 1.0]
+    p = successes / trials
+    denom = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return [max(0.0, centre - half), min(1.0, centre + half)]
+
+
+def _totals(iterations, outcomes, rounds, health, health_max, sides):
+    """Raw, additive sums for a batch of fights. ``outcomes`` / ``rounds``
+    are per iteration, ``health`` is ``(iterations, units)``. Totals from
+    separate shards merge with ``merge_totals``."""
+    frac = health / np.maximum(1, health_max)
+    alive = health > 0
+    is_player = sides == PLAYERS
+    is_enemy = sides == ENEMIES
+    return {
+        "iterations": iterations,
+        "player_wins": int(np.count_nonzero(outcomes == PLAYERS)),
+        "enemy_wins": int(np.count_nonzero(outcomes == ENEMIES)),
+        "total_rounds": int(rounds.sum()),
+        "player_health_fraction": float(frac[:, is_player].sum()),
+        "enemy_health_fraction": float(frac[:, is_enemy].sum()),
+        "player_survivors": int(alive[:, is_player].sum()),
+        "enemy_survivors": int(alive[:, is_enemy].sum()),
+        "player_units": iterations * int(is_player.sum()),
+        "enemy_units": iterations * int(is_enemy.sum()),
+    }
+
+
+def merge_totals(parts):
+    """Element-wise sum of ``_totals`` dicts."""
+    merged = {}
+    for part in parts:
+        for key, value in part.items():
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def summarize(totals):
+    """The ``api_battle_simulate`` result block for (merged) totals."""
+    iterations = totals["iterations"]
+    player_wins = totals["player_wins"]
+    enemy_wins = totals["enemy_wins"]
+    return {
+        "iterations": iterations,
+        "player_wins": player_wins,
+        "enemy_wins": enemy_wins,
+        "draws": iterations - player_wins - enemy_wins,
+        "total_rounds": totals["total_rounds"],
+        # Percentage hull remaining across all sims
+        "avg_player_health_remaining": (
+            100.0 * totals["player_health_fraction"] / max(1, totals["player_units"])
+        ),
+        "avg_enemy_health_remaining": (
+            100.0 * totals["enemy_health_fraction"] / max(1, totals["enemy_units"])
+        ),
+        "avg_player_survivors": totals["player_survivors"] / iterations,
+        "avg_enemy_survivors": totals["enemy_survivors"] / iterations,
+        "avg_rounds": totals["total_rounds"] / iterations,
+        "player_win_rate": player_wins / iterations,
+        "enemy_win_rate": enemy_wins / iterations,
+        "player_win_rate_ci95": wilson_interval(player_wins, iterations),
+    }
+
+
+def _unit_arrays(snapshot):
+    col = lambda key: np.array([u[key] for u in snapshot], dtype=np.int64)  # noqa: E731
+    sides = np.array([_SIDE_CODES.get(u["side"], NEUTRAL) for u in snapshot], dtype=np.int64)
+    return sides, col("q"), col("r"), col("size"), col("dice"), col("defense"), \
+        col("armor"), col("initiative_bonus"), col("health"), col("health_max")
+
+
+def simulate(snapshot, iterations, max_rounds=30, seed=None):
+    """Run ``iterations`` fights of ``snapshot`` at once; see module doc.
+
+    Deterministic for a given integer ``seed``.
+    """
+    return summarize(simulate_totals(snapshot, iterations, max_rounds, seed))
+
+
+def simulate_totals(snapshot, iterations, max_rounds=30, seed=None):
+    """``simulate`` without the final averaging: additive totals, so
+    shards run in separate processes can be merged exactly."""
+    rng = np.random.default_rng(seed)
+    sides, q, r, size, dice, defense, armor, bonus, health0, health_max = _unit_arrays(snapshot)
+    n, u = iterations, len(snapshot)
+
+    # Targeting score of every (shooter, target) pair, built once: hex
+    # distance scaled by ``u`` (so adding this round's turn position breaks
+    # ties), or ``_UNREACHABLE`` for friends, neutrals and self.
+    dq = q[:, None] - q[None, :]
+    dr = r[:, None] - r[None, :]
+    dist = (np.abs(dq) + np.abs(dq + dr) + np.abs(dr)) // 2 * u
+    combatant = sides != NEUTRAL
+    hostile = (sides[:, None] != sides[None, :]) & combatant[:, None] & combatant[None, :]
+    reach = np.where(hostile, dist, _UNREACHABLE).astype(np.int32)
+    # Initiative sort key, most significant first: -init, size, last turn slot.
+    size_key = ((size - size.min(initial=0)) * u).astype(np.int32)
+    init_weight = int(size_key.max(initial=0)) + u
+    is_player = sides == PLAYERS
+    is_enemy = sides == ENEMIES
+
+    health = np.tile(health0.astype(np.int32), (n, 1))
+    position = np.tile(np.arange(u, dtype=np.int32), (n, 1))  # turn slot last round
+    outcomes = np.full(n, NEUTRAL)
+    rounds = np.full(n, max_rounds)
+    running = np.arange(n)  # indices of fights still going
+
+    for rnd in range(max_rounds):
+        if not running.size:
+            break
+        # Only unfinished fights are carried through the round.
+        k = running.size
+        hp = health[running]
+        rows = np.arange(k)
+        # Initiative: keys are unique per fight (last round's slot is the
+        # final tiebreak), so a plain argsort is the legacy stable sort on
+        # (-init, size). A unit's new slot is how many keys sort before it.
+        init = rng.integers(1, 11, size=(k, u), dtype=np.int32) + bonus.astype(np.int32)
+        key = (10 + int(bonus.max(initial=0)) - init) * init_weight + size_key + position[running]
+        turn = np.argsort(key, axis=1).astype(np.int32)
+        pos = np.zeros((k, u), dtype=np.int32)
+        for i in range(u):
+            pos += key[:, i:i + 1] < key
+        # Each unit fires at most once a round, so its pool can be rolled
+        # up front: one binomial column per unit.
+        pools = np.empty((k, u), dtype=np.int32)
+        for i in range(u):
+            pools[:, i] = dice_engine.batch_successes(
+                int(dice[i]), k, again=None, chance_die=False, rng=rng,
+            )
+
+        # Flat (row * u + unit) indices: 1-D ``take`` beats 2-D fancy indexing.
+        base = rows * u
+        flat_hp = hp.reshape(-1)
+        for slot in range(u):
+            actor = turn[:, slot]
+            score = np.take(reach, actor, axis=0) + pos + (hp <= 0) * _UNREACHABLE
+            target = score.argmin(axis=1)
+            cell = base + target
+            acting = (
+                np.take(combatant, actor)
+                & (np.take(flat_hp, base + actor) > 0)
+                & (np.take(score.reshape(-1), cell) < _UNREACHABLE)
+            )
+            if not acting.any():
+                continue
+            hits = np.maximum(0, np.take(pools.reshape(-1), base + actor) - np.take(defense, target))
+            damage = np.maximum(0, hits - np.take(armor, target)) * acting
+            flat_hp[cell] = np.maximum(0, np.take(flat_hp, cell) - damage)
+
+        health[running] = hp
+        position[running] = pos
+        alive = hp > 0
+        player_alive = (alive & is_player).any(axis=1)
+        enemy_alive = (alive & is_enemy).any(axis=1)
+        finished = ~(player_alive & enemy_alive)
+        done = running[finished]
+        outcomes[done[player_alive[finished]]] = PLAYERS
+        outcomes[done[enemy_alive[finished]]] = ENEMIES
+        rounds[done] = rnd + 1
+        running = running[~finished]
+
+    return _totals(n, outcomes, rounds, health, health_max, sides)
+
+
+def simulate_scalar(snapshot, iterations, max_rounds=30, seed=None):
+    """Reference engine: the original pure-Python loop, one fight and one
+    die at a time. Same model and result block as ``simulate``."""
+    master_rng = random.Random(seed) if seed is not None else random.Random()
+
+    def _distance(a, b):
+        return (abs(a["q"] - b["q"]) + abs(a["q"] + a["r"] - b["q"] - b["r"]) + abs(a["r"] - b["r"])) // 2
+
+    def _sim_once(rng):
+        units = [dict(u, index=i) for i, u in enumerate(snapshot)]
+        for rnd in range(max_rounds):
+            for u in units:
+                u["init"] = dice_engine.d10(rng) + u["initiative_bonus"]
+            units.sort(key=lambda u: (-u["init"], u["size"]))
+            for u in units:
+                if u["health"] <= 0 or u["side"] not in _SIDE_CODES:
+                    continue
+                enemies = [
+                    e for e in units
+                    if e["health"] > 0
+                    and e["side"] != u["side"]
+                    and e["side"] in _SIDE_CODES
+                ]
+                if not enemies:
+                    continue
+                enemies.sort(key=lambda e: _distance(u, e))
+                target = enemies[0]
+                successes = dice_engine.roll(u["dice"], again=None, rng=rng).successes
+                hits = max(0, successes - target["defense"])
+                damage = max(0, hits - target["armor"])
+                target["health"] = max(0, target["health"] - damage)
+            player_alive = any(u["side"] == "players" and u["health"] > 0 for u in units)
+            enemy_alive = any(u["side"] == "enemies" and u["health"] > 0 for u in units)
+            if player_alive and not enemy_alive:
+                return PLAYERS, rnd + 1, units
+            if enemy_alive and not player_alive:
+                return ENEMIES, rnd + 1, units
+            if not player_alive and not enemy_alive:
+                return NEUTRAL, rnd + 1, units
+        return NEUTRAL, max_rounds, units
+
+    outcomes = np.empty(iterations, dtype=np.int64)
+    rounds = np.empty(iterations, dtype=np.int64)
+    health = np.empty((iterations, len(snapshot)), dtype=np.int64)
+    for i in range(iterations):
+        rng = random.Random(master_rng.randint(0, 2**31 - 1))
+        outcomes[i], rounds[i], units = _sim_once(rng)
+        for unit in units:
+            health[i, unit["index"]] = unit["health"]
+    sides, *_, health_max = _unit_arrays(snapshot)
+    return summarize(_totals(iterations, outcomes, rounds, health, health_max, sides))
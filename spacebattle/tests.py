@@ -0,0 +1,443 @@
+"""Tests for the batched Monte Carlo engine behind ``api_battle_simulate``,
+the ``SimulationJob`` background runner and the balance lab."""
+
+import csv
+import io
+import json
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from channels.testing import WebsocketCommunicator
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from agencies.models import Agency
+from agencies.models import Base
+from agencies.serializers import compute_base_thrive
+from spacebattle import balance_lab, jobs
+from spacebattle.consumers import BattleConsumer
+from spacebattle.models import Battle, BattleLog, BattleParticipant, SimulationJob
+from starships.views import compute_class_stats
+from spacebattle.simulation import (
+    merge_totals, simulate, simulate_scalar, simulate_totals, summarize, wilson_interval,
+)
+from starships.models import ClassModule, ShipModule, ShipType, Starship, StarshipClass
+
+
+def _unit(side, q, r, size=3, health=12, defense=0, armor=0, bonus=0):
+    return {
+        "id": q * 100 + r, "side": side, "name": f"{side}-{q}-{r}", "type_key": "t",
+        "size": size, "q": q, "r": r, "health_max": health, "health": health,
+        "speed": 1, "defense": defense, "armor": armor,
+        "initiative_bonus": bonus, "dice": size + 2,
+    }
+
+
+SKIRMISH = [
+    _unit("players", 0, 0, size=4, health=14, armor=1),
+    _unit("players", 1, 0, size=2, health=8, bonus=2),
+    _unit("enemies", 4, -1, size=5, health=16, defense=1),
+    _unit("enemies", 5, 0, size=2, health=8),
+    _unit("neutral", 2, 0, size=9, health=40),
+]
+
+
+class SimulationEngineTests(SimpleTestCase):
+    def test_seeded_runs_are_reproducible(self):
+        a = simulate(SKIRMISH, 500, seed=42)
+        b = simulate(SKIRMISH, 500, seed=42)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, simulate(SKIRMISH, 500, seed=43))
+
+    def test_matches_reference_engine_statistically(self):
+        fast = simulate(SKIRMISH, 20000, seed=1)
+        slow = simulate_scalar(SKIRMISH, 3000, seed=1)
+        self.assertEqual(set(fast), set(slow))
+        lo, hi = fast["player_win_rate_ci95"]
+        self.assertLessEqual(hi - lo, 0.02)
+        # The reference estimate should sit inside a generous band around the
+        # batched one (3000 scalar fights → ~±0.02 sampling noise).
+        self.assertAlmostEqual(fast["player_win_rate"], slow["player_win_rate"], delta=0.05)
+        self.assertAlmostEqual(fast["avg_rounds"], slow["avg_rounds"], delta=0.5)
+        self.assertAlmostEqual(
+            fast["avg_enemy_health_remaining"], slow["avg_enemy_health_remaining"], delta=5,
+        )
+
+    def test_one_sided_and_neutral_only_battles(self):
+        only_players = simulate([_unit("players", 0, 0)], 10, seed=0)
+        self.assertEqual(only_players["player_wins"], 10)
+        self.assertEqual(only_players["avg_rounds"], 1)
+        neutral = simulate([_unit("neutral", 0, 0)], 10, seed=0)
+        self.assertEqual(neutral["draws"], 10)
+
+    def test_hundred_thousand_iterations_fit_in_a_request(self):
+        started = time.monotonic()
+        result = simulate(SKIRMISH, 100_000, seed=7)
+        self.assertEqual(result["iterations"], 100_000)
+        self.assertLess(time.monotonic() - started, 20)
+
+    def test_wilson_interval(self):
+        lo, hi = wilson_interval(50, 100)
+        self.assertAlmostEqual(lo, 0.4038, places=3)
+        self.assertAlmostEqual(hi, 0.5962, places=3)
+        self.assertEqual(wilson_interval(0, 0), [0.0, 1.0])
+
+
+    def test_merged_shard_totals_summarize_like_one_run(self):
+        parts = [simulate_totals(SKIRMISH, 300, seed=s) for s in (1, 2, 3)]
+        merged = summarize(merge_totals(parts))
+        self.assertEqual(merged["iterations"], 900)
+        self.assertEqual(
+            merged["player_wins"], sum(p["player_wins"] for p in parts),
+        )
+        self.assertEqual(summarize(parts[0]), simulate(SKIRMISH, 300, seed=1))
+
+    def test_shard_plan_is_fixed_by_seed(self):
+        plan = jobs.shard_plan(60_001, seed=9, shard_size=20_000)
+        self.assertEqual([count for count, _ in plan], [20_000, 20_000, 20_000, 1])
+        self.assertEqual(plan, jobs.shard_plan(60_001, seed=9, shard_size=20_000))
+        self.assertEqual(len({s for _, s in plan}), 4)
+        self.assertNotEqual(plan, jobs.shard_plan(60_001, seed=10, shard_size=20_000))
+
+
+class _BattleFixture:
+    def setUp(self):
+        User = get_user_model()
+        self.gm = User.objects.create_superuser("sim_gm", "gm@example.com", "pw")
+        self.client = Client()
+        self.client.force_login(self.gm)
+        agency = Agency.objects.create(name="Sim Agency")
+        stype = ShipType.objects.create(key="sim_frigate", name="Frigate", min_size=1, max_size=10)
+        cls = StarshipClass.objects.create(name="Sim Frigate", ship_type=stype, size=3)
+        self.battle = Battle.objects.create(name="Sim Battle")
+        for i, side in enumerate(["players", "enemies"]):
+            ship = Starship.objects.create(name=f"Ship {i}", starship_class=cls, agency=agency)
+            BattleParticipant.objects.create(battle=self.battle, starship=ship, side=side, q=i * 3)
+
+
+class SimulateEndpointTests(_BattleFixture, TestCase):
+    def _simulate(self, body):
+        return self.client.post(
+            f"/api/spacebattle/battles/{self.battle.id}/simulate/",
+            data=json.dumps(body), content_type="application/json",
+        )
+
+    def test_simulate_reports_rates_and_interval(self):
+        resp = self._simulate({"iterations": 5000, "seed": 3})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["iterations"], 5000)
+        self.assertEqual(data["player_wins"] + data["enemy_wins"] + data["draws"], 5000)
+        lo, hi = data["player_win_rate_ci95"]
+        self.assertLessEqual(lo, data["player_win_rate"])
+        self.assertLessEqual(data["player_win_rate"], hi)
+        self.assertEqual(self._simulate({"iterations": 5000, "seed": 3}).json(), data)
+
+    def test_bad_seed_rejected(self):
+        for body in ({"seed": "abc"}, {"seed": -1}, {"seed": 2 ** 63}, {"iterations": "many"}):
+            self.assertEqual(self._simulate(body).status_code, 400, body)
+
+
+class SimulationJobTests(_BattleFixture, TestCase):
+    def _submit(self, body):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            resp = self.client.post(
+                f"/api/spacebattle/battles/{self.battle.id}/simulate/jobs/",
+                data=json.dumps(body), content_type="application/json",
+            )
+        return resp, callbacks
+
+    def _run(self, job_id, workers, shard_size=1_000):
+        with mock.patch.object(jobs, "SHARD_SIZE", shard_size), \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            return jobs.run_job(job_id, pool=pool)
+
+    def test_submit_returns_202_and_queues_after_commit(self):
+        with mock.patch.object(jobs, "_get_coordinator") as coordinator:
+            resp, callbacks = self._submit({"iterations": 4000, "seed": 5})
+        self.assertEqual(resp.status_code, 202)
+        data = resp.json()
+        self.assertEqual((data["status"], data["progress"], data["iterations"]), ("queued", 0, 4000))
+        self.assertTrue(callbacks)
+        coordinator.return_value.submit.assert_called_once_with(jobs._run_on_coordinator, data["id"])
+
+        job = SimulationJob.objects.get(pk=data["id"])
+        self.assertEqual(len(job.snapshot), 2)
+        self.assertEqual(job.created_by, self.gm)
+
+    def test_run_job_is_deterministic_across_worker_counts(self):
+        with mock.patch.object(jobs, "_get_coordinator"):
+            first = self._submit({"iterations": 4500, "seed": 11})[0].json()["id"]
+            second = self._submit({"iterations": 4500, "seed": 11})[0].json()["id"]
+
+        with mock.patch.object(jobs, "_broadcast") as broadcast:
+            one = self._run(first, workers=1)
+        four = self._run(second, workers=4)
+        self.assertEqual((one.status, one.progress), ("done", 4500))
+        self.assertEqual(one.result, four.result)
+        self.assertEqual(one.result["iterations"], 4500)
+        events = [call.args[1] for call in broadcast.call_args_list]
+        self.assertEqual(events, ["simulation_progress"] * 5 + ["simulation_done"])
+
+        resp = self.client.get(f"/api/spacebattle/simulation-jobs/{first}/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["result"], one.result)
+
+    def test_failed_shard_marks_job_failed(self):
+        job = SimulationJob.objects.create(
+            battle=self.battle, iterations=10, snapshot=[{"broken": True}],
+        )
+        with self.assertLogs("spacebattle.jobs", "ERROR"):
+            job = self._run(job.id, workers=1)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("KeyError", SimulationJob.objects.get(pk=job.id).error)
+
+    def test_players_cannot_submit_and_bad_input_rejected(self):
+        User = get_user_model()
+        player = User.objects.create_user("sim_player", "p@example.com", "pw")
+        client = Client()
+        client.force_login(player)
+        resp = client.post(
+            f"/api/spacebattle/battles/{self.battle.id}/simulate/jobs/",
+            data="{}", content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(self._submit({"seed": -1})[0].status_code, 400)
+        self.assertEqual(self._submit({"iterations": "lots"})[0].status_code, 400)
+        self.assertFalse(SimulationJob.objects.exists())
+
+
+class SimulationJobProcessPoolTests(_BattleFixture, TransactionTestCase):
+    def test_shards_run_in_worker_processes(self):
+        job = SimulationJob.objects.create(
+            battle=self.battle, iterations=3000, seed=4, snapshot=SKIRMISH,
+        )
+        with mock.patch.object(jobs, "SHARD_SIZE", 1_000), \
+                mock.patch.object(jobs, "_broadcast"), \
+                ProcessPoolExecutor(max_workers=2) as pool:
+            job = jobs.run_job(job.id, pool=pool)
+        self.assertEqual(job.status, "done")
+        expected = summarize(merge_totals(
+            simulate_totals(SKIRMISH, count, 30, seed)
+            for count, seed in jobs.shard_plan(3000, 4, shard_size=1_000)
+        ))
+        self.assertEqual(job.result, expected)
+
+
+class BalanceLabTests(_BattleFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.plate = ShipModule.objects.create(key="lab_plate", name="Plate", health_delta=6, armor_delta=1)
+        ClassModule.objects.create(
+            starship_class=StarshipClass.objects.get(name="Sim Frigate"), module=self.plate,
+        )
+
+    def _fleet_spec(self, **extra):
+        return {
+            "seed": 8,
+            "fleet": {
+                "players": [{"class": "Sim Frigate", "count": 2}],
+                "enemies": [{"class": "Sim Frigate", "count": 2}],
+                "sizes": {"Sim Frigate": [2, 5]},
+                "loadouts": {"Sim Frigate": {"installed": None, "bare": [], "double": [
+                    {"module": "lab_plate", "quantity": 2},
+                ]}},
+                "iterations": 400,
+                **extra,
+            },
+        }
+
+    def test_fleet_grid_computes_each_class_variant_once(self):
+        with mock.patch(
+            "starships.views.compute_class_stats", wraps=compute_class_stats,
+        ) as stats:
+            result = balance_lab.run_sweep(self._fleet_spec())
+        rows = result["rows"]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(result["stats"], {"fleet_cells": 6, "class_stat_variants": 6})
+        self.assertEqual(stats.call_count, 6)
+        self.assertEqual(
+            {(r["size[Sim Frigate]"], r["loadout[Sim Frigate]"]) for r in rows},
+            {(s, l) for s in ("2", "5") for l in ("installed", "bare", "double")},
+        )
+        self.assertTrue(all(r["player_wins"] + r["enemy_wins"] + r["draws"] == 400 for r in rows))
+
+        # Same seed → same grid, whether cells run inline or on a pool.
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            self.assertEqual(balance_lab.run_sweep(self._fleet_spec(), pool=pool)["rows"], rows)
+
+    def test_cyber_grid_matches_dice_rules(self):
+        rows = balance_lab.run_sweep({"seed": 1, "cyber": {
+            "attacker_int": [2, 4], "attacker_comp": [0, 4],
+            "defender_comp": [0, 3], "trials": 20_000,
+        }})["rows"]
+        self.assertEqual(len(rows), 8)
+        by_pool = {(r["pool"], r["defender_comp"]): r for r in rows}
+        self.assertGreater(by_pool[(8, 0)]["access_rate"], by_pool[(2, 0)]["access_rate"])
+        self.assertEqual(by_pool[(8, 0)]["detected_on_access_rate"], 0.0)
+        self.assertGreater(by_pool[(2, 3)]["detected_on_access_rate"], 0.0)
+
+    def test_base_grid_reuses_thrive_per_layout(self):
+        spec = {"bases": {
+            "facility_mixes": {
+                "barracks": ["barracks", "training:2"],
+                "same": [{"key": "training", "level": 2}, "barracks"],
+                "lab": ["laboratory", "observatory"],
+            },
+            "location_types": ["military_base", "rd_installation"],
+        }}
+        result = balance_lab.run_sweep(spec)
+        self.assertEqual(result["stats"], {"base_cells": 6, "thrive_variants": 4})
+        row = next(r for r in result["rows"]
+                   if r["facility_mix"] == "lab" and r["location_type"] == "military_base")
+        base = Base(
+            name="Check", location_type="military_base",
+            facilities=[{"key": "laboratory", "level": 1}, {"key": "observatory", "level": 1}],
+        )
+        depts, global_mod, _ = compute_base_thrive(base)
+        self.assertEqual(row["global_mod"], global_mod)
+        for dept in depts:
+            self.assertEqual(row[f"thrive_{dept['key']}"], dept["thrive"])
+
+    def test_bad_specs_rejected(self):
+        for spec in (
+            {},
+            {"fleet": {"players": [{"class": "Nope"}], "enemies": [{"class": "Nope"}]}},
+            {"fleet": self._fleet_spec()["fleet"] | {"loadouts": {"Sim Frigate": [["missing"]]}}},
+            {"cyber": {"attacker_int": ["x"]}},
+            {"cyber": {"attacker_int": list(range(100)), "attacker_comp": list(range(100))}},
+            {"bases": {"facility_mixes": [[{"level": 2}]]}},
+            {"seed": "x", "cyber": {}},
+            {"fleet": self._fleet_spec()["fleet"] | {"range": 10_000}},
+            {"bases": {"facility_mixes": [[]], "workspaces": [10**9]}},
+        ):
+            with self.assertRaises(ValueError, msg=spec):
+                balance_lab.run_sweep(spec)
+
+    def test_endpoint_returns_json_and_csv(self):
+        url = "/api/spacebattle/balance-lab/"
+        body = json.dumps({"cyber": {"attacker_comp": [1, 2, 3], "trials": 100}})
+        with ThreadPoolExecutor(max_workers=2) as pool, \
+                mock.patch.object(jobs, "get_pool", return_value=pool):
+            resp = self.client.post(url, data=body, content_type="application/json")
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(len(resp.json()["rows"]), 3)
+
+            resp = self.client.post(url + "?format=csv", data=body, content_type="application/json")
+            self.assertEqual(resp["Content-Type"], "text/csv")
+            rows = list(csv.DictReader(io.StringIO(resp.content.decode())))
+            self.assertEqual([r["attacker_comp"] for r in rows], ["1", "2", "3"])
+
+            bad = self.client.post(url, data="{}", content_type="application/json")
+            self.assertEqual(bad.status_code, 400)
+
+        User = get_user_model()
+        player = User.objects.create_user("lab_player", "lab@example.com", "pw")
+        client = Client()
+        client.force_login(player)
+        self.assertEqual(client.post(url, data=body, content_type="application/json").status_code, 403)
+
+    def test_endpoint_caps_grids_below_the_command(self):
+        # 600 one-trial cells: fine for the command, too big for a request.
+        spec = {"cyber": {"attacker_int": list(range(20)), "attacker_comp": list(range(30)), "trials": 1}}
+        self.assertEqual(len(balance_lab.run_sweep(spec)["rows"]), 600)
+        with mock.patch.object(jobs, "get_pool", return_value=None):
+            resp = self.client.post(
+                "/api/spacebattle/balance-lab/", data=json.dumps(spec),
+                content_type="application/json",
+            )
+            self.assertEqual(resp.status_code, 400)
+            self.assertIn("manage.py balance_lab", resp.json()["error"])
+            spec["cyber"] = {"trials": balance_lab.HTTP_LIMITS.cyber_trials + 1}
+            resp = self.client.post(
+                "/api/spacebattle/balance-lab/", data=json.dumps(spec),
+                content_type="application/json",
+            )
+            self.assertEqual(resp.status_code, 400)
+
+    def test_fleet_size_and_quantity_are_capped(self):
+        huge_side = self._fleet_spec(iterations=1)
+        huge_side["fleet"]["players"] = [{"class": "Sim Frigate", "count": 5000}]
+        huge_stack = self._fleet_spec(iterations=1)
+        huge_stack["fleet"]["loadouts"] = {"Sim Frigate": {"stack": [
+            {"module": "lab_plate", "quantity": 5000},
+        ]}}
+        for spec in (huge_side, huge_stack):
+            with self.assertRaises(balance_lab.SweepTooLarge):
+                balance_lab.run_sweep(spec)
+
+        # 40 ships x 6 cells x 2000 iterations: fine for the command only.
+        busy = self._fleet_spec(iterations=2000)
+        busy["fleet"]["players"] = [{"class": "Sim Frigate", "count": 20}]
+        busy["fleet"]["enemies"] = [{"class": "Sim Frigate", "count": 20}]
+        with self.assertRaisesRegex(balance_lab.SweepTooLarge, "ship-iterations"):
+            balance_lab.run_sweep(busy, limits=balance_lab.HTTP_LIMITS)
+
+    def test_management_command_writes_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            spec_path = f"{tmp}/spec.json"
+            out_path = f"{tmp}/out.csv"
+            with open(spec_path, "w") as fh:
+                json.dump(self._fleet_spec(iterations=50), fh)
+            out = io.StringIO()
+            call_command("balance_lab", spec_path, "--workers", "1", "-o", out_path, stdout=out)
+            self.assertIn("Wrote 6 row(s)", out.getvalue())
+            with open(out_path) as fh:
+                rows = list(csv.DictReader(fh))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({r["sweep"] for r in rows}, {"fleet"})
+
+
+class BattleResumeTests(_BattleFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.entries = [
+            BattleLog.objects.create(battle=self.battle, action_type="note", message=f"n{i}")
+            for i in range(3)
+        ]
+        self.consumer = BattleConsumer()
+        self.consumer.battle_id = self.battle.id
+
+    def test_replays_only_missed_entries(self):
+        self.assertIsNone(self.consumer.resume_frame(self.entries[-1].id))
+        frame = self.consumer.resume_frame(self.entries[0].id)
+        self.assertEqual(frame["type"], "replay")
+        self.assertEqual(
+            [e["payload"]["id"] for e in frame["events"]],
+            [e.id for e in self.entries[1:]],
+        )
+        self.assertEqual({e["type"] for e in frame["events"]}, {"log"})
+
+    def test_long_gap_gets_snapshot(self):
+        with mock.patch("spacebattle.consumers.REPLAY_LIMIT", 1):
+            frame = self.consumer.resume_frame(0)
+        # Just "refetch": the battle itself comes from the HTTP view.
+        self.assertEqual(frame, {"type": "snapshot"})
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class BattleConsumerAccessTests(_BattleFixture, TransactionTestCase):
+    """The battle socket applies ``api_battle_detail``'s visibility check."""
+
+    async def _connect(self, user):
+        communicator = WebsocketCommunicator(
+            BattleConsumer.as_asgi(), f"/ws/spacebattle/{self.battle.id}/?resume_from=0",
+        )
+        communicator.scope["user"] = user
+        communicator.scope["url_route"] = {"kwargs": {"battle_id": str(self.battle.id)}}
+        return communicator, *(await communicator.connect())
+
+    async def test_outsider_gets_no_replay(self):
+        await BattleLog.objects.acreate(battle=self.battle, action_type="note", message="secret")
+        outsider = await get_user_model().objects.acreate_user("battle_outsider", "o@example.com", "pw")
+        _, connected, code = await self._connect(outsider)
+        self.assertFalse(connected)
+        self.assertEqual(code, 4404)
+
+        communicator, connected, _ = await self._connect(self.gm)
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())["type"], "replay")
+        await communicator.disconnect()
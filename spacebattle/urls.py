@@ -45,6 +45,21 @@ urlpatterns = [
         views.api_battle_simulate,
         name="api-battle-simulate",
     ),
+    path(
+        "api/spacebattle/battles/<int:pk>/simulate/jobs/",
+        views.api_battle_simulate_job,
+        name="api-battle-simulate-job",
+    ),
+    path(
+        "api/spacebattle/balance-lab/",
+        views.api_balance_lab,
+        name="api-balance-lab",
+    ),
+    path(
+        "api/spacebattle/simulation-jobs/<int:job_id>/",
+        views.api_simulation_job_detail,
+        name="api-simulation-job-detail",
+    ),
     path(
         "api/spacebattle/battles/<int:pk>/rollback/",
         views.api_battle_rollback,
@@ -18,15 +18,19 @@ import random
 
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 from django.views.decorators.http import require_GET, require_http_methods
 
+from exodus import dice as dice_engine
+
+from . import balance_lab, jobs as simulation_jobs
 from .models import (
     Battle, BattleLog, BattleMap, BattleParticipant, BattleTerrain,
-    TerrainTemplate,
+    SimulationJob, TerrainTemplate,
 )
+from .simulation import MAX_ITERATIONS as SIMULATE_MAX_ITERATIONS, battle_snapshot, simulate
 
 
 # ---------------------------------------------------------------------------
@@ -73,8 +77,8 @@ def _serialize_participant(p):
     ss = p.starship
     cls = ss.starship_class
     # Pull combat stats from the class — this is what the rules
-    # engine (and the simulator) actually uses. Computed per call
-    # so module edits propagate without manual cache busts.
+    # engine (and the simulator) actually uses. Memoized per class;
+    # the module / class editors invalidate it.
     from starships.views import compute_class_stats as _class_stats
     stats = _class_stats(cls)
     return {
@@ -683,7 +687,7 @@ def _roll_initiative_for_all(battle, rng):
     results = []
     for p in parts:
         bonus = p.starship.starship_class.ship_type.initiative_bonus
-        roll = rng.randint(1, 10)
+        roll = dice_engine.d10(rng)
         total = roll + bonus
         p.initiative_roll = roll
         p.initiative_result = total
@@ -849,9 +853,11 @@ def api_battle_simulate(request, pk):
 
     Uses a lightweight toy combat model so GMs can test class
     balance before the real rules engine ships. Every iteration
-    rolls initiative, runs scripted actions once, then lets each
-    active participant deal dice-pool damage to the nearest enemy
-    until one side is wiped or max_rounds is hit.
+    rolls initiative, then lets each active participant deal
+    dice-pool damage to the nearest enemy until one side is wiped
+    or max_rounds is hit. All iterations run as one batched array
+    simulation (``spacebattle.simulation``), so 100k+ iterations fit
+    in a request; ``player_win_rate_ci95`` is the Wilson interval.
     """
     battle = get_object_or_404(Battle, pk=pk)
     if not _can_view_battle(request.user, battle):
@@ -859,140 +865,120 @@ def api_battle_simulate(request, pk):
 
     try:
         body = json.loads(request.body)
+        iterations = max(1, min(SIMULATE_MAX_ITERATIONS, int(body.get("iterations", 100))))
+        max_rounds = max(1, min(100, int(body.get("max_rounds", 30))))
+        seed = body.get("seed")
+        if seed is not None:
+            seed = int(seed)
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "iterations, max_rounds and seed must be integers"}, status=400)
+    if seed is not None and not 0 <= seed < 2 ** 63:
+        return JsonResponse({"error": "seed must be a non-negative 64-bit integer"}, status=400)
 
-    iterations = max(1, min(2000, int(body.get("iterations", 100))))
-    max_rounds = max(1, min(100, int(body.get("max_rounds", 30))))
-    seed = body.get("seed")
-    master_rng = random.Random(seed) if seed is not None else random.Random()
+    snapshot = battle_snapshot(battle)
+    if not snapshot:
+        return JsonResponse({"error": "no participants to simulate"}, status=400)
 
-    # Snapshot participant stats, pulling combat values from
-    # compute_class_stats so every module's delta is respected.
-    from starships.views import compute_class_stats as _class_stats
-    snapshot = []
-    parts = battle.participants.select_related(
-        "starship__starship_class__ship_type",
-    ).all()
-    for p in parts:
-        stats = _class_stats(p.starship.starship_class)
-        snapshot.append({
-            "id": p.id,
-            "side": p.side,
-            "name": p.starship.name,
-            "type_key": p.starship.starship_class.ship_type.key,
-            "size": p.starship.starship_class.size,
-            "q": p.q, "r": p.r,
-            # Combat stats — straight from the stats bundle.
-            "health_max": stats["health"],
-            "health": stats["health"],
-            "speed": stats["speed"],
-            "defense": stats["defense"],
-            "armor": stats["armor"],
-            "initiative_bonus": stats["initiative_bonus"],
-            # Attack dice pool: hull size + 2. A drone gets 3,
-            # a titan gets ~12. Tuneable here, retune as rules evolve.
-            "dice": max(1, p.starship.starship_class.size + 2),
-        })
+    return JsonResponse(simulate(snapshot, iterations, max_rounds=max_rounds, seed=seed))
+
+
+@login_required
+@require_http_methods(["POST"])
+def api_battle_simulate_job(request, pk):
+    """Queue a large balance simulation as a background ``SimulationJob``.
+
+    Body: { iterations: int, seed: int?, max_rounds: int? }
+
+    GM-only. Takes the same parameters as ``api_battle_simulate`` with a
+    much higher iteration cap; the participants are snapshotted now and
+    the run is sharded across the local process pool
+    (``spacebattle.jobs``). Returns 202 with the job; poll
+    ``api_simulation_job_detail`` or listen for ``simulation_progress`` /
+    ``simulation_done`` on the battle socket.
+    """
+    battle = get_object_or_404(Battle, pk=pk)
+    if not _can_edit_battle(request.user, battle):
+        return HttpResponseForbidden("GM only")
+
+    try:
+        body = json.loads(request.body or "{}")
+        iterations = max(1, min(simulation_jobs.MAX_ITERATIONS, int(body.get("iterations", 100_000))))
+        max_rounds = max(1, min(100, int(body.get("max_rounds", 30))))
+        seed = body.get("seed")
+        if seed is not None:
+            seed = int(seed)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "iterations, max_rounds and seed must be integers"}, status=400)
+    if seed is not None and not 0 <= seed < 2 ** 63:
+        return JsonResponse({"error": "seed must be a non-negative 64-bit integer"}, status=400)
 
+    snapshot = battle_snapshot(battle)
     if not snapshot:
         return JsonResponse({"error": "no participants to simulate"}, status=400)
 
-    results = {
-        "iterations": iterations,
-        "player_wins": 0,
-        "enemy_wins": 0,
-        "draws": 0,
-        "total_rounds": 0,
-        "avg_player_health_remaining": 0.0,
-        "avg_enemy_health_remaining": 0.0,
-        "avg_player_survivors": 0.0,
-        "avg_enemy_survivors": 0.0,
-    }
-
-    def _sim_once(rng):
-        """One fight to the death using the real stats.
-
-        Each round every alive unit rolls initiative (d10 + bonus),
-        acts in descending order, fires its dice pool at the nearest
-        enemy. Successes minus the target's defense become raw hits;
-        damage is max(0, hits - target.armor). Damage reduces health
-        until it hits zero and the unit drops out.
-        """
-        units = [dict(u) for u in snapshot]
-        for rnd in range(max_rounds):
-            for u in units:
-                u["init"] = rng.randint(1, 10) + u["initiative_bonus"]
-            units.sort(key=lambda u: (-u["init"], u["size"]))
-            for u in units:
-                if u["health"] <= 0 or u["side"] == "neutral":
-                    continue
-                enemies = [
-                    e for e in units
-                    if e["health"] > 0
-                    and e["side"] != u["side"]
-                    and e["side"] != "neutral"
-                ]
-                if not enemies:
-                    continue
-                enemies.sort(key=lambda e: _hex_distance(u["q"], u["r"], e["q"], e["r"]))
-                target = enemies[0]
-                successes = sum(1 for _ in range(u["dice"]) if rng.randint(1, 10) >= 8)
-                hits = max(0, successes - target["defense"])
-                damage = max(0, hits - target["armor"])
-                target["health"] = max(0, target["health"] - damage)
-            player_alive = any(u["side"] == "players" and u["health"] > 0 for u in units)
-            enemy_alive = any(u["side"] == "enemies" and u["health"] > 0 for u in units)
-            if player_alive and not enemy_alive:
-                return "players", rnd + 1, units
-            if enemy_alive and not player_alive:
-                return "enemies", rnd + 1, units
-            if not player_alive and not enemy_alive:
-                return "draw", rnd + 1, units
-        return "draw", max_rounds, units
-
-    player_hp_frac_sum = 0.0
-    enemy_hp_frac_sum = 0.0
-    player_survivor_sum = 0
-    enemy_survivor_sum = 0
-    player_count = 0
-    enemy_count = 0
-    for _ in range(iterations):
-        iter_seed = master_rng.randint(0, 2**31 - 1)
-        rng = random.Random(iter_seed)
-        outcome, rounds_used, units = _sim_once(rng)
-        results["total_rounds"] += rounds_used
-        if outcome == "players":
-            results["player_wins"] += 1
-        elif outcome == "enemies":
-            results["enemy_wins"] += 1
-        else:
-            results["draws"] += 1
-        for u in units:
-            if u["side"] == "players":
-                player_count += 1
-                player_hp_frac_sum += u["health"] / max(1, u["health_max"])
-                if u["health"] > 0:
-                    player_survivor_sum += 1
-            elif u["side"] == "enemies":
-                enemy_count += 1
-                enemy_hp_frac_sum += u["health"] / max(1, u["health_max"])
-                if u["health"] > 0:
-                    enemy_survivor_sum += 1
-
-    # Percentage hull remaining across all sims
-    results["avg_player_health_remaining"] = (
-        100.0 * player_hp_frac_sum / max(1, player_count)
-    )
-    results["avg_enemy_health_remaining"] = (
-        100.0 * enemy_hp_frac_sum / max(1, enemy_count)
+    job = SimulationJob.objects.create(
+        battle=battle,
+        created_by=request.user,
+        iterations=iterations,
+        max_rounds=max_rounds,
+        seed=seed,
+        snapshot=snapshot,
     )
-    results["avg_player_survivors"] = player_survivor_sum / iterations
-    results["avg_enemy_survivors"] = enemy_survivor_sum / iterations
-    results["avg_rounds"] = results["total_rounds"] / iterations
-    results["player_win_rate"] = results["player_wins"] / iterations
-    results["enemy_win_rate"] = results["enemy_wins"] / iterations
-    return JsonResponse(results)
+    simulation_jobs.submit(job)
+    return JsonResponse(simulation_jobs.serialize_job(job), status=202)
+
+
+@login_required
+@require_GET
+def api_simulation_job_detail(request, job_id):
+    """Status, progress and (once ``done``) the result of a simulation job."""
+    job = get_object_or_404(SimulationJob.objects.select_related("battle"), pk=job_id)
+    if not _can_view_battle(request.user, job.battle):
+        return JsonResponse({"error": "Not visible"}, status=404)
+    return JsonResponse(simulation_jobs.serialize_job(job))
+
+
+@login_required
+@require_http_methods(["POST"])
+def api_balance_lab(request):
+    """Evaluate a parameter grid (``spacebattle.balance_lab``) in one call.
+
+    GM-only. Body is the grid spec — ``fleet`` (class sizes / module
+    loadouts), ``cyber`` (attacker Int / Computer vs defender pools) and
+    ``bases`` (facility mixes) sections plus an optional ``seed``. Cells
+    run on the simulation-job process pool. ``?format=csv`` returns the
+    rows as a CSV download; the default is ``{rows, stats}`` JSON.
+
+    The sweep runs inside the request, so grids are held to
+    ``balance_lab.HTTP_LIMITS``; a bigger one is a 400 pointing at the
+    ``balance_lab`` management command.
+    """
+    if not (request.user.is_superuser or request.user.is_staff):
+        return HttpResponseForbidden("GM only")
+    try:
+        spec = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    try:
+        result = balance_lab.run_sweep(
+            spec, pool=simulation_jobs.get_pool(), limits=balance_lab.HTTP_LIMITS,
+        )
+    except balance_lab.SweepTooLarge as exc:
+        return JsonResponse({
+            "error": f"{exc}. Run larger sweeps with `manage.py balance_lab`.",
+        }, status=400)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    if request.GET.get("format") == "csv":
+        response = HttpResponse(balance_lab.to_csv(result["rows"]), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="balance-lab.csv"'
+        return response
+    return JsonResponse(result)
 
 
 # ---------------------------------------------------------------------------
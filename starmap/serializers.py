@@ -1,5 +1,6 @@
 """Serializers for the starmap application."""
 
+from exodus import dice as dice_engine
 
 # Scan level thresholds: successes needed to reach each level (LEGACY — the
 # active system uses the difficulty-target + uncertainty model below).
@@ -43,7 +44,8 @@ def list_agency_observatories(agency):
     """One scannable observatory per base that has an Observatory facility.
     A base's stacked observatory (Ground Telescope + Deep-Space Tracking) is a
     single observatory whose dice come from its highest observatory level.
-    Returns [{baseId, baseName, level, dice}]."""
+    Returns [{baseId, baseName, level, dice, odds}]; ``odds`` previews the
+    roll ``api_observatory_scan`` makes (10-again, no chance die)."""
     out = []
     for base in agency.bases.all():
         levels = [int(f.get("level", 0) or 0) for f in (base.facilities or [])
@@ -51,11 +53,13 @@ def list_agency_observatories(agency):
         if not levels:
             continue
         lvl = max(levels)
+        dice = observatory_dice(lvl)
         out.append({
             "baseId": base.id,
             "baseName": base.name,
             "level": lvl,
-            "dice": observatory_dice(lvl),
+            "dice": dice,
+            "odds": dice_engine.odds(dice, chance_die=False),
         })
     return out
 
@@ -131,10 +135,18 @@ def _serialize_resources_gm(resources, rt_map):
     return out
 
 
-def serialize_star_system(star, agency=None, user=None, agency_scans=None, resource_types=None):
-    """Serialize a StarSystem. Scan data included per agency."""
+def serialize_star_system(star, agency=None, user=None, agency_scans=None, resource_types=None,
+                          claim_names=None, scan_target=None):
+    """Serialize a StarSystem. Scan data included per agency.
+
+    The optional lookups let list callers batch the per-star queries:
+    ``resource_types`` ({key: ResourceType}), ``agency_scans``
+    ({star_id: AgencyScan}), ``claim_names`` ({agency_id: name}) and a
+    precomputed ``scan_target``. See ``serialize_star_systems``.
+    """
     is_gm = user and user.is_superuser
-    rt_map = resource_types if resource_types is not None else _resource_type_map()
+    if scan_target is None:
+        scan_target = base_scan_target(star)
 
     data = {
         "id": star.id,
@@ -147,18 +159,23 @@ def serialize_star_system(star, agency=None, user=None, agency_scans=None, resou
         "isSol": star.is_sol,
         "isEndgame": star.is_endgame,
         "discovered": star.discovered,
-        "scanTarget": base_scan_target(star),
+        "scanTarget": scan_target,
     }
 
     # Claim info — visible to all
     if star.claimed_by_id:
+        if claim_names is not None:
+            claim_name = claim_names.get(star.claimed_by_id)
+        else:
+            claim_name = star.claimed_by.name if star.claimed_by else None
         data["claimedBy"] = {
             "agencyId": star.claimed_by_id,
-            "agencyName": star.claimed_by.name if star.claimed_by else None,
+            "agencyName": claim_name,
         }
 
     # GM sees ground truth (incl. the single-source-of-truth star-intel fields)
     if is_gm:
+        rt_map = resource_types if resource_types is not None else _resource_type_map()
         data["scanLevelTruth"] = star.scan_level_truth
         data["resources"] = _serialize_resources_gm(star.resources or {}, rt_map)
         data["planets"] = star.planets
@@ -173,7 +190,7 @@ def serialize_star_system(star, agency=None, user=None, agency_scans=None, resou
         scan = star.agency_scans.filter(agency=agency).first()
 
     if scan and scan.current_successes > 0:
-        target = scan.required_successes or base_scan_target(star)
+        target = scan.required_successes or scan_target
         uncertainty = scan_uncertainty(scan.current_successes, target)
         data["scanAccumulated"] = scan.current_successes
         data["scanTarget"] = target
@@ -189,6 +206,44 @@ def serialize_star_system(star, agency=None, user=None, agency_scans=None, resou
     return data
 
 
+def serialize_star_systems(stars, agency=None, user=None):
+    """Serialize a whole star list with a fixed number of queries.
+
+    One ``ResourceType`` load (GM only — players never see the ground-truth
+    table), one ``AgencyScan`` load for ``agency``, one name lookup for the
+    claiming agencies and the star rows themselves, however many systems
+    the galaxy holds.
+    """
+    from agencies.models import Agency
+    from .models import AgencyScan
+
+    stars = list(stars)
+    is_gm = user and user.is_superuser
+    rt_map = _resource_type_map() if is_gm else {}
+
+    agency_scans = {}
+    if agency:
+        agency_scans = {
+            s.star_system_id: s
+            for s in AgencyScan.objects.filter(agency=agency, scan_level__gt=0)
+        }
+
+    claimed_ids = {star.claimed_by_id for star in stars if star.claimed_by_id}
+    claim_names = (
+        dict(Agency.objects.filter(pk__in=claimed_ids).values_list("id", "name"))
+        if claimed_ids else {}
+    )
+
+    return [
+        serialize_star_system(
+            star, agency=agency, user=user, agency_scans=agency_scans,
+            resource_types=rt_map, claim_names=claim_names,
+            scan_target=base_scan_target(star),
+        )
+        for star in stars
+    ]
+
+
 def serialize_agency_scan(scan):
     """Serialize an AgencyScan for the agency's scan project list."""
     target = scan.required_successes or (base_scan_target(scan.star_system) if scan.star_system else SCAN_BASE_DIFFICULTY)
@@ -8,12 +8,15 @@ and the one-scan-per-observatory-per-turn rule.
 import json
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from agencies.models import Agency, Base
 from characters.models import Character
+from exodus import dice as dice_engine
 from exodus.models import SiteSettings
-from starmap.models import AgencyScan, PublicScanRecord, StarSystem
+from starmap.models import AgencyScan, PublicScanRecord, ResourceType, StarSystem
 from starmap.serializers import (
     base_scan_target, effective_scan_target, list_agency_observatories,
     observatory_dice, scan_uncertainty,
@@ -88,6 +91,10 @@ class ObservatoryScanTests(TestCase):
         self.assertEqual(len(obs), 1)
         self.assertEqual(obs[0]["dice"], 15)  # level 2 = 15 dice
         self.assertEqual(obs[0]["baseId"], self.base.id)
+        self.assertEqual(
+            obs[0]["odds"]["at_least_5"],
+            round(dice_engine.p_at_least(5, 15, chance_die=False), 4),
+        )
 
     def test_scan_accumulates_and_sets_target(self):
         r = self._scan()
@@ -375,3 +382,150 @@ class StarIntelApiTests(TestCase):
     def test_non_superuser_forbidden(self):
         c = Client(); c.force_login(self.player)
         self.assertEqual(c.get("/api/starmap/star-intel/").status_code, 403)
+
+
+class StarSystemListQueryTests(TestCase):
+    """``api_star_systems`` must not scale its query count with the galaxy:
+    one ResourceType load, one scan load and one claim-name lookup in total,
+    not per system."""
+
+    GALAXY = 3000
+
+    def setUp(self):
+        User = get_user_model()
+        self.gm = User.objects.create_superuser("gm7", "gm7@example.com", "pw")
+        self.user = User.objects.create_user("pilot", "pilot@example.com", "pw")
+        char = Character.objects.create(owner=self.user, name="Navigator")
+        self.agency = Agency.objects.create(name="Claim Agency", is_player_agency=True)
+        Base.objects.create(
+            agency=self.agency, name="HQ",
+            workspaces=[{"assignedType": "character", "assignedTo": char.id}],
+        )
+        ResourceType.objects.get_or_create(key="helium3", defaults={"name": "Helium-3"})
+
+    def _seed(self, count):
+        StarSystem.objects.bulk_create([
+            StarSystem(
+                name=f"Q-{i:05d}", x=i, y=0, z=0, distance=1 + i,
+                spectral_type="K", resources={"helium3": i % 100},
+                claimed_by=self.agency if i % 7 == 0 else None,
+            )
+            for i in range(StarSystem.objects.count(), count)
+        ])
+        AgencyScan.objects.bulk_create([
+            AgencyScan(agency=self.agency, star_system=star, scan_level=1,
+                       current_successes=5, required_successes=15)
+            for star in StarSystem.objects.filter(agency_scans__isnull=True)[:10]
+        ])
+
+    def _count(self, client):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get("/api/starmap/systems/")
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp.json()
+
+    def _assert_flat(self, user):
+        client = Client()
+        client.force_login(user)
+        self._seed(10)
+        client.get("/api/starmap/systems/")  # warm-up: profile rows, settings cache
+        small, _ = self._count(client)
+        self._seed(self.GALAXY)
+        large, data = self._count(client)
+        self.assertEqual(len(data), self.GALAXY)
+        self.assertEqual(large, small)
+        return data
+
+    def test_player_list_query_count_is_flat(self):
+        data = self._assert_flat(self.user)
+        claimed = next(s for s in data if "claimedBy" in s)
+        self.assertEqual(claimed["claimedBy"]["agencyName"], "Claim Agency")
+        scanned = [s for s in data if "scanAccumulated" in s]
+        self.assertEqual(len(scanned), 20)
+        self.assertEqual(scanned[0]["scanUncertainty"], 250)
+        self.assertNotIn("resources", data[0])
+
+    def test_gm_list_query_count_is_flat(self):
+        data = self._assert_flat(self.gm)
+        self.assertIn("helium3", data[0]["resources"])
+
+
+class StarSystemListETagTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("etag", "etag@example.com", "pw")
+        char = Character.objects.create(owner=self.user, name="Cartographer")
+        self.agency = Agency.objects.create(name="Etag Agency", is_player_agency=True)
+        Base.objects.create(
+            agency=self.agency, name="HQ",
+            workspaces=[{"assignedType": "character", "assignedTo": char.id}],
+        )
+        self.star = StarSystem.objects.create(
+            name="Etag Star", x=1, y=1, z=1, distance=3, spectral_type="G",
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _get(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get("/api/starmap/systems/", **headers)
+
+    def test_unchanged_map_is_304_without_serializing(self):
+        first = self._get()
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self._get(etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertFalse(any("starmap_starsystem" in q["sql"] and "UNION" not in q["sql"]
+                             for q in ctx.captured_queries))
+
+    def test_scan_and_claim_changes_bust_the_etag(self):
+        etag = self._get()["ETag"]
+
+        AgencyScan.objects.create(
+            agency=self.agency, star_system=self.star, scan_level=1,
+            current_successes=3, required_successes=15,
+        )
+        resp = self._get(etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()[0]["scanAccumulated"], 3)
+        etag = resp["ETag"]
+
+        self.star.claimed_by = self.agency
+        self.star.save()
+        resp = self._get(etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()[0]["claimedBy"]["agencyName"], "Etag Agency")
+        etag = resp["ETag"]
+
+        self.agency.name = "Renamed Agency"
+        self.agency.save()
+        resp = self._get(etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()[0]["claimedBy"]["agencyName"], "Renamed Agency")
+
+    def test_second_claim_by_the_same_agency_busts_the_etag(self):
+        other = StarSystem.objects.create(
+            name="Etag Second", x=2, y=2, z=2, distance=4, spectral_type="K",
+        )
+        for star in (self.star, other):
+            AgencyScan.objects.create(agency=self.agency, star_system=star, scan_level=1)
+
+        def claim(star):
+            resp = self.client.post(
+                f"/api/starmap/systems/{star.id}/claim/",
+                data=json.dumps({"agencyId": self.agency.id}),
+                content_type="application/json",
+            )
+            self.assertEqual(resp.status_code, 200)
+
+        claim(self.star)
+        etag = self._get()["ETag"]
+        claim(other)  # the claiming agency's row is unchanged
+        resp = self._get(etag)
+        self.assertEqual(resp.status_code, 200)
+        claimed = {s["name"]: s["claimedBy"] for s in resp.json()}
+        self.assertEqual(claimed["Etag Second"]["agencyName"], "Etag Agency")
@@ -9,11 +9,16 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+
+from exodus import dice as dice_engine
+from exodus.etags import make_etag, rows_digest, table_stamps
 
 from .models import StarSystem, AgencyScan, ScanRollLog
 from .serializers import (
     serialize_star_system,
+    serialize_star_systems,
     serialize_agency_scan,
     compute_scan_brackets,
     SCAN_THRESHOLDS,
@@ -21,16 +26,20 @@ from .serializers import (
 
 
 def _get_user_agency(user):
-    """Find the user's player agency via character workspace assignment."""
-    from agencies.models import Base
-    char_ids = set(user.characters.values_list("id", flat=True))
-    if not char_ids:
-        return None
-    for base in Base.objects.filter(agency__is_player_agency=True).select_related("agency"):
-        for ws in base.workspaces or []:
-            if ws.get("assignedType") == "character" and ws.get("assignedTo") in char_ids:
-                return base.agency
-    return None
+    """Find the user's player agency via character workspace assignment.
+
+    One indexed query on ``WorkspaceAssignment``, memoised on the user
+    object — ``request.user`` is rebuilt per request, so several permission
+    helpers in one view share a single lookup.
+    """
+    try:
+        return user._workspace_agency
+    except AttributeError:
+        pass
+    from agencies.models import WorkspaceAssignment
+    agency = WorkspaceAssignment.agency_for_user(user)
+    user._workspace_agency = agency
+    return agency
 
 
 # ---------------------------------------------------------------------------
@@ -77,7 +86,7 @@ def public_starmap_page(request):
     """Public star map — read-only shared map of the public star-intel record,
     with per-agency contribution filtering and NO jump-route planning."""
     from exodus.models import SiteSettings
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     if not request.user.is_staff and not settings_obj.show_public_star_map:
         from django.http import HttpResponseForbidden
         return HttpResponseForbidden("PUBLIC MAP ACCESS DISABLED")
@@ -93,7 +102,7 @@ def public_starmap_page(request):
 def starmap_page(request):
     """3D star map page. Visible to staff or when enabled in settings."""
     from exodus.models import SiteSettings
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     if not request.user.is_staff:
         if not settings_obj.show_star_map:
             from django.http import HttpResponseForbidden
@@ -110,28 +119,52 @@ def starmap_page(request):
 # Star system API
 # ---------------------------------------------------------------------------
 
+def _star_systems_etag(request):
+    """Version stamp for ``api_star_systems``: systems (claims live on the
+    row), the names of claiming agencies, the caller's scans and — for the
+    GM's ground-truth readout — the resource table. Two queries at most."""
+    from agencies.models import Agency
+    from .models import ResourceType
+
+    agency = _get_user_agency(request.user)
+    claimers = StarSystem.objects.filter(claimed_by__isnull=False).values("claimed_by")
+    sources = [
+        ("stars", StarSystem.objects.all(), "updated_at"),
+        ("claims", Agency.objects.filter(pk__in=claimers), "updated_at"),
+    ]
+    if agency:
+        sources.append((
+            "scans", AgencyScan.objects.filter(agency=agency, scan_level__gt=0),
+            "scanned_at", "current_successes",
+        ))
+    resources = None
+    if request.user.is_superuser:
+        resources = rows_digest(
+            ResourceType.objects.all(),
+            *[f.attname for f in ResourceType._meta.concrete_fields],
+        )
+    return make_etag(
+        "systems", request.user.is_superuser, agency.pk if agency else None,
+        table_stamps(sources), resources,
+    )
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
 @require_http_methods(["GET"])
+@condition(etag_func=_star_systems_etag)
 def api_star_systems(request):
-    """List all star systems with agency-filtered scan data."""
-    stars = StarSystem.objects.select_related("claimed_by").all()
+    """List all star systems with agency-filtered scan data.
 
-    agency = None
-    agency_scans = {}
-    if not request.user.is_superuser:
-        agency = _get_user_agency(request.user)
-    else:
-        # GM: show all, but also load player agency scans for context
-        agency = _get_user_agency(request.user)
-
-    if agency:
-        scans = AgencyScan.objects.filter(agency=agency, scan_level__gt=0)
-        agency_scans = {s.star_system_id: s for s in scans}
-
-    data = [
-        serialize_star_system(star, agency=agency, user=request.user, agency_scans=agency_scans)
-        for star in stars
-    ]
+    Query count is independent of the number of systems; see
+    ``serialize_star_systems``. Carries a strong ETag, so an unchanged map
+    answers ``If-None-Match`` with a 304 and no serialization at all.
+    """
+    # GM also gets their own agency's scans (if any) for context.
+    agency = _get_user_agency(request.user)
+    data = serialize_star_systems(
+        StarSystem.objects.all(), agency=agency, user=request.user,
+    )
     return JsonResponse(data, safe=False)
 
 
@@ -391,19 +424,9 @@ def api_scan_roll(request, pk, scan_id):
     pool = max(pool, 1)
 
     # Roll dice (WoD: d10, 8+ success, 10 explodes)
-    successes = 0
-    rolls = []
-    dice_left = pool
-    while dice_left > 0:
-        explosions = 0
-        for _ in range(dice_left):
-            die = random.randint(1, 10)
-            rolls.append(die)
-            if die >= 8:
-                successes += 1
-            if die >= 10:
-                explosions += 1
-        dice_left = explosions
+    result = dice_engine.roll(pool, chance_die=False)
+    successes = result.successes
+    rolls = result.faces
 
     # Accumulate successes
     old_level = scan.scan_level
@@ -533,19 +556,9 @@ def api_observatory_scan(request, pk):
 
     # Roll the observatory's dice — WoD d10, 8+ success, 10 explodes.
     pool = int(obs["dice"])
-    successes = 0
-    rolls = []
-    dice_left = pool
-    while dice_left > 0:
-        explosions = 0
-        for _ in range(dice_left):
-            die = random.randint(1, 10)
-            rolls.append(die)
-            if die >= 8:
-                successes += 1
-            if die >= 10:
-                explosions += 1
-        dice_left = explosions
+    result = dice_engine.roll(pool, chance_die=False)
+    successes = result.successes
+    rolls = result.faces
 
     char = Character.objects.filter(owner=request.user).first()
     char_name = char.name if char else "GM"
@@ -570,7 +583,7 @@ def api_observatory_scan(request, pk):
         # First scan discovers the system (satisfies "scanned at least once").
         if not star.discovered:
             star.discovered = True
-            star.save(update_fields=["discovered"])
+            star.save(update_fields=["discovered", "updated_at"])
 
         usage[str(base_id)] = used + 1
         agency.scan_usage = usage
@@ -749,7 +762,7 @@ def api_claim_system(request, pk):
 
     star.claimed_by = agency
     star.claimed_at = timezone.now()
-    star.save(update_fields=["claimed_by", "claimed_at"])
+    star.save(update_fields=["claimed_by", "claimed_at", "updated_at"])
 
     return JsonResponse(serialize_star_system(star, user=request.user))
 
@@ -791,7 +804,7 @@ def api_extract_resource(request, pk):
     if not request.user.is_superuser and _get_user_agency(request.user) != agency:
         return JsonResponse({"error": "Permission denied"}, status=403)
 
-    cfg = SiteSettings.load().get_jump_economy()
+    cfg = SiteSettings.for_request(request).get_jump_economy()
     fuel_keys = cfg.get("fuel_keys") or []
     spares_keys = cfg.get("spares_keys") or []
     if resource_key in fuel_keys:
@@ -825,7 +838,9 @@ def api_extract_resource(request, pk):
         resources[resource_key] = available - moved
         star.resources = resources
         star.save(update_fields=["resources", "updated_at"])
-        Agency.objects.filter(pk=agency.id).update(**{pool: F(pool) + moved})
+        Agency.objects.filter(pk=agency.id).update(
+            **{pool: F(pool) + moved}, updated_at=timezone.now(),
+        )
         agency.refresh_from_db(fields=["ftl_fuel", "ftl_spares"])
         JumpLog.objects.create(
             agency=agency, kind="extract",
@@ -1015,7 +1030,7 @@ def api_seed_systems(request):
             hi = max(lo, round(rt.typical_max * factor))
             resources[rt.key] = random.randint(lo, hi)
         star.resources = resources
-        star.save(update_fields=["resources"])
+        star.save(update_fields=["resources", "updated_at"])
 
         spectral_first = star.spectral_type[0].upper() if star.spectral_type else "M"
         planet_type_weights = PLANET_TYPES_BY_SPECTRAL.get(spectral_first, PLANET_TYPES_BY_SPECTRAL["M"])
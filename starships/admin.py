@@ -14,10 +14,27 @@ from .models import (
     Starship,
     StarshipClass,
 )
+from .views import class_stats_changed
+
+
+class ClassStatsAdminMixin:
+    """Edits to these rows change derived class stats; drop the memo."""
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        class_stats_changed()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        class_stats_changed()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        class_stats_changed()
 
 
 @admin.register(ShipType)
-class ShipTypeAdmin(admin.ModelAdmin):
+class ShipTypeAdmin(ClassStatsAdminMixin, admin.ModelAdmin):
     list_display = [
         "name", "key", "default_slot_budget",
         "min_size", "max_size", "base_crew", "order",
@@ -27,7 +44,7 @@ class ShipTypeAdmin(admin.ModelAdmin):
 
 
 @admin.register(ShipModule)
-class ShipModuleAdmin(admin.ModelAdmin):
+class ShipModuleAdmin(ClassStatsAdminMixin, admin.ModelAdmin):
     list_display = [
         "name", "category", "slot_cost",
         "crew_delta", "energy_delta", "maintenance_delta",
@@ -44,7 +61,7 @@ class ClassModuleInline(admin.TabularInline):
 
 
 @admin.register(StarshipClass)
-class StarshipClassAdmin(admin.ModelAdmin):
+class StarshipClassAdmin(ClassStatsAdminMixin, admin.ModelAdmin):
     list_display = [
         "name", "ship_type", "size", "created_by",
         "is_locked", "build_cost_xp", "build_required_successes",
@@ -8,13 +8,16 @@ logic of api_ship_jump and api_ship_resupply.
 import json
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 
 from agencies.models import Agency
 from exodus.models import SiteSettings
-from starmap.models import StarSystem
+from starmap.models import AgencyScan, StarSystem
 from starships.models import (
     ClassModule,
+    Fleet,
     JumpLog,
     ShipModule,
     ShipModuleSection,
@@ -22,6 +25,7 @@ from starships.models import (
     Starship,
     StarshipClass,
 )
+from starships.views import compute_class_stats, invalidate_class_stats
 
 
 class JumpMechanicTests(TestCase):
@@ -321,3 +325,141 @@ class JumpFuelEconomyTests(TestCase):
         self.assertEqual(r.json()["pool"], "ftl_spares")
         self.agency.refresh_from_db()
         self.assertEqual(self.agency.ftl_spares, 20)  # 10 + 10
+
+
+class ClassStatsMemoTests(TransactionTestCase):
+    """``compute_class_stats`` is memoized per class outside transactions
+    (so these run as ``TransactionTestCase``) and dropped by the editors."""
+
+    def setUp(self):
+        User = get_user_model()
+        gm = User.objects.create_superuser("memo_gm", "gm@example.com", "pw")
+        self.client = Client()
+        self.client.force_login(gm)
+        SiteSettings.load()
+        invalidate_class_stats()
+        self.stype = ShipType.objects.create(
+            key="memo_frigate", name="Frigate", base_speed=2, min_size=1, max_size=10,
+        )
+        self.engine = ShipModule.objects.create(key="memo_engine", name="Engine", speed_delta=1)
+        self.cls = StarshipClass.objects.create(name="Memo", ship_type=self.stype, size=3)
+        ClassModule.objects.create(starship_class=self.cls, module=self.engine, quantity=1)
+
+    def test_repeat_calls_reuse_the_bundle(self):
+        first = compute_class_stats(self.cls)
+        with CaptureQueriesContext(connection) as ctx:
+            again = compute_class_stats(StarshipClass.objects.get(pk=self.cls.pk))
+        self.assertEqual(len(ctx.captured_queries), 1)  # the class row itself
+        self.assertEqual(again, first)
+        again["warnings"].append("mine")
+        self.assertNotIn("mine", compute_class_stats(self.cls)["warnings"])
+
+        # An unsaved size variant never hits the saved class's entry.
+        self.cls.size = 7
+        self.assertEqual(compute_class_stats(self.cls)["size"], 7)
+
+    def test_module_and_catalogue_edits_invalidate(self):
+        self.assertEqual(compute_class_stats(self.cls)["speed"], 3)
+
+        resp = self.client.post(
+            f"/api/starships/classes/{self.cls.pk}/modules/",
+            data=json.dumps({"module_id": self.engine.pk}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(compute_class_stats(self.cls)["speed"], 4)
+
+        resp = self.client.put(
+            f"/api/starships/modules/{self.engine.pk}/",
+            data=json.dumps({"speed_delta": 3}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(compute_class_stats(self.cls)["speed"], 8)
+
+        resp = self.client.put(
+            f"/api/starships/ship-types/{self.stype.pk}/",
+            data=json.dumps({"base_speed": 0}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        fresh = StarshipClass.objects.get(pk=self.cls.pk)
+        self.assertEqual(compute_class_stats(fresh)["speed"], 6)
+
+
+class ShipListQueryTests(TestCase):
+    """``GET /api/starships/ships/`` and the fleet detail serialize their
+    ships in a fixed number of queries, however large the navy."""
+
+    def setUp(self):
+        User = get_user_model()
+        gm = User.objects.create_superuser("navy_gm", "gm@example.com", "pw")
+        self.client = Client()
+        self.client.force_login(gm)
+
+        s = SiteSettings.load()
+        s.jump_economy_config = {
+            "fuel_keys": ["helium3"], "spares_keys": ["metals"], "extract_scan_level": 2,
+        }
+        s.save()
+
+        self.agencies = [Agency.objects.create(name=f"Navy {i}") for i in range(2)]
+        stype = ShipType.objects.create(key="navy_hull", name="Hull", min_size=1, max_size=10)
+        module = ShipModule.objects.create(key="navy_ftl", name="FTL", provides_ftl=True)
+        self.classes = []
+        for size in (2, 4):
+            cls = StarshipClass.objects.create(name=f"Navy {size}", ship_type=stype, size=size)
+            ClassModule.objects.create(starship_class=cls, module=module, quantity=1)
+            self.classes.append(cls)
+        self.systems = []
+        for i, agency in enumerate(self.agencies):
+            system = StarSystem.objects.create(
+                name=f"Navy Home {i}", x=i, y=0, z=0, distance=i, spectral_type="G2V",
+                claimed_by=agency, resources={"helium3": 40 + i, "metals": 0},
+            )
+            self.systems.append(system)
+        # Only the first navy has scanned its home system deep enough.
+        AgencyScan.objects.create(agency=self.agencies[0], star_system=self.systems[0], scan_level=2)
+        AgencyScan.objects.create(agency=self.agencies[1], star_system=self.systems[1], scan_level=1)
+        self.fleet = Fleet.objects.create(name="Home Fleet", agency=self.agencies[0])
+        self.count = 0
+
+    def _add_ships(self, per_agency):
+        for i, agency in enumerate(self.agencies):
+            for _ in range(per_agency):
+                self.count += 1
+                Starship.objects.create(
+                    name=f"Hull {self.count}", starship_class=self.classes[self.count % 2],
+                    agency=agency, location=self.systems[i], status="active",
+                    fleet=self.fleet if i == 0 else None,
+                )
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_ship_list_query_count_is_flat(self):
+        self._add_ships(2)
+        self._get("/api/starships/ships/")  # warm the per-process caches
+        few, _ = self._get("/api/starships/ships/")
+        self._add_ships(15)
+        many, ships = self._get("/api/starships/ships/")
+        self.assertEqual(few, many)
+        self.assertEqual(len(ships), 34)
+        by_agency = {s["agency_id"]: s["extractable"] for s in ships}
+        self.assertEqual(by_agency[self.agencies[0].id], {"helium3": 40})
+        self.assertEqual(by_agency[self.agencies[1].id], {})
+        self.assertTrue(all(s["has_ftl"] for s in ships))
+
+    def test_fleet_detail_query_count_is_flat(self):
+        url = f"/api/starships/fleets/{self.fleet.id}/"
+        self._add_ships(2)
+        self._get(url)
+        few, _ = self._get(url)
+        self._add_ships(15)
+        many, fleet = self._get(url)
+        self.assertEqual(few, many)
+        self.assertEqual(fleet["ship_count"], 17)
+        self.assertEqual(fleet["ships"][0]["extractable"], {"helium3": 40})
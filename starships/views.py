@@ -5,9 +5,15 @@ Release C adds the StarshipClass editor: class CRUD, module install
 endpoints, derived-stat computation, and the /starships/ page view.
 """
 
+import copy
 import json
+import threading
+from collections import OrderedDict
 
 from django.contrib.auth.decorators import login_required
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.db.models.signals import post_migrate
 from django.http import HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.views.decorators.http import require_GET, require_http_methods
@@ -180,6 +186,7 @@ def api_ship_type_detail(request, pk):
     t = get_object_or_404(ShipType, pk=pk)
     if request.method == "DELETE":
         t.delete()
+        class_stats_changed()
         return JsonResponse({"ok": True})
 
     try:
@@ -194,6 +201,7 @@ def api_ship_type_detail(request, pk):
     if err:
         return err
     t.save()
+    class_stats_changed()
     return JsonResponse(_serialize_ship_type(t))
 
 
@@ -254,6 +262,7 @@ def api_ship_module_detail(request, pk):
     m = get_object_or_404(ShipModule, pk=pk)
     if request.method == "DELETE":
         m.delete()
+        class_stats_changed()
         return JsonResponse({"ok": True})
 
     try:
@@ -290,6 +299,7 @@ def api_ship_module_detail(request, pk):
     if err:
         return err
     m.save()
+    class_stats_changed()
     return JsonResponse(_serialize_ship_module(m))
 
 
@@ -331,6 +341,7 @@ def api_ship_module_section_detail(request, pk):
     section = get_object_or_404(ShipModuleSection, pk=pk)
     if request.method == "DELETE":
         section.delete()
+        class_stats_changed()
         return JsonResponse({"ok": True})
     try:
         body = json.loads(request.body)
@@ -345,6 +356,7 @@ def api_ship_module_section_detail(request, pk):
         except (TypeError, ValueError):
             return JsonResponse({"error": "order must be an integer"}, status=400)
     section.save()
+    class_stats_changed()
     return JsonResponse(_serialize_ship_module_section(section))
 
 
@@ -387,21 +399,87 @@ def _can_edit_class(user, cls):
     return agency is not None and agency.id == cls.created_by_id
 
 
-def compute_class_stats(cls):
+# Process-wide LRU of ``compute_class_stats`` results for installed
+# loadouts. Keyed on the class row (id, ``updated_at`` and the fields the
+# stats read, so an in-memory variant never hits its saved class's entry),
+# the slot-budget setting and the module-set generation, which
+# ``invalidate_class_stats`` bumps whenever a class's modules or the
+# ShipType / ShipModule / section catalogues change.
+CLASS_STATS_CACHE_SIZE = 1024
+_CLASS_STATS_CACHE = OrderedDict()
+_CLASS_STATS_STATE = {"generation": 0}
+_CLASS_STATS_LOCK = threading.Lock()
+
+
+def invalidate_class_stats(**kwargs):
+    """Drop every memoized class stat bundle. Accepts signal kwargs."""
+    with _CLASS_STATS_LOCK:
+        _CLASS_STATS_CACHE.clear()
+        _CLASS_STATS_STATE["generation"] += 1
+
+
+def class_stats_changed():
+    """Invalidate now, and again once the write is visible to other
+    connections — a reader that raced the commit can't pin the old
+    loadout (the same dance as ``SiteSettings.save``)."""
+    invalidate_class_stats()
+    transaction.on_commit(invalidate_class_stats)
+
+
+# ``flush`` (TransactionTestCase teardown) and ``migrate`` rewrite the
+# tables without going through the editors.
+post_migrate.connect(
+    invalidate_class_stats,
+    dispatch_uid="starships.class_stats.invalidate",
+)
+
+
+def compute_class_stats(cls, class_modules=None):
     """Compute derived stats + warnings for a StarshipClass.
 
     Everything is summed off the installed ClassModules so the UI can
     show live totals without duplicating logic in JavaScript.
+    ``class_modules`` overrides the installed loadout with any iterable
+    of (possibly unsaved) ``ClassModule`` rows — the balance lab uses it
+    to price hypothetical loadouts without touching the class.
+
+    Installed-loadout results are memoized (see ``_CLASS_STATS_CACHE``);
+    callers get their own copy. Inside an open transaction the memo is
+    bypassed, as the loadout being read could still roll back.
     """
     from exodus.models import SiteSettings
-    enforce = SiteSettings.load().enforce_ship_slot_budget
+    enforce = SiteSettings.cached().enforce_ship_slot_budget
+
+    if class_modules is not None or cls.pk is None or connection.in_atomic_block:
+        return _compute_class_stats(cls, class_modules, enforce)
 
+    with _CLASS_STATS_LOCK:
+        key = (
+            cls.pk, cls.updated_at, cls.ship_type_id, cls.size, cls.build_cost_xp,
+            enforce, _CLASS_STATS_STATE["generation"],
+        )
+        stats = _CLASS_STATS_CACHE.get(key)
+        if stats is not None:
+            _CLASS_STATS_CACHE.move_to_end(key)
+    if stats is None:
+        stats = _compute_class_stats(cls, None, enforce)
+        with _CLASS_STATS_LOCK:
+            # Only publish if no invalidation landed while we computed.
+            if key[-1] == _CLASS_STATS_STATE["generation"]:
+                _CLASS_STATS_CACHE[key] = stats
+                if len(_CLASS_STATS_CACHE) > CLASS_STATS_CACHE_SIZE:
+                    _CLASS_STATS_CACHE.popitem(last=False)
+    return copy.deepcopy(stats)
+
+
+def _compute_class_stats(cls, class_modules, enforce):
     ship_type = cls.ship_type
-    class_modules = (
-        cls.class_modules
-        .select_related("module")
-        .order_by("position", "id")
-    )
+    if class_modules is None:
+        class_modules = (
+            cls.class_modules
+            .select_related("module", "module__section")
+            .order_by("position", "id")
+        )
 
     slot_budget = ship_type.default_slot_budget
     slots_used = 0
@@ -799,6 +877,7 @@ def api_class_add_module(request, pk):
         notes=body.get("notes", ""),
         position=position,
     )
+    class_stats_changed()
     return JsonResponse(_serialize_class_module(cm), status=201)
 
 
@@ -816,6 +895,7 @@ def api_class_module_detail(request, pk, cm_id):
             if other.position != i:
                 other.position = i
                 other.save(update_fields=["position"])
+        class_stats_changed()
         return JsonResponse({"ok": True})
     try:
         body = json.loads(request.body)
@@ -834,6 +914,7 @@ def api_class_module_detail(request, pk, cm_id):
         except (TypeError, ValueError):
             return JsonResponse({"error": "position must be an integer"}, status=400)
     cm.save()
+    class_stats_changed()
     return JsonResponse(_serialize_class_module(cm))
 
 
@@ -867,33 +948,59 @@ def _can_edit_ship(user, ship):
     return agency is not None and agency.id == ship.agency_id
 
 
-def _ship_extractable(ship):
+def _extract_keys(cfg):
+    return list(cfg.get("fuel_keys") or []) + list(cfg.get("spares_keys") or [])
+
+
+def _parked_on_claim(ship):
+    loc = ship.location
+    return loc is not None and loc.claimed_by_id == ship.agency_id
+
+
+def _scanned_pairs(ships, cfg):
+    """{(agency_id, star_system_id)} at or above the extract scan threshold
+    for the ships parked in a system their agency has claimed — one
+    ``AgencyScan`` query for the whole batch, none when no ship qualifies."""
+    from starmap.models import AgencyScan
+    parked = [s for s in ships if _parked_on_claim(s)]
+    if not parked or not _extract_keys(cfg):
+        return set()
+    need = int(cfg.get("extract_scan_level", 2))
+    return set(AgencyScan.objects.filter(
+        agency_id__in={s.agency_id for s in parked},
+        star_system_id__in={s.location_id for s in parked},
+        scan_level__gte=need,
+    ).values_list("agency_id", "star_system_id"))
+
+
+def _ship_extractable(ship, cfg=None, scanned=None):
     """{resource_key: available_qty} the ship's agency may extract at the ship's
     current location. Requires: configured fuel/spares keys, the system claimed
     by the ship's agency, and that agency scanned to the extract threshold.
-    Cheap-checks the claim first so non-parked ships incur no extra queries."""
-    loc = ship.location
-    if loc is None or loc.claimed_by_id != ship.agency_id:
+    Cheap-checks the claim first so non-parked ships incur no extra queries.
+
+    ``cfg`` (the jump-economy config) and ``scanned`` (from
+    ``_scanned_pairs``) let a list serializer look both up once per batch."""
+    if not _parked_on_claim(ship):
         return {}
-    from exodus.models import SiteSettings
-    from starmap.models import AgencyScan
-    cfg = SiteSettings.load().get_jump_economy()
-    keys = list(cfg.get("fuel_keys") or []) + list(cfg.get("spares_keys") or [])
+    if cfg is None:
+        from exodus.models import SiteSettings
+        cfg = SiteSettings.cached().get_jump_economy()
+    keys = _extract_keys(cfg)
     if not keys:
         return {}
-    need = int(cfg.get("extract_scan_level", 2))
-    scanned = AgencyScan.objects.filter(
-        agency_id=ship.agency_id, star_system_id=loc.id, scan_level__gte=need,
-    ).exists()
-    if not scanned:
+    if scanned is None:
+        scanned = _scanned_pairs([ship], cfg)
+    if (ship.agency_id, ship.location_id) not in scanned:
         return {}
-    res = loc.resources or {}
+    res = ship.location.resources or {}
     return {k: int(res.get(k, 0) or 0) for k in keys if int(res.get(k, 0) or 0) > 0}
 
 
-def _serialize_ship(ship):
+def _serialize_ship(ship, *, stats=None, cfg=None, scanned=None):
     cls = ship.starship_class
-    stats = compute_class_stats(cls)
+    if stats is None:
+        stats = compute_class_stats(cls)
     return {
         "id": ship.id,
         "name": ship.name,
@@ -914,7 +1021,7 @@ def _serialize_ship(ship):
         # Phase 2 — agency fuel/spares stockpile + what's extractable here.
         "agency_ftl_fuel": ship.agency.ftl_fuel if ship.agency else 0,
         "agency_ftl_spares": ship.agency.ftl_spares if ship.agency else 0,
-        "extractable": _ship_extractable(ship),
+        "extractable": _ship_extractable(ship, cfg, scanned),
         "current_successes": ship.current_successes,
         "build_required_successes": cls.build_required_successes,
         "starship_class_id": cls.id,
@@ -937,14 +1044,35 @@ def _serialize_ship(ship):
     }
 
 
+def _serialize_ships(ships):
+    """``_serialize_ship`` for a whole list in a fixed number of queries:
+    the jump-economy config is read once, every extract scan comes from
+    one ``AgencyScan`` query and each class's stats are looked up once
+    (memoized across requests by ``compute_class_stats``). Ships should
+    come with their class, ship type, agency, fleet, base and location
+    loaded (``_visible_ships``)."""
+    from exodus.models import SiteSettings
+    ships = list(ships)
+    cfg = SiteSettings.cached().get_jump_economy()
+    scanned = _scanned_pairs(ships, cfg)
+    stats_by_class = {}
+    out = []
+    for ship in ships:
+        stats = stats_by_class.get(ship.starship_class_id)
+        if stats is None:
+            stats = stats_by_class[ship.starship_class_id] = compute_class_stats(
+                ship.starship_class,
+            )
+        out.append(_serialize_ship(ship, stats=stats, cfg=cfg, scanned=scanned))
+    return out
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def api_ships(request):
     if request.method == "GET":
         qs = _visible_ships(request.user).order_by("agency", "name")
-        return JsonResponse(
-            [_serialize_ship(s) for s in qs], safe=False,
-        )
+        return JsonResponse(_serialize_ships(qs), safe=False)
 
     # POST — build a new hull from a class
     try:
@@ -1172,7 +1300,7 @@ def api_ship_jump(request, pk):
     if not _can_edit_ship(request.user, ship):
         return JsonResponse({"error": "Permission denied"}, status=403)
 
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     if not settings_obj.show_ftl_jumps and not request.user.is_superuser:
         return JsonResponse({"error": "FTL jumps are not enabled."}, status=403)
     cfg = settings_obj.get_jump_economy()
@@ -1218,6 +1346,7 @@ def api_ship_jump(request, pk):
     # the real cost is the agency fuel/spares stockpile.
     import math
     from django.db.models import F
+    from django.utils import timezone
     from agencies.models import Agency
 
     maint = max(1, int(stats["maintenance"]))
@@ -1260,6 +1389,7 @@ def api_ship_jump(request, pk):
             ).update(
                 ftl_fuel=F("ftl_fuel") - fuel_cost,
                 ftl_spares=F("ftl_spares") - spares_cost,
+                updated_at=timezone.now(),
             )
             if not debited:
                 agency.refresh_from_db(fields=["ftl_fuel", "ftl_spares"])
@@ -1300,7 +1430,7 @@ def api_ship_resupply(request, pk):
     if not _can_edit_ship(request.user, ship):
         return JsonResponse({"error": "Permission denied"}, status=403)
 
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     if not settings_obj.show_ftl_jumps and not request.user.is_superuser:
         return JsonResponse({"error": "FTL jumps are not enabled."}, status=403)
     cfg = settings_obj.get_jump_economy()
@@ -1359,7 +1489,7 @@ def _serialize_fleet(fleet, include_ships=True):
         "created_at": fleet.created_at.isoformat() if fleet.created_at else None,
     }
     if include_ships:
-        data["ships"] = [_serialize_ship(s) for s in fleet.ships.all()]
+        data["ships"] = _serialize_ships(fleet.ships.all())
         data["ship_count"] = len(data["ships"])
     else:
         data["ship_count"] = fleet.ships.count()
@@ -1413,8 +1543,10 @@ def api_fleets(request):
 def api_fleet_detail(request, pk):
     fleet = get_object_or_404(
         Fleet.objects.select_related("agency").prefetch_related(
-            "ships", "ships__starship_class", "ships__starship_class__ship_type",
-            "ships__agency", "ships__fleet", "ships__location",
+            Prefetch("ships", queryset=Starship.objects.select_related(
+                "starship_class", "starship_class__ship_type", "agency",
+                "fleet", "build_assigned_base", "location",
+            )),
         ),
         pk=pk,
     )
@@ -1497,7 +1629,7 @@ def starships_page(request):
     is toggled on from Settings > Map Visibility.
     """
     from exodus.models import SiteSettings
-    settings_obj = SiteSettings.load()
+    settings_obj = SiteSettings.for_request(request)
     if not request.user.is_staff:
         if not settings_obj.show_starships:
             return HttpResponseForbidden("STARSHIPS ACCESS DISABLED")
@@ -0,0 +1,91 @@
+/* =============================================================
+ * BLACKLOG.NET // EXODUS — shared live socket
+ * One multiplexed WebSocket per tab (ws/mux/, see exodus/consumers.py).
+ *
+ *   var stop = ExodusSocket.subscribe("combat:7", onFrame, {
+ *       resumeFrom: function () { return lastSequence; },  // optional
+ *       onState: function (msg) { ... },  // subscribed / error / lagged / closed
+ *   });
+ *
+ * onFrame gets the topic's own frames (the same shape the old
+ * per-feature socket sent). Several listeners can share a topic; the
+ * server sees one subscription. Every (re)connect re-subscribes each
+ * topic, passing resume_from when a listener supplies one; a ``lagged``
+ * frame (the server dropped frames for a slow tab) does the same. The
+ * server's idle pings are answered here.
+ * ============================================================= */
+(function () {
+  "use strict";
+
+  var proto = location.protocol === "https:" ? "wss:" : "ws:";
+  var url = proto + "//" + location.host + "/ws/mux/";
+  var topics = {};  // topic -> [listener, ...]
+  var ws = null;
+  var backoff = 1000;
+
+  function send(frame) {
+    if (ws && ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify(frame));
+  }
+
+  function subscribeFrame(topic) {
+    var frame = { op: "subscribe", topic: topic };
+    topics[topic].forEach(function (listener) {
+      var resumeFrom = listener.resumeFrom && listener.resumeFrom();
+      if (resumeFrom != null) frame.resume_from = resumeFrom;
+    });
+    return frame;
+  }
+
+  function each(topic, fn) {
+    (topics[topic] || []).slice().forEach(fn);
+  }
+
+  function connect() {
+    ws = new WebSocket(url);
+    ws.onopen = function () {
+      backoff = 1000;
+      Object.keys(topics).forEach(function (topic) { send(subscribeFrame(topic)); });
+    };
+    ws.onmessage = function (e) {
+      var msg = JSON.parse(e.data);
+      if (msg.op === "ping") { send({ op: "pong" }); return; }
+      var topic = msg.topic;
+      if (!topic || !topics[topic]) return;
+      if (msg.op) {
+        each(topic, function (l) { if (l.onState) l.onState(msg); });
+        if (msg.op === "lagged") send(subscribeFrame(topic));
+        return;
+      }
+      delete msg.topic;
+      each(topic, function (l) { l.onFrame(msg); });
+    };
+    ws.onclose = function () {
+      Object.keys(topics).forEach(function (topic) {
+        each(topic, function (l) { if (l.onState) l.onState({ op: "closed", topic: topic }); });
+      });
+      setTimeout(connect, backoff);
+      backoff = Math.min(backoff * 2, 30000);
+    };
+    ws.onerror = function () { try { ws.close(); } catch (err) {} };
+  }
+
+  window.ExodusSocket = {
+    subscribe: function (topic, onFrame, opts) {
+      opts = opts || {};
+      var listener = { onFrame: onFrame, resumeFrom: opts.resumeFrom, onState: opts.onState };
+      var fresh = !topics[topic];
+      topics[topic] = (topics[topic] || []).concat([listener]);
+      if (fresh) send(subscribeFrame(topic));
+      return function () {
+        if (!topics[topic]) return;
+        topics[topic] = topics[topic].filter(function (l) { return l !== listener; });
+        if (!topics[topic].length) {
+          delete topics[topic];
+          send({ op: "unsubscribe", topic: topic });
+        }
+      };
+    },
+  };
+
+  connect();
+})();